@@ -0,0 +1,322 @@
+"""
+Bulk import and export of patients and vitals as CSV or NDJSON, streamed in
+constant memory. Run from the repository root against DATABASE_URL:
+
+    python -m app.bulk_io import patients patients.csv
+    python -m app.bulk_io import vitals vitals.ndjson --chunk-size 20000
+    python -m app.bulk_io export vitals vitals.csv
+    python -m app.bulk_io export patients - --format ndjson > patients.ndjson
+
+Rows are read and written in chunks of --chunk-size. On PostgreSQL each
+chunk is loaded with COPY; other databases get one executemany INSERT per
+chunk. Every chunk is committed on its own, so an import that fails on a
+bad row keeps the chunks before it (the error names the line, or for a
+constraint violation such as a duplicate id, the chunk's lines). Empty
+fields get the column default. Exports read through a server-side cursor.
+Progress and rows/s go to stderr.
+
+Columns are the table's column names; `id` is optional (the database
+assigns one), and after each COPY chunk with ids the id sequence is moved
+past them.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from datetime import date, datetime
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError
+
+from .database import engine
+from .models import Patient, Vital
+
+TABLES = {"patients": Patient.__table__, "vitals": Vital.__table__}
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class BadRow(ValueError):
+    pass
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    for suffix, name in FORMATS.items():
+        if str(path).endswith(suffix):
+            return name
+    raise BadRow(f"Cannot tell the format of {path!r}; pass --format")
+
+
+def _to_int(value):
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+
+def column_converter(column):
+    """str/JSON value -> the column's Python type; None for empty fields and nulls"""
+    python_type = column.type.python_type
+    if python_type is str:
+        return lambda value: None if value is None or value == "" else str(value)
+    parse = {
+        int: _to_int,
+        float: float,
+        datetime: datetime.fromisoformat,
+        date: date.fromisoformat,
+    }[python_type]
+
+    def convert(value):
+        if value is None or value == "":
+            return None
+        if isinstance(value, str) or python_type is int:
+            return parse(value)
+        return python_type(value)
+
+    return convert
+
+
+def read_rows(stream, fmt):
+    """(line number, dict) for every record of a CSV (with header) or NDJSON text stream"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                raise BadRow(f"line {line_number}: {e}") from e
+
+
+def typed_rows(table, records):
+    """
+    Validate and convert parsed records into (line number, column dict).
+    Empty fields and nulls are left out, so the column gets its default.
+    """
+    converters = {column.name: column_converter(column) for column in table.columns}
+    for line_number, record in records:
+        unknown = set(record) - set(converters)
+        if unknown:
+            raise BadRow(f"line {line_number}: unknown column(s) {', '.join(sorted(map(str, unknown)))}")
+        row = {}
+        for name, value in record.items():
+            try:
+                value = converters[name](value)
+            except (TypeError, ValueError) as e:
+                raise BadRow(f"line {line_number}, {name}: {e}") from e
+            if value is not None:
+                row[name] = value
+        yield line_number, row
+
+
+def fill_defaults(table, rows):
+    """
+    Set missing columns to their Python-side default (e.g. recorded_at):
+    every row of a chunk is inserted with the same columns, so a column
+    missing from one row would otherwise be NULL rather than its default.
+    """
+    defaults = [(column.name, column.default) for column in table.columns if column.default is not None]
+    for row in rows:
+        for name, default in defaults:
+            if name in row:
+                continue
+            if default.is_callable:
+                row[name] = default.arg(None)
+            elif default.is_scalar:
+                row[name] = default.arg
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Progress:
+    """Running row count and rate on stderr, at most once per `interval` seconds"""
+
+    def __init__(self, label, stream=sys.stderr, interval=1.0):
+        self.label = label
+        self.stream = stream
+        self.interval = interval
+        self.start = self.last = time.perf_counter()
+
+    def line(self, rows):
+        elapsed = time.perf_counter() - self.start
+        rate = rows / elapsed if elapsed else 0.0
+        return f"{self.label}: {rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)"
+
+    def update(self, rows):
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.stream.write("\r" + self.line(rows))
+            self.stream.flush()
+
+    def done(self, rows):
+        self.stream.write("\r" + self.line(rows) + "\n")
+        self.stream.flush()
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        if value == "\\N" or any(c in value for c in ',"\n\r'):
+            return '"' + value.replace('"', '""') + '"'
+        return value
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+
+def copy_csv(columns, rows):
+    """Rows as COPY ... (FORMAT csv, NULL '\\N') input"""
+    return "".join(",".join(_copy_value(row.get(name)) for name in columns) + "\n" for row in rows)
+
+
+def _copy_chunk(conn, table, rows):
+    columns = sorted({name for row in rows for name in row})
+    quote = conn.dialect.identifier_preparer.quote
+    sql = (
+        f"COPY {quote(table.name)} ({', '.join(quote(name) for name in columns)}) "
+        "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    )
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(sql, io.StringIO(copy_csv(columns, rows)))
+    finally:
+        cursor.close()
+
+
+def _reset_id_sequence(conn, table):
+    conn.execute(text(
+        "SELECT setval(pg_get_serial_sequence(:table, 'id'), GREATEST(MAX(id), 1), MAX(id) IS NOT NULL) "
+        f"FROM {conn.dialect.identifier_preparer.quote(table.name)}"
+    ), {"table": table.name})
+
+
+def uses_copy(bind):
+    """COPY goes through psycopg2's copy_expert"""
+    return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+
+
+def import_rows(bind, table, rows, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Insert (line number, column dict) pairs chunk by chunk, one transaction
+    each. Returns the row count.
+    """
+    copy = uses_copy(bind)
+    integrity_errors = (IntegrityError, bind.dialect.loaded_dbapi.IntegrityError)
+    total = 0
+    for numbered in chunked(rows, chunk_size):
+        chunk = [row for _, row in numbered]
+        fill_defaults(table, chunk)
+        try:
+            with bind.begin() as conn:
+                if copy:
+                    _copy_chunk(conn, table, chunk)
+                    # With the chunk, so ids committed by it are never handed out again
+                    if any(row.get("id") is not None for row in chunk):
+                        _reset_id_sequence(conn, table)
+                else:
+                    # executemany needs the same keys in every row
+                    columns = {name for row in chunk for name in row}
+                    conn.execute(insert(table), [{name: row.get(name) for name in columns} for row in chunk])
+        except integrity_errors as e:
+            # e.g. a duplicate id or an unknown patient_id, somewhere in the chunk
+            raise BadRow(f"lines {numbered[0][0]}-{numbered[-1][0]}: {getattr(e, 'orig', e)}") from e
+        total += len(chunk)
+        if progress:
+            progress.update(total)
+    return total
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def export_rows(bind, table, stream, fmt, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Write every row of `table` in id order to a text stream. Returns the row count."""
+    columns = [column.name for column in table.columns]
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(columns)
+    total = 0
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            select(table).order_by(table.c.id)
+        )
+        for partition in result.partitions():
+            if writer is not None:
+                writer.writerows(
+                    [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+                    for row in partition
+                )
+            else:
+                stream.writelines(
+                    json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in partition
+                )
+            total += len(partition)
+            if progress:
+                progress.update(total)
+    return total
+
+
+def _open(path, mode):
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream patients and vitals in and out as CSV or NDJSON")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("path", help="file to read or write ('-' for stdin/stdout)")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())),
+                        help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    table = TABLES[args.table]
+    try:
+        fmt = detect_format(args.path, args.format)
+    except BadRow as e:
+        parser.error(str(e))
+    progress = None if args.quiet else Progress(f"{args.action} {args.table}")
+
+    stream = _open(args.path, "r" if args.action == "import" else "w")
+    try:
+        if args.action == "import":
+            rows = typed_rows(table, read_rows(stream, fmt))
+            total = import_rows(engine, table, rows, args.chunk_size, progress)
+        else:
+            total = export_rows(engine, table, stream, fmt, args.chunk_size, progress)
+    except BadRow as e:
+        sys.exit(f"\n{args.path}: {e}")
+    finally:
+        if stream not in (sys.stdin, sys.stdout):
+            stream.close()
+    if progress:
+        progress.done(total)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,13 @@ class Settings:
     PROJECT_NAME: str = "Inference.AI Backend"
     API_V1_PREFIX: str = "/api/v1"
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # "sync" (default) or "async" (asyncpg / aiosqlite route handlers)
+    DB_MODE: str = os.getenv("DB_MODE", "sync").lower()
+    # Create missing tables at startup ("0": run `python -m app.migrations` instead)
+    AUTO_MIGRATE: bool = os.getenv("AUTO_MIGRATE", "1") != "0"
+    # Model from MODELS_DIR used by /inference when a request names none
+    # (empty: rule engine only)
+    INFERENCE_MODEL: str = os.getenv("INFERENCE_MODEL", "")
     JWT_SECRET: str = os.getenv("JWT_SECRET")
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
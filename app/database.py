@@ -20,3 +20,40 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async drivers for the same database (DB_MODE=async)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url):
+    scheme, rest = url.split("://", 1)
+    base = scheme.split("+", 1)[0]
+    return f"{ASYNC_DRIVERS.get(base, scheme)}://{rest}"
+
+
+# Created by init_async_engine() in async mode only
+async_engine = None
+AsyncSessionLocal = None
+
+
+def init_async_engine(url=None):
+    global async_engine, AsyncSessionLocal
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_database_url(url or settings.DATABASE_URL), pool_pre_ping=True
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    return async_engine
+
+# Dependency for getting an async database session
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
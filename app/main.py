@@ -1,14 +1,46 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from . import database
 from .config import settings
-from .database import Base, engine
+from .migrations import init_db
+from .model_registry import model_registry
 from .routers import patients, vitals, inference
+from .rule_engine import get_rules
+
+# Importing this module only builds the app; the database, rules and async
+# engine are set up in startup(), which runs from the lifespan (or
+# explicitly, e.g. in the benchmarks). Models load on first use.
+
+
+def startup():
+    # Create database tables
+    if settings.AUTO_MIGRATE:
+        init_db()
+
+    # Compile the interpretation rules once at startup
+    get_rules()
+
+    if settings.DB_MODE == "async" and database.async_engine is None:
+        database.init_async_engine()
+
+
+def shutdown():
+    model_registry.close()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    startup()
+    try:
+        yield
+    finally:
+        shutdown()
 
-# Create database tables automatically
-Base.metadata.create_all(bind=engine)
 
 # Initialize FastAPI app
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Allow frontend or external apps to connect (CORS)
 app.add_middleware(
@@ -20,6 +52,13 @@ app.add_middleware(
 )
 
 # Register routers (API endpoints)
+# Async mode: async handlers take precedence over the sync ones
+if settings.DB_MODE == "async":
+    from .routers import patients_async, vitals_async
+
+    app.include_router(patients_async.router, prefix=settings.API_V1_PREFIX)
+    app.include_router(vitals_async.router, prefix=settings.API_V1_PREFIX)
+
 app.include_router(patients.router, prefix=settings.API_V1_PREFIX)
 app.include_router(vitals.router, prefix=settings.API_V1_PREFIX)
 app.include_router(inference.router, prefix=settings.API_V1_PREFIX)
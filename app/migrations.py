@@ -0,0 +1,29 @@
+"""
+Schema setup for the inference service database.
+
+The API runs this at startup unless AUTO_MIGRATE=0; deployments that set
+that run it once per release instead:
+
+    python -m app.migrations
+"""
+from sqlalchemy import text
+
+from .database import Base, engine
+from . import models  # noqa: F401  (registers the tables on Base)
+
+
+def init_db(bind=engine):
+    if bind.dialect.name == "postgresql":
+        # pg_trgm backs the patient name search index
+        with bind.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(bind=bind)
+    # create_all skips tables that already exist: add indexes introduced since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Database schema is up to date")
@@ -0,0 +1,314 @@
+"""
+Local ML models for inference, served through a micro-batcher.
+
+Models live in MODELS_DIR (default `models/` at the repository root) as
+sklearn pickles (`<name>.pkl`) or TorchScript files (`<name>.pt`), each
+with an optional `<name>.json` sidecar:
+
+    {"features": ["hr", "sbp", ...], "labels": ["Healthy", "Sepsis"], "threshold": 0.5}
+
+`features` are rule engine field names (default: every vital) and
+`labels` name the output columns (sklearn models default to `classes_`).
+Pickles run arbitrary code when loaded: only put trusted files in
+MODELS_DIR.
+
+A model is loaded on first use and warmed up with one forward pass.
+Concurrent requests for the same model are collected by a MicroBatcher for
+up to MODEL_BATCH_WAIT_MS and run as one forward pass on a shared pool of
+MODEL_WORKERS threads, so model work never blocks the event loop and never
+uses more than that many cores.
+"""
+import asyncio
+import json
+import os
+import pickle
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
+
+MODEL_WORKERS = int(os.getenv("MODEL_WORKERS", "2"))
+MODEL_BATCH_MAX = int(os.getenv("MODEL_BATCH_MAX", "64"))
+MODEL_BATCH_WAIT_MS = float(os.getenv("MODEL_BATCH_WAIT_MS", "2"))
+
+MODEL_KINDS = {".pkl": "sklearn", ".pickle": "sklearn", ".pt": "torchscript", ".ts": "torchscript"}
+
+# Default feature order: the vitals the rule engine knows about
+DEFAULT_FEATURES = ["hr", "sbp", "dbp", "temp", "rr", "spo2"]
+
+# A normal adult reading, used to warm models up
+WARMUP_VALUES = {"hr": 75, "sbp": 120, "dbp": 80, "temp": 36.8, "rr": 14, "spo2": 98}
+
+# Latency samples kept per model for percentiles
+LATENCY_WINDOW = 1000
+
+
+class ModelUnavailable(RuntimeError):
+    pass
+
+
+@dataclass
+class Prediction:
+    label: str
+    probability: Optional[float]
+    labels: List[str]
+    scores: List[float]
+
+
+@dataclass
+class ModelStats:
+    requests: int = 0
+    batches: int = 0
+    errors: int = 0
+    load_ms: Optional[float] = None
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    batch_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def summary(self):
+        def percentiles(samples):
+            if not samples:
+                return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+            p50, p95, p99 = np.percentile(np.fromiter(samples, float), [50, 95, 99])
+            return {"p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3)}
+
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else None,
+            "load_ms": self.load_ms,
+            "request_latency": percentiles(self.latencies_ms),
+            "forward_pass": percentiles(self.batch_ms),
+        }
+
+
+class LoadedModel:
+    def __init__(self, name, kind, model, features, labels, threshold=None):
+        self.name = name
+        self.kind = kind
+        self.model = model
+        self.features = features
+        self.labels = labels
+        self.threshold = threshold
+
+    def feature_matrix(self, rows):
+        """(n, features) float32 matrix; missing values are NaN"""
+        return np.array(
+            [[np.nan if row.get(f) is None else row[f] for f in self.features] for row in rows],
+            dtype=np.float32,
+        )
+
+    def forward(self, matrix):
+        """Scores, shape (n, len(labels))"""
+        if self.kind == "torchscript":
+            import torch
+
+            with torch.inference_mode():
+                scores = self.model(torch.from_numpy(matrix)).numpy()
+        elif hasattr(self.model, "predict_proba"):
+            scores = np.asarray(self.model.predict_proba(matrix))
+        else:
+            scores = np.asarray(self.model.predict(matrix), dtype=float)
+        return scores.reshape(len(matrix), -1)
+
+    def predict(self, rows):
+        scores = self.forward(self.feature_matrix(rows))
+        predictions = []
+        for row_scores in scores.tolist():
+            if len(row_scores) == 1:
+                # Single output: probability of the positive (last) label
+                p = row_scores[0]
+                positive = p >= (self.threshold if self.threshold is not None else 0.5)
+                predictions.append(Prediction(self.labels[-1] if positive else self.labels[0], p,
+                                              self.labels, row_scores))
+            else:
+                best = int(np.argmax(row_scores))
+                predictions.append(Prediction(self.labels[best], row_scores[best], self.labels, row_scores))
+        return predictions
+
+
+def load_model(name, path):
+    """Load and warm up one model file"""
+    path = Path(path)
+    kind = MODEL_KINDS[path.suffix]
+    sidecar = path.with_suffix(".json")
+    meta = json.loads(sidecar.read_text()) if sidecar.exists() else {}
+
+    if kind == "torchscript":
+        import torch
+
+        torch.set_num_threads(1)  # parallelism comes from the worker pool
+        model = torch.jit.load(str(path), map_location="cpu")
+        model.eval()
+    else:
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+
+    labels = meta.get("labels")
+    if labels is None and hasattr(model, "classes_"):
+        labels = [str(c) for c in model.classes_]
+    loaded = LoadedModel(
+        name, kind, model,
+        features=meta.get("features", DEFAULT_FEATURES),
+        labels=labels or ["negative", "positive"],
+        threshold=meta.get("threshold"),
+    )
+    loaded.predict([WARMUP_VALUES])
+    return loaded
+
+
+class MicroBatcher:
+    """Collects concurrent requests for one model into batched forward passes"""
+
+    def __init__(self, model, executor, stats, max_batch=MODEL_BATCH_MAX, max_wait_ms=MODEL_BATCH_WAIT_MS):
+        self.model = model
+        self.executor = executor
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.loop = None
+        self.queue = None
+        self.task = None
+
+    async def predict(self, values):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.task is None or self.task.done():
+            # First use, or the previous event loop is gone
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.task = loop.create_task(self._run())
+        future = loop.create_future()
+        await self.queue.put((values, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            start = time.perf_counter()
+            try:
+                predictions = await loop.run_in_executor(
+                    self.executor, self.model.predict, [values for values, _, _ in batch]
+                )
+            except Exception as e:
+                self.stats.errors += len(batch)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            self.stats.batches += 1
+            self.stats.requests += len(batch)
+            self.stats.batch_ms.append((done - start) * 1000)
+            for (_, future, queued), prediction in zip(batch, predictions):
+                self.stats.latencies_ms.append((done - queued) * 1000)
+                if not future.done():
+                    future.set_result(prediction)
+
+
+class ModelRegistry:
+    def __init__(self, models_dir=None, workers=MODEL_WORKERS):
+        self.models_dir = Path(models_dir or os.getenv("MODELS_DIR") or DEFAULT_MODELS_DIR)
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._models = {}
+        self._batchers = {}
+        self._failed = {}
+        self.stats = {}
+
+    def available(self):
+        """Model name -> file, for every model file in the directory"""
+        if not self.models_dir.is_dir():
+            return {}
+        return {
+            path.stem: path for path in sorted(self.models_dir.iterdir())
+            if path.suffix in MODEL_KINDS
+        }
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="model")
+        return self._executor
+
+    def get(self, name):
+        """The loaded model, loading and warming it up on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name in self._models:
+                return self._models[name]
+            path = self.available().get(name)
+            if path is None:
+                raise ModelUnavailable(f"Unknown model {name!r}")
+            stats = self.stats.setdefault(name, ModelStats())
+            start = time.perf_counter()
+            try:
+                model = load_model(name, path)
+            except Exception as e:
+                self._failed[name] = str(e)
+                raise ModelUnavailable(f"Model {name!r} failed to load: {e}") from e
+            stats.load_ms = round((time.perf_counter() - start) * 1000, 3)
+            self._failed.pop(name, None)
+            self._models[name] = model
+            return model
+
+    async def predict(self, name, values):
+        """Predict one reading (rule engine field name -> value) through the batcher"""
+        batcher = self._batchers.get(name)
+        if batcher is None:
+            loop = asyncio.get_running_loop()
+            model = self._models.get(name) or await loop.run_in_executor(self.executor, self.get, name)
+            batcher = self._batchers.get(name)
+            if batcher is None:
+                batcher = self._batchers[name] = MicroBatcher(model, self.executor, self.stats[name])
+        return await batcher.predict(values)
+
+    def describe(self):
+        return [
+            {
+                "name": name,
+                "file": path.name,
+                "kind": MODEL_KINDS[path.suffix],
+                "loaded": name in self._models,
+                "error": self._failed.get(name),
+                "stats": self.stats[name].summary() if name in self.stats else None,
+            }
+            for name, path in self.available().items()
+        ]
+
+    def close(self):
+        for batcher in self._batchers.values():
+            if batcher.task is not None:
+                batcher.task.cancel()
+        self._batchers.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+model_registry = ModelRegistry()
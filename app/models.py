@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -19,6 +19,12 @@ class Patient(Base):
     vitals = relationship("Vital", back_populates="patient",
                           cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Trigram GIN index on PostgreSQL (plain index elsewhere); app.migrations installs pg_trgm
+        Index("ix_patients_name_trgm", "name",
+              postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
 # Vital signs table
 
 
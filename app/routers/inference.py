@@ -1,46 +1,158 @@
+import json
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from ..config import settings
 from ..database import get_db
+from ..model_registry import model_registry
 from ..models import Vital
-from ..schemas import InferenceRequest, InferenceResult
+from ..rule_engine import get_rules
+from ..schemas import BatchInferenceRequest, BatchInferenceResult, InferenceRequest, InferenceResult
 
 router = APIRouter(prefix="/inference", tags=["inference"])
 
-# Simple rule-based inference engine
+# Upper bound on readings evaluated by one batch request
+MAX_BATCH_VITALS = 50000
 
+# Ids per IN list: one bound parameter each, well under SQLite's 32766
+IN_CHUNK_SIZE = 10000
 
-@router.post("/", response_model=InferenceResult)
-def run_inference(payload: InferenceRequest, db: Session = Depends(get_db)):
-    vital = db.query(Vital).get(payload.vital_id)
-    if not vital:
-        raise HTTPException(status_code=404, detail="Vital record not found")
+# Rule engine field names for the Vital columns
+RULE_FIELDS = {
+    "sbp": "systolic_bp",
+    "dbp": "diastolic_bp",
+    "hr": "heart_rate",
+    "temp": "temperature",
+    "rr": "respiratory_rate",
+    "spo2": "oxygen_saturation",
+}
 
-    symptoms = []
-    possible_illnesses = []
 
-    # Rule-based checks (basic medical logic)
-    if vital.temperature and vital.temperature > 38.0:
-        symptoms.append("Fever")
-        possible_illnesses.append("Infection")
+def vital_rule_values(vital):
+    return {name: getattr(vital, column) for name, column in RULE_FIELDS.items()}
 
-    if vital.heart_rate and vital.heart_rate > 100:
-        symptoms.append("Tachycardia")
-        possible_illnesses.append("Anxiety, Dehydration, or Cardiac issue")
 
-    if vital.systolic_bp and vital.systolic_bp > 140:
-        symptoms.append("High blood pressure")
-        possible_illnesses.append("Hypertension")
+def build_inference_result(fired, rules):
+    symptoms = [rule.symptom for rule in fired if rule.symptom]
+    possible_illnesses = [rule.illness for rule in fired if rule.illness]
 
-    if vital.oxygen_saturation and vital.oxygen_saturation < 92:
-        symptoms.append("Low oxygen saturation")
-        possible_illnesses.append("Respiratory condition")
-
-    if not symptoms:
+    if not symptoms and not possible_illnesses:
         symptoms.append("No abnormal findings")
         possible_illnesses.append("Healthy")
 
     return InferenceResult(
         symptoms=symptoms,
         possible_illnesses=possible_illnesses,
-        evidence="Rule-based checks on vital signs"
+        evidence=f"Rule-based checks on vital signs (rules {rules.version}: "
+                 f"{', '.join(rule.id for rule in fired) or 'none fired'})"
+    )
+
+# Rule-based inference engine (shared rule table, see rules/vitals_rules.json)
+
+
+@router.post("/", response_model=InferenceResult)
+async def run_inference(payload: InferenceRequest, db: Session = Depends(get_db)):
+    vital = await run_in_threadpool(db.get, Vital, payload.vital_id)
+    if not vital:
+        raise HTTPException(status_code=404, detail="Vital record not found")
+
+    rules = get_rules()
+    evaluation = rules.evaluate(vital_rule_values(vital))
+    result = build_inference_result(evaluation.fired, rules)
+
+    # A local model, if one is configured, decides the illness; the rule
+    # engine still lists the symptoms and is the fallback when the model
+    # cannot be loaded or fails
+    model_name = payload.model or settings.INFERENCE_MODEL
+    if not model_name:
+        return result
+    try:
+        prediction = await model_registry.predict(model_name, vital_rule_values(vital))
+    except Exception as e:
+        result.evidence += f"; model {model_name} unavailable, rule engine fallback ({e})"
+        return result
+    scores = ", ".join(f"{label}: {score:.3f}" for label, score in zip(prediction.labels, prediction.scores))
+    return InferenceResult(
+        symptoms=result.symptoms,
+        possible_illnesses=[prediction.label],
+        evidence=f"Model {model_name} ({scores}); {result.evidence}",
+        model=model_name,
+        probability=prediction.probability,
+    )
+
+# Local models with load state and per-model latency stats
+
+
+@router.get("/models")
+def list_models():
+    return model_registry.describe()
+
+
+def batch_inference_lines(ids, columns, missing, rules, truncated=False):
+    """
+    Evaluate the whole batch with one vectorized pass, then yield one NDJSON
+    line per reading, followed by a line per requested id that was not found
+    and, if the patient had more readings than one batch evaluates, a last
+    line saying so.
+    """
+    evaluation = rules.evaluate_batch(columns)
+    for i, vital_id in enumerate(ids):
+        result = build_inference_result(evaluation.fired(i), rules)
+        yield BatchInferenceResult(vital_id=vital_id, **result.model_dump()).model_dump_json() + "\n"
+    for vital_id in missing:
+        yield json.dumps({"vital_id": vital_id, "detail": "Vital record not found"}) + "\n"
+    if truncated:
+        yield json.dumps({
+            "truncated": True,
+            "detail": f"Only the first {MAX_BATCH_VITALS} readings were evaluated; "
+                      f"narrow since/until or continue after vital_id {ids[-1]}",
+        }) + "\n"
+
+
+# Batch inference over many readings, streamed back as NDJSON
+@router.post("/batch")
+def run_inference_batch(payload: BatchInferenceRequest, db: Session = Depends(get_db)):
+    if (payload.vital_ids is None) == (payload.patient_id is None):
+        raise HTTPException(status_code=422, detail="Give either vital_ids or patient_id")
+
+    columns = [getattr(Vital, column) for column in RULE_FIELDS.values()]
+    query = select(Vital.id, *columns).order_by(Vital.id)
+    truncated = False
+    if payload.vital_ids is not None:
+        if len(payload.vital_ids) > MAX_BATCH_VITALS:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_VITALS} vital ids per request")
+        # One query per IN_CHUNK_SIZE ids (usually just one); sorted ids keep the result in id order
+        requested = sorted(set(payload.vital_ids))
+        rows = []
+        for start in range(0, len(requested), IN_CHUNK_SIZE):
+            rows.extend(db.execute(query.where(Vital.id.in_(requested[start:start + IN_CHUNK_SIZE]))).all())
+    else:
+        query = query.where(Vital.patient_id == payload.patient_id)
+        if payload.since is not None:
+            query = query.where(Vital.timestamp >= payload.since)
+        if payload.until is not None:
+            query = query.where(Vital.timestamp < payload.until)
+        # One extra row tells whether the patient has more than a batch
+        rows = db.execute(query.limit(MAX_BATCH_VITALS + 1)).all()
+        truncated = len(rows) > MAX_BATCH_VITALS
+        rows = rows[:MAX_BATCH_VITALS]
+
+    # Rows are turned into columns for the rule engine
+    ids = [row[0] for row in rows]
+    values = {
+        name: [row[i] for row in rows]
+        for i, name in enumerate(RULE_FIELDS, start=1)
+    }
+    missing = []
+    if payload.vital_ids is not None:
+        found = set(ids)
+        missing = [vital_id for vital_id in dict.fromkeys(payload.vital_ids) if vital_id not in found]
+
+    return StreamingResponse(
+        batch_inference_lines(ids, values, missing, get_rules(), truncated),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Truncated": "true"} if truncated else None,
     )
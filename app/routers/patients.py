@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from typing import List
 from ..database import get_db
 from ..models import Patient
 from ..schemas import PatientCreate, PatientOut
@@ -18,6 +20,25 @@ def create_patient(payload: PatientCreate, db: Session = Depends(get_db)):
     db.refresh(patient)
     return patient
 
+# Search patients by name
+# On PostgreSQL this uses the pg_trgm GIN index (ILIKE '%q%' and similarity
+# ranking); other databases fall back to a plain substring match.
+
+
+@router.get("/search", response_model=List[PatientOut])
+def search_patients(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    query = db.query(Patient).filter(Patient.name.ilike(f"%{pattern}%", escape="\\"))
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.order_by(func.similarity(Patient.name, q).desc(), Patient.id)
+    else:
+        query = query.order_by(Patient.name, Patient.id)
+    return query.limit(limit).all()
+
 # Get a patient by ID
 
 
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..models import Patient
+from ..schemas import PatientCreate, PatientOut
+
+# Async versions of the patient endpoints (DB_MODE=async), registered ahead
+# of routers.patients. The :int path converter lets /search fall through to
+# the sync handler.
+router = APIRouter(prefix="/patients", tags=["patients"])
+
+# Create a new patient
+
+
+@router.post("/", response_model=PatientOut)
+async def create_patient(payload: PatientCreate, db: AsyncSession = Depends(get_async_db)):
+    patient = Patient(**payload.dict())
+    db.add(patient)
+    await db.commit()
+    return patient
+
+# Get a patient by ID
+
+
+@router.get("/{patient_id:int}", response_model=PatientOut)
+async def get_patient(patient_id: int, db: AsyncSession = Depends(get_async_db)):
+    patient = await db.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return patient
@@ -1,27 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import exists, insert, literal, select
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import Vital, Patient
 from ..schemas import VitalCreate, VitalOut
+from datetime import datetime
 
 # Create a router for vital-related endpoints
 router = APIRouter(prefix="/vitals", tags=["vitals"])
 
+# One statement: INSERT ... SELECT ... WHERE EXISTS (patient) RETURNING *,
+# so the existence check, the insert and reading the row back share a
+# single round trip.
+
+
+def insert_vital_statement(values):
+    table = Vital.__table__
+    columns = list(values)
+    row = select(
+        *[literal(values[c], type_=table.c[c].type) for c in columns]
+    ).where(exists().where(Patient.id == values["patient_id"]))
+    return insert(table).from_select(columns, row).returning(*table.c)
+
 # Record new vital signs for a patient
 
 
 @router.post("/", response_model=VitalOut)
 def record_vital(payload: VitalCreate, db: Session = Depends(get_db)):
-    # Check if patient exists
-    patient = db.query(Patient).get(payload.patient_id)
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    # An omitted timestamp means "now", as with the column default
+    values = payload.dict(exclude_none=True)
+    values.setdefault("timestamp", datetime.utcnow())
 
-    # Create vital record
-    vital = Vital(**payload.dict())
-    db.add(vital)
+    vital = db.execute(insert_vital_statement(values)).mappings().first()
+    if vital is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Patient not found")
     db.commit()
-    db.refresh(vital)
     return vital
 
 # Get a vital record by ID
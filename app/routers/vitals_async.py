@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..models import Vital
+from ..schemas import VitalCreate, VitalOut
+from .vitals import insert_vital_statement
+from datetime import datetime
+
+# Async versions of the vitals endpoints (DB_MODE=async)
+router = APIRouter(prefix="/vitals", tags=["vitals"])
+
+# Record new vital signs for a patient
+
+
+@router.post("/", response_model=VitalOut)
+async def record_vital(payload: VitalCreate, db: AsyncSession = Depends(get_async_db)):
+    # Same single-statement insert as the sync handler
+    values = payload.dict(exclude_none=True)
+    values.setdefault("timestamp", datetime.utcnow())
+
+    vital = (await db.execute(insert_vital_statement(values))).mappings().first()
+    if vital is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Patient not found")
+    await db.commit()
+    return vital
+
+# Get a vital record by ID
+
+
+@router.get("/{vital_id:int}", response_model=VitalOut)
+async def get_vital(vital_id: int, db: AsyncSession = Depends(get_async_db)):
+    vital = await db.get(Vital, vital_id)
+    if not vital:
+        raise HTTPException(status_code=404, detail="Vital not found")
+    return vital
@@ -0,0 +1,221 @@
+"""
+Declarative vitals interpretation rules.
+
+The rule table lives in `rules/vitals_rules.json` at the repository root
+(override with the VITALS_RULES_PATH environment variable) and is shared by
+both services. So is this module: app/rule_engine.py and
+backend/app/services/rule_engine.py must stay byte-identical
+(backend/test_rule_engine.py checks). Each rule's `when` clause is compiled once into
+a predicate that works on plain numbers (one reading) and on NumPy arrays
+(a batch of readings), so both paths evaluate exactly the same logic.
+"""
+import hashlib
+import json
+import math
+import operator
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import reduce
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+RULES_FILE = Path("rules") / "vitals_rules.json"
+
+
+def _default_rules_path():
+    """rules/vitals_rules.json in the nearest directory above this module that has one"""
+    for directory in Path(__file__).resolve().parents:
+        if (directory / RULES_FILE).exists():
+            return directory / RULES_FILE
+    return Path.cwd() / RULES_FILE
+
+
+DEFAULT_RULES_PATH = _default_rules_path()
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+@dataclass
+class Rule:
+    id: str
+    predicate: Callable
+    fields: frozenset
+    group: Optional[str] = None
+    impression: Optional[str] = None
+    recommendations: List[str] = field(default_factory=list)
+    finding: Optional[str] = None
+    symptom: Optional[str] = None
+    illness: Optional[str] = None
+
+
+@dataclass
+class RuleEvaluation:
+    """Rules that fired for one reading, in rule-table order"""
+    fired: List[Rule]
+    elapsed_ms: float
+
+    @property
+    def fired_ids(self):
+        return [rule.id for rule in self.fired]
+
+
+@dataclass
+class BatchEvaluation:
+    """Boolean matrix of fired rules, shape (n_rules, n_readings)"""
+    rules: List[Rule]
+    matrix: np.ndarray
+    elapsed_ms: float
+
+    def fired(self, i):
+        return [rule for rule, hit in zip(self.rules, self.matrix[:, i]) if hit]
+
+
+def _compile(clause, fields):
+    if "field" in clause:
+        name = clause["field"]
+        op = OPERATORS[clause["op"]]
+        value = clause["value"]
+        fields.add(name)
+        return lambda values: op(values[name], value)
+    if "all" in clause:
+        parts = [_compile(c, fields) for c in clause["all"]]
+        return lambda values: reduce(operator.and_, (p(values) for p in parts))
+    if "any" in clause:
+        parts = [_compile(c, fields) for c in clause["any"]]
+        return lambda values: reduce(operator.or_, (p(values) for p in parts))
+    if "at_least" in clause:
+        n = clause["at_least"]
+        parts = [_compile(c, fields) for c in clause["of"]]
+        return lambda values: sum(p(values) * 1 for p in parts) >= n
+    if "not" in clause:
+        part = _compile(clause["not"], fields)
+        return lambda values: np.logical_not(part(values))
+    raise ValueError(f"Unknown rule clause: {sorted(clause)}")
+
+
+class RuleSet:
+    def __init__(self, spec, source=None):
+        self.source = source
+        self.version = hashlib.sha256(
+            json.dumps(spec, sort_keys=True).encode()
+        ).hexdigest()[:12]
+        # Malformed specs raise ValueError, which callers report as a bad file
+        try:
+            self.medication_flags = {
+                flag: [term.lower() for term in terms]
+                for flag, terms in spec.get("medication_flags", {}).items()
+            }
+            entries = list(spec["rules"])
+        except (AttributeError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid rule set: {e!r}")
+        self.rules = []
+        for entry in entries:
+            rule_id = entry.get("id") if isinstance(entry, dict) else None
+            fields = set()
+            try:
+                self.rules.append(Rule(
+                    id=entry["id"],
+                    predicate=_compile(entry["when"], fields),
+                    fields=frozenset(fields),
+                    group=entry.get("group"),
+                    impression=entry.get("impression"),
+                    recommendations=list(entry.get("recommendations", [])),
+                    finding=entry.get("finding"),
+                    symptom=entry.get("symptom"),
+                    illness=entry.get("illness"),
+                ))
+            except (AttributeError, KeyError, TypeError) as e:
+                raise ValueError(f"Invalid rule {rule_id!r}: {e!r}")
+        self.fields = frozenset().union(*(rule.fields for rule in self.rules))
+
+    def flags_for(self, medications):
+        """Medication flag values (0/1) for a free-text medication list"""
+        meds = (medications or "").lower()
+        return {
+            flag: int(any(term in meds for term in terms))
+            for flag, terms in self.medication_flags.items()
+        }
+
+    def evaluate(self, values):
+        """Evaluate one reading; `values` maps field name -> number (or None)"""
+        start = time.perf_counter()
+        values = {
+            name: math.nan if values.get(name) is None else values[name]
+            for name in self.fields
+        }
+        fired = []
+        claimed = set()
+        for rule in self.rules:
+            if rule.group in claimed:
+                continue
+            if rule.predicate(values):
+                fired.append(rule)
+                if rule.group:
+                    claimed.add(rule.group)
+        return RuleEvaluation(fired, (time.perf_counter() - start) * 1000)
+
+    def evaluate_batch(self, columns):
+        """Evaluate many readings; `columns` maps field name -> array-like"""
+        start = time.perf_counter()
+        arrays = {}
+        n = 0
+        for name in self.fields:
+            column = columns.get(name)
+            if column is not None:
+                arrays[name] = np.asarray(column, dtype=float)
+                n = len(arrays[name])
+        for name in self.fields:
+            if name not in arrays:
+                arrays[name] = np.full(n, np.nan)
+
+        matrix = np.zeros((len(self.rules), n), dtype=bool)
+        claimed = {}
+        for i, rule in enumerate(self.rules):
+            hit = np.broadcast_to(rule.predicate(arrays), (n,))
+            if rule.group:
+                taken = claimed.get(rule.group, np.zeros(n, dtype=bool))
+                hit = hit & ~taken
+                claimed[rule.group] = taken | hit
+            matrix[i] = hit
+        return BatchEvaluation(self.rules, matrix, (time.perf_counter() - start) * 1000)
+
+
+def load_rules(path=None):
+    path = Path(path or os.getenv("VITALS_RULES_PATH") or DEFAULT_RULES_PATH)
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    return RuleSet(spec, source=str(path))
+
+
+_lock = threading.Lock()
+_current: Optional[RuleSet] = None
+
+
+def get_rules():
+    """The active rule set, compiled on first use"""
+    global _current
+    if _current is None:
+        with _lock:
+            if _current is None:
+                _current = load_rules()
+    return _current
+
+
+def reload_rules(path=None):
+    """Re-read the rule file; the old rules stay active if the new file is invalid"""
+    global _current
+    rules = load_rules(path)
+    with _lock:
+        _current = rules
+    return rules
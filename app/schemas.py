@@ -53,9 +53,25 @@ class VitalOut(VitalCreate):
 
 class InferenceRequest(BaseModel):
     vital_id: int
+    model: Optional[str] = None
 
 
 class InferenceResult(BaseModel):
     symptoms: List[str]
     possible_illnesses: List[str]
     evidence: Optional[str] = None
+    # Model that produced the result; None for the rule engine
+    model: Optional[str] = None
+    probability: Optional[float] = None
+
+
+class BatchInferenceRequest(BaseModel):
+    # Either explicit ids, or a patient with an optional time range
+    vital_ids: Optional[List[int]] = None
+    patient_id: Optional[int] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+class BatchInferenceResult(InferenceResult):
+    vital_id: int
@@ -1,17 +1,119 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# SQLite database file
-SQLALCHEMY_DATABASE_URL = "sqlite:///./healthcare_erp.db"
+# SQLite database file (SQLITE_DATABASE_URL overrides it, e.g. for the tests)
+SQLALCHEMY_DATABASE_URL = os.getenv("SQLITE_DATABASE_URL", "sqlite:///./healthcare_erp.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
+# Same file through aiosqlite for the async routes
+ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+# "sync" (default) or "async": which route handlers serve the hot paths
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+# Storage profiles (SQLITE_PROFILE). Pragmas are applied to every new
+# connection. With single_writer, writes go through `write_engine`: one
+# connection per process that takes the write lock up front (BEGIN
+# IMMEDIATE), so concurrent writers - threads or uvicorn workers - queue on
+# busy_timeout instead of failing with "database is locked".
+SQLITE_PROFILES = {
+    # SQLite defaults: rollback journal, synchronous=FULL, no mmap
+    "legacy": {"pragmas": {}, "single_writer": False},
+    "wal": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,  # KiB
+            "busy_timeout": 10000,  # ms
+            "temp_store": "MEMORY",
+        },
+        "single_writer": True,
+    },
+}
+
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "wal").lower()
+
+
+def sqlite_pragmas(profile=SQLITE_PROFILE, overrides=os.getenv("SQLITE_PRAGMAS", "")):
+    """Pragmas of `profile`, with "name=value,..." overrides (e.g. mmap_size=0)"""
+    pragmas = dict(SQLITE_PROFILES[profile]["pragmas"])
+    for item in filter(None, (part.strip() for part in overrides.split(","))):
+        name, _, value = item.partition("=")
+        pragmas[name.strip()] = value.strip()
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run the pragmas on every new DBAPI connection of `engine`"""
+    if not pragmas:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+# Pool of a single-writer engine: one connection, waited for up to 30s
+WRITER_POOL = {"pool_size": 1, "max_overflow": 0, "pool_timeout": 30}
+
+
+def begin_immediate(engine):
+    """Start every transaction of `engine` (a sync Engine) with BEGIN IMMEDIATE"""
+    @event.listens_for(engine, "connect")
+    def _manual_transactions(dbapi_conn, connection_record):
+        # Stop pysqlite/aiosqlite from issuing their own deferred BEGIN
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def create_sqlite_engine(url=SQLALCHEMY_DATABASE_URL, profile=SQLITE_PROFILE, writer=False):
+    """
+    Engine for `url` with the storage profile applied. `writer=True` makes
+    the single-writer engine: one pooled connection whose transactions
+    start with BEGIN IMMEDIATE.
+    """
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if writer:
+        kwargs.update(WRITER_POOL)
+    engine = apply_sqlite_pragmas(create_engine(url, **kwargs), sqlite_pragmas(profile))
+    return begin_immediate(engine) if writer else engine
+
+
+def create_async_sqlite_engine(url=ASYNC_DATABASE_URL, profile=SQLITE_PROFILE, writer=False):
+    """Async counterpart of create_sqlite_engine (aiosqlite)"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(url, **(WRITER_POOL if writer else {}))
+    apply_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(profile))
+    if writer:
+        begin_immediate(engine.sync_engine)
+    return engine
+
+
+engine = create_sqlite_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Writes use their own engine in single-writer profiles
+if SQLITE_PROFILES[SQLITE_PROFILE]["single_writer"]:
+    write_engine = create_sqlite_engine(writer=True)
+else:
+    write_engine = engine
+
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+
 Base = declarative_base()
 
 # Dependency to get database session
@@ -20,4 +122,41 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get a session for endpoints that write
+def get_write_db():
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Async engines are only created in async mode (needs aiosqlite + greenlet)
+async_engine = None
+async_write_engine = None
+AsyncSessionLocal = None
+AsyncWriteSessionLocal = None
+
+def init_async_engine(url=ASYNC_DATABASE_URL):
+    """Create the async engine and, in single-writer profiles, its own single-writer engine"""
+    global async_engine, async_write_engine, AsyncSessionLocal, AsyncWriteSessionLocal
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_async_sqlite_engine(url)
+    async_write_engine = async_engine
+    if SQLITE_PROFILES[SQLITE_PROFILE]["single_writer"]:
+        async_write_engine = create_async_sqlite_engine(url, writer=True)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    AsyncWriteSessionLocal = async_sessionmaker(async_write_engine, expire_on_commit=False)
+    return async_engine
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency to get an async session for endpoints that write
+async def get_async_write_db():
+    async with AsyncWriteSessionLocal() as db:
+        yield db
@@ -0,0 +1,110 @@
+"""
+Admin job: move vital signs older than a given age out of `vital_signs`
+into the columnar archive (app.services.vitals_archive).
+
+Run from the backend directory, e.g. nightly:
+
+    python -m app.jobs.archive_vitals --older-than-days 90
+
+History endpoints (/api/vitals/patient/{id} and its /series) and
+similar-case details read archived and live rows together. Endpoints that
+look a reading up by id alone (GET /api/vitals/{id}, GET
+/api/similar-cases/{id}) only see live rows and return 404 once it is
+archived. Run VACUUM afterwards to give the freed pages back to the
+filesystem.
+"""
+import argparse
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from app.database import SessionLocal, WriteSessionLocal
+from app.models.vitals import VitalSigns
+from app.services.vitals_archive import ARCHIVED_COLUMNS, month_of, vitals_archive
+
+SELECTED_COLUMNS = [VitalSigns.patient_id, *[getattr(VitalSigns, c) for c in ARCHIVED_COLUMNS]]
+
+
+def archive_vitals(db, archive, older_than, chunk_size=5000, dry_run=False, write_session=None):
+    """
+    Walk readings recorded before `older_than` in primary-key order, one
+    chunk at a time: append them to their patient/month partitions, then
+    delete them from `vital_signs` and commit. Files are written before the
+    rows are deleted, and appends skip ids already archived, so an
+    interrupted run can simply be repeated. Returns rows archived.
+
+    `db` only reads. Each chunk's DELETE runs in a short session from
+    `write_session` (default: `db`) opened after the partitions are
+    written, so the write lock is not held while they are re-encoded.
+    """
+    archived = 0
+    last_id = 0
+
+    while True:
+        rows = db.execute(
+            select(*SELECTED_COLUMNS)
+            .where(VitalSigns.id > last_id, VitalSigns.recorded_at < older_than)
+            .order_by(VitalSigns.id)
+            .limit(chunk_size)
+        ).mappings().all()
+        # Don't keep the read transaction open while writing files
+        db.rollback()
+        if not rows:
+            break
+        first_id, last_id = last_id, rows[-1]["id"]
+        archived += len(rows)
+        if dry_run:
+            continue
+
+        partitions = defaultdict(list)
+        for row in rows:
+            partitions[row["patient_id"], month_of(row["recorded_at"])].append(row)
+        for (patient_id, month), partition_rows in partitions.items():
+            archive.append(patient_id, month, partition_rows)
+
+        writer = write_session() if write_session else db
+        try:
+            # Same rows as the SELECT: new readings always get higher ids
+            writer.execute(
+                delete(VitalSigns).where(
+                    VitalSigns.id > first_id,
+                    VitalSigns.id <= last_id,
+                    VitalSigns.recorded_at < older_than,
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            writer.commit()
+        finally:
+            if write_session:
+                writer.close()
+
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old vital signs into the columnar archive")
+    parser.add_argument("--older-than-days", type=float, default=90)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report how many rows would be archived without moving them")
+    args = parser.parse_args()
+
+    older_than = datetime.utcnow() - timedelta(days=args.older_than_days)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        archived = archive_vitals(
+            db, vitals_archive, older_than, args.chunk_size, args.dry_run, write_session=WriteSessionLocal
+        )
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {archived} rows recorded before {older_than:%Y-%m-%d %H:%M} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
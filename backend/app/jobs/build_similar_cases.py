@@ -0,0 +1,79 @@
+"""
+Admin job: add existing vital signs to the similar-case index
+(app.services.similar_cases). New readings are indexed as they are stored,
+so this is only needed once, or after --rebuild (e.g. when switching
+SIMILAR_CASES_EMBEDDER).
+
+    python -m app.jobs.build_similar_cases
+    python -m app.jobs.build_similar_cases --rebuild
+
+It can run while the API is up: both append to the same index files under
+a file lock, and the API's workers pick up the job's rows before their
+next search. The job trains the NumPy index itself at the end, rather
+than in the background as the API does.
+
+Readings already moved to the columnar archive are not read back; index
+before archiving (archiving does not remove anything from the index).
+"""
+import argparse
+import shutil
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.vitals import VitalSigns
+from app.services.similar_cases import SIMILAR_CASES_DIR, VITAL_SCALES, CaseIndex
+
+SELECTED_COLUMNS = [VitalSigns.id, VitalSigns.patient_id, VitalSigns.notes,
+                    *(getattr(VitalSigns, c) for c in VITAL_SCALES)]
+
+
+def build_similar_cases(db, index, chunk_size=5000):
+    """
+    Walk vital_signs in primary-key order and add every reading the index
+    does not have yet, then retrain it if it is due. Returns (rows seen,
+    rows added).
+    """
+    seen = added = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(*SELECTED_COLUMNS)
+            .where(VitalSigns.id > last_id)
+            .order_by(VitalSigns.id)
+            .limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        seen += len(rows)
+        added += index.add_readings(rows)
+    index.wait_for_training()
+    if index.needs_training():
+        index.train()
+    index.save()
+    return seen, added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index existing vital signs for similar-case search")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--rebuild", action="store_true", help="discard the existing index first")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        shutil.rmtree(SIMILAR_CASES_DIR, ignore_errors=True)
+    start = time.perf_counter()
+    index = CaseIndex(background_training=False)
+    db = SessionLocal()
+    try:
+        seen, added = build_similar_cases(db, index, args.chunk_size)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {added} of {seen} readings ({len(index)} in the index) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Admin job: recompute NEWS2 score and alert level for stored vital signs.
+
+Run from the backend directory after changing the NEWS2 banding tables:
+
+    python -m app.jobs.rescore_news2 --chunk-size 5000
+
+Rescored readings keep a consistent record: their AI interpretation is
+rendered again with the new score (keeping the trend findings stored in
+it, and using the patient's current medications), and patients whose
+latest reading was rescored get the matching status. API processes with
+the in-memory patient cache may show the old status for up to
+PATIENT_CACHE_TTL; with a Redis cache the entries are dropped.
+"""
+import argparse
+import time
+from datetime import datetime
+
+from sqlalchemy import case, func, select, update
+
+from app.database import SessionLocal
+from app.models.patient import Patient
+from app.models.vitals import VitalSigns
+from app.services.ai_service import RULE_FIELDS, interpret_vitals_batch, trends_of
+from app.services.news2_calculator import NEWS2_BANDS, score_batch
+from app.services.patient_cache import configure_patient_cache, patient_cache
+from app.services.vitals_ingest import STATUS_BY_ALERT
+
+SCORED_COLUMNS = [getattr(VitalSigns, field) for field in dict.fromkeys([*NEWS2_BANDS, *RULE_FIELDS.values()])]
+
+
+def _latest_status():
+    """Status matching each patient's latest reading (correlated on Patient.id)"""
+    level = (
+        select(VitalSigns.alert_level)
+        .where(VitalSigns.patient_id == Patient.id)
+        .order_by(VitalSigns.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return case(*[(level == alert, status) for alert, status in STATUS_BY_ALERT.items()], else_="stable")
+
+
+def rescore_vitals(db, chunk_size=5000, dry_run=False):
+    """
+    Walk `vital_signs` in primary-key order, one chunk at a time, and rewrite
+    `news2_score` / `alert_level` (and the interpretation) where they differ
+    from the current tables, then bring the status of the chunk's patients
+    in line with their latest reading. Each chunk is committed on its own so
+    the job can be interrupted safely. Returns (rows_scanned, rows_updated).
+    """
+    scanned = 0
+    updated = 0
+    last_id = 0
+
+    while True:
+        rows = db.execute(
+            select(
+                VitalSigns.id,
+                VitalSigns.patient_id,
+                VitalSigns.news2_score,
+                VitalSigns.alert_level,
+                VitalSigns.ai_interpretation,
+                *SCORED_COLUMNS,
+            )
+            .where(VitalSigns.id > last_id)
+            .order_by(VitalSigns.id)
+            .limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            break
+
+        columns = {field: [row[field] for row in rows] for field in NEWS2_BANDS}
+        scores, levels = score_batch(columns)
+
+        stale = [
+            (row, int(score), str(level))
+            for row, score, level in zip(rows, scores, levels)
+            if row["news2_score"] != score or row["alert_level"] != level
+        ]
+        if stale and not dry_run:
+            patient_ids = {row["patient_id"] for row, _, _ in stale}
+            medications = dict(db.execute(
+                select(Patient.id, Patient.medications).where(Patient.id.in_(patient_ids))
+            ).all())
+            interpretations = interpret_vitals_batch(
+                [row for row, _, _ in stale],
+                [medications.get(row["patient_id"]) for row, _, _ in stale],
+                [score for _, score, _ in stale],
+                [trends_of(row["ai_interpretation"]) for row, _, _ in stale],
+            )
+            db.execute(update(VitalSigns), [
+                {"id": row["id"], "news2_score": score, "alert_level": level,
+                 "ai_interpretation": interpretation.text}
+                for (row, score, level), interpretation in zip(stale, interpretations)
+            ])
+            # In the same transaction, so a reading recorded meanwhile is not overwritten
+            status = _latest_status()
+            db.execute(
+                update(Patient)
+                .where(Patient.id.in_(patient_ids), Patient.status.is_distinct_from(status))
+                .values(status=status, status_changed_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+            patient_cache.invalidate(*patient_ids)
+
+        scanned += len(rows)
+        updated += len(stale)
+        last_id = rows[-1]["id"]
+
+    return scanned, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore NEWS2 for stored vital signs")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report how many rows would change without writing")
+    args = parser.parse_args()
+
+    # Shared (Redis) cache entries of rescored patients are dropped
+    configure_patient_cache()
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        scanned, updated = rescore_vitals(db, args.chunk_size, args.dry_run)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+
+    verb = "would update" if args.dry_run else "updated"
+    print(f"Scanned {scanned} rows, {verb} {updated} in {elapsed:.2f}s "
+          "(score, alert level, interpretation and patient status)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,73 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.models import Patient, User, VitalSigns
-from app.routes import patients, vitals
+from app.database import DB_MODE, engine, init_async_engine, write_engine
+from app.metrics import MetricsMiddleware, instrument_engine, render as render_metrics
+from app.migrations import AUTO_MIGRATE, init_db
+from app.routes import alerts, patients, vitals, rules, similar_cases, ward
+from app.services import group_commit
+from app.services.patient_cache import configure_patient_cache
+from app.services.similar_cases import close_case_index, open_case_index
+from app.services.rule_engine import get_rules
+from app.telemetry import TimingMiddleware, setup_logging
+
+# Importing this module only builds the app. Everything that touches the
+# database, starts threads or compiles rules happens in startup(), which
+# runs from the lifespan (or explicitly, e.g. in the benchmarks).
+
+
+def startup():
+    # JSON logs through a background queue listener
+    setup_logging()
+
+    # Pool and statement metrics
+    instrument_engine(engine)
+    if write_engine is not engine:
+        instrument_engine(write_engine, name="writer")
+
+    # Create tables and indexes (AUTO_MIGRATE=0: run `python -m app.migrations` instead)
+    if AUTO_MIGRATE:
+        init_db(engine)
+
+    # Compile the interpretation rules once at startup
+    get_rules()
+
+    # Patient cache backend (PATIENT_CACHE: memory, redis://..., off)
+    configure_patient_cache()
+
+    # Similar-case index (SIMILAR_CASES=0 disables it)
+    open_case_index()
+
+    if group_commit.GROUP_COMMIT_ENABLED and group_commit.get_group_committer() is None:
+        from app.database import WriteSessionLocal
+
+        group_commit.start_group_commit(WriteSessionLocal)
+
+    if DB_MODE == "async":
+        from app import database
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+        if database.async_engine is None:
+            instrument_engine(init_async_engine().sync_engine, name="async")
+            if database.async_write_engine is not database.async_engine:
+                instrument_engine(database.async_write_engine.sync_engine, name="async_write")
 
-app = FastAPI(title="Healthcare ERP API")
+
+def shutdown():
+    group_commit.stop_group_commit()
+    close_case_index()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    startup()
+    try:
+        yield
+    finally:
+        shutdown()
+
+
+app = FastAPI(title="Healthcare ERP API", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -16,11 +76,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor"],
 )
 
+# Per-stage timings in the Server-Timing header
+app.add_middleware(TimingMiddleware)
+
+# Per-route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Group commit: vitals writes are batched into shared commits
+if group_commit.GROUP_COMMIT_ENABLED:
+    from app.routes import vitals_group
+
+    app.include_router(vitals_group.router)
+
+# Async mode: async handlers for the hot paths take precedence
+if DB_MODE == "async":
+    from app.routes import patients_async, vitals_async
+
+    app.include_router(patients_async.router)
+    app.include_router(vitals_async.router)
 
 app.include_router(patients.router)
 app.include_router(vitals.router)
+app.include_router(rules.router)
+app.include_router(ward.router)
+app.include_router(alerts.router)
+app.include_router(similar_cases.router)
 
 @app.get("/")
 def read_root():
@@ -30,4 +113,7 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
-
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,208 @@
+"""
+Prometheus metrics served at /metrics.
+
+- HTTP: latency histogram per route template and in-flight requests
+- Pool: time to get a connection (including waiting for one), how long
+  connections stay checked out, and pool size/checked-out/overflow gauges
+  read at scrape time
+- SQL: statement latency by statement type; statements slower than
+  SLOW_QUERY_MS are also logged
+- Clinical: NEWS2 alert levels recorded and interpretation rules fired
+- Group commit: batch sizes and queue depth
+- Patient cache: hits and misses
+"""
+import logging
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+logger = logging.getLogger("app.metrics")
+
+registry = CollectorRegistry()
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], registry=registry,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being served",
+    ["method"], registry=registry,
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time to obtain a pooled connection",
+    ["engine"], registry=registry,
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+POOL_HELD = Histogram(
+    "db_pool_checkout_duration_seconds", "Time a connection stays checked out",
+    ["engine"], registry=registry,
+)
+STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds", "SQL statement latency",
+    ["engine", "statement"], registry=registry,
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+NEWS2_ALERTS = Counter(
+    "news2_alerts_total", "Vitals readings recorded per NEWS2 alert level",
+    ["level"], registry=registry,
+)
+RULES_FIRED = Counter(
+    "interpretation_rules_fired_total", "Interpretation rules fired",
+    ["rule"], registry=registry,
+)
+GROUP_COMMIT_BATCH = Histogram(
+    "vitals_group_commit_batch_rows", "Readings stored per group commit",
+    registry=registry, buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+GROUP_COMMIT_QUEUE = Gauge(
+    "vitals_group_commit_queue_depth", "Readings waiting for a group commit",
+    registry=registry,
+)
+PATIENT_CACHE_LOOKUPS = Counter(
+    "patient_cache_lookups_total", "Patient cache lookups by result",
+    ["result"], registry=registry,
+)
+
+STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK"}
+
+
+def record_readings(alert_levels, rules_fired):
+    """Count recorded readings: their alert levels and the rules each fired"""
+    for level in alert_levels:
+        NEWS2_ALERTS.labels(level).inc()
+    for fired in rules_fired:
+        for rule_id in fired:
+            RULES_FIRED.labels(rule_id).inc()
+
+
+class PoolCollector:
+    """Pool size, checked-out connections and overflow, read at scrape time"""
+
+    def __init__(self):
+        self.pools = {}
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections currently checked out", labels=["engine"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Connections open beyond the pool size", labels=["engine"]
+        )
+        for name, pool in self.pools.items():
+            for family, attr in ((size, "size"), (checked_out, "checkedout"), (overflow, "overflow")):
+                if hasattr(pool, attr):
+                    family.add_metric([name], getattr(pool, attr)())
+        yield from (size, checked_out, overflow)
+
+
+_pool_collector = PoolCollector()
+registry.register(_pool_collector)
+
+
+def instrument_engine(engine, name="main"):
+    """Attach pool and statement metrics to a (sync) engine, once"""
+    pool = engine.pool
+    if _pool_collector.pools.get(name) is pool:
+        return
+    _pool_collector.pools[name] = pool
+    wait = POOL_WAIT.labels(name)
+    held = POOL_HELD.labels(name)
+
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            wait.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        record.info["checkout_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        start = record.info.pop("checkout_at", None)
+        if start is not None:
+            held.observe(time.perf_counter() - start)
+
+    # Statements on one connection never nest: one start time per connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["statement_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        if exception_context.connection is not None:
+            exception_context.connection.info.pop("statement_start", None)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("statement_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        STATEMENT_LATENCY.labels(name, kind if kind in STATEMENT_TYPES else "OTHER").observe(elapsed)
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            logger.warning(
+                "slow query",
+                extra={"engine": name, "elapsed_ms": round(elapsed * 1000, 3), "statement": statement},
+            )
+
+    return engine
+
+
+def render():
+    """(body, content type) of the current metrics in Prometheus text format"""
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Route template (e.g. /api/patients/{patient_id}), never the raw
+            # path, so label cardinality stays bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.labels(method, path, str(status)).observe(time.perf_counter() - start)
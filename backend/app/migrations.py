@@ -0,0 +1,50 @@
+"""
+Schema setup for the backend database.
+
+`create_all` only creates missing tables, so nullable columns and indexes
+added to existing tables and non-ORM objects (the patient search index, the
+latest_vitals triggers) are created here too. Safe to run repeatedly.
+
+The API runs this at startup unless AUTO_MIGRATE=0; deployments that set
+that run it once per release instead:
+
+    python -m app.migrations
+"""
+import os
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+from app.database import Base, engine
+import app.models  # noqa: F401  (registers the tables on Base)
+from app.services.patient_search import install_patient_search
+from app.services.ward_snapshot import install_latest_vitals
+
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1") != "0"
+
+
+def add_missing_columns(bind):
+    """ALTER TABLE ... ADD COLUMN for nullable model columns the table lacks"""
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+
+
+def init_db(bind=engine):
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    install_patient_search(bind)
+    install_latest_vitals(bind)
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Database schema is up to date")
@@ -1,5 +1,6 @@
+from app.models.latest_vitals import LatestVitals
 from app.models.patient import Patient
 from app.models.user import User
 from app.models.vitals import VitalSigns
 
-__all__ = ["Patient", "User", "VitalSigns"]
\ No newline at end of file
+__all__ = ["LatestVitals", "Patient", "User", "VitalSigns"]
\ No newline at end of file
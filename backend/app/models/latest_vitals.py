@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String, Index
+from app.database import Base
+
+class LatestVitals(Base):
+    """
+    Projection of each patient's most recent reading, maintained by triggers
+    on vital_signs (see app.services.ward_snapshot). Never written directly.
+    """
+    __tablename__ = "latest_vitals"
+
+    patient_id = Column(Integer, ForeignKey("patients.id"), primary_key=True)
+    vitals_id = Column(Integer, nullable=False)
+    recorded_at = Column(DateTime)
+
+    blood_pressure_systolic = Column(Integer)
+    blood_pressure_diastolic = Column(Integer)
+    heart_rate = Column(Integer)
+    temperature = Column(Float)
+    respiratory_rate = Column(Integer)
+    oxygen_saturation = Column(Integer)
+
+    news2_score = Column(Integer)
+    alert_level = Column(String)
+
+    __table_args__ = (
+        # Ward snapshot sorted by score
+        Index("ix_latest_vitals_news2", "news2_score", "patient_id"),
+    )
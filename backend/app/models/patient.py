@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Index, LargeBinary
 from app.database import Base
 from datetime import date
 
@@ -14,4 +14,20 @@ class Patient(Base):
     allergies = Column(Text, nullable=True)
     medications = Column(Text, nullable=True)
     last_visit = Column(Date, default=date.today)
-    status = Column(String, default="stable")  # stable, monitoring, alert
\ No newline at end of file
+    status = Column(String, default="stable")  # stable, monitoring, alert
+    status_changed_at = Column(DateTime, nullable=True)  # last status change by a reading
+    ward = Column(String, nullable=True)
+
+    # Rolling vitals trends (app.services.trends), updated on every reading
+    trend_state = Column(LargeBinary, nullable=True)
+    trend_updated_at = Column(DateTime, nullable=True)
+    last_alert_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination on the patient list
+        Index("ix_patients_last_visit_id", "last_visit", "id"),
+        Index("ix_patients_status_id", "status", "id"),
+        # Name prefix lookups for short search queries
+        Index("ix_patients_full_name", "full_name"),
+        Index("ix_patients_ward_id", "ward", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -32,4 +32,9 @@ class VitalSigns(Base):
     recorded_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
-    patient = relationship("Patient", backref="vital_signs")
\ No newline at end of file
+    patient = relationship("Patient", backref="vital_signs")
+
+    __table_args__ = (
+        # Per-patient history in time order
+        Index("ix_vital_signs_patient_recorded", "patient_id", "recorded_at"),
+    )
@@ -0,0 +1,49 @@
+"""
+Fast JSON path for list endpoints.
+
+Handlers that already select exactly the response columns from our own
+database return `rows_response(rows)` instead of a list of ORM objects: the
+rows go straight to orjson (stdlib json if it is not installed) without a
+pydantic model per row. The route's response_model still documents the
+shape; it is just not re-validated.
+"""
+import json
+from datetime import date, datetime
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+
+def row_dicts(rows):
+    """SQLAlchemy rows of one query (or dicts) -> list of dicts"""
+    if not rows or isinstance(rows[0], dict):
+        return list(rows)
+    fields = rows[0]._fields
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def rows_response(rows, headers=None):
+    return FastJSONResponse(row_dicts(rows), headers=headers)
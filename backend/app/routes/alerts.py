@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.services.alert_bus import alert_bus
+import json
+
+router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15
+
+def format_sse(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+async def alert_event_stream(request: Request, subscription, heartbeat=HEARTBEAT_SECONDS):
+    """SSE frames for a subscription until the client disconnects"""
+    try:
+        # Sent straight away so clients (and tests) know the subscription is live
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            events, dropped = await subscription.get(timeout=heartbeat)
+            if dropped:
+                yield format_sse({"dropped": dropped}, event="dropped")
+            for event in events:
+                yield format_sse(event, event=event["type"], event_id=event["id"])
+            if not events and not dropped:
+                yield ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+# Live alert and status-change events (Server-Sent Events)
+@router.get("/stream")
+async def stream_alerts(
+    request: Request,
+    ward: Optional[List[str]] = Query(None, description="Repeat to follow several wards"),
+    patient_id: Optional[List[int]] = Query(None, description="Repeat to follow several patients"),
+):
+    subscription = alert_bus.subscribe(wards=ward or (), patient_ids=patient_id or ())
+    return StreamingResponse(
+        alert_event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
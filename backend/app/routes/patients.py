@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Literal, Optional
+from app.database import get_db, get_write_db
 from app.models.patient import Patient
+from app.responses import rows_response
+from app.services import patient_search
+from app.services.patient_cache import cached_patient, patient_cache
 from pydantic import BaseModel
 from datetime import date
+import base64
+import json
 
 router = APIRouter(prefix="/api/patients", tags=["patients"])
 
@@ -17,6 +24,7 @@ class PatientCreate(BaseModel):
     gender: str
     allergies: str = ""
     medications: str = ""
+    ward: Optional[str] = None
 
 class PatientResponse(BaseModel):
     id: int
@@ -26,36 +34,118 @@ class PatientResponse(BaseModel):
     gender: str
     last_visit: date
     status: str
+    ward: Optional[str] = None
 
     class Config:
         from_attributes = True
 
-# Get all patients
+LIST_COLUMNS = [getattr(Patient, name) for name in PatientResponse.model_fields]
+
+# Rows fetched per round trip when streaming
+STREAM_BATCH_SIZE = 1000
+
+def encode_cursor(order_by, row):
+    key = [row.id] if order_by == "id" else [row.last_visit and row.last_visit.isoformat(), row.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(order_by, cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if order_by == "id":
+            (last_id,) = key
+            return int(last_id)
+        last_visit, last_id = key
+        return (date.fromisoformat(last_visit) if last_visit else None), int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def build_patient_list_query(order_by, status=None, cursor=None):
+    """
+    Keyset query for the patient list. `id` pages ascend by id; `last_visit`
+    pages start from the most recent visit (ties broken by id, patients
+    without a visit date last).
+    """
+    query = select(*LIST_COLUMNS)
+    if status:
+        query = query.where(Patient.status == status)
+
+    if order_by == "id":
+        if cursor is not None:
+            query = query.where(Patient.id > decode_cursor(order_by, cursor))
+        return query.order_by(Patient.id)
+
+    if cursor is not None:
+        last_visit, last_id = decode_cursor(order_by, cursor)
+        if last_visit is None:
+            query = query.where(Patient.last_visit.is_(None), Patient.id < last_id)
+        else:
+            query = query.where(or_(
+                Patient.last_visit < last_visit,
+                and_(Patient.last_visit == last_visit, Patient.id < last_id),
+                Patient.last_visit.is_(None),
+            ))
+    return query.order_by(Patient.last_visit.desc().nulls_last(), Patient.id.desc())
+
+def stream_patients_ndjson(bind, query):
+    # Own session: the request-scoped one may be closed while we stream
+    with Session(bind=bind) as db:
+        rows = db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        for row in rows:
+            yield json.dumps(row._asdict(), default=str) + "\n"
+
+# Rows per page once a client pages with a cursor but gives no limit
+DEFAULT_PAGE_SIZE = 100
+
+# Get all patients (keyset paginated; next page cursor in X-Next-Cursor).
+# Without limit or cursor every matching patient is returned, as before.
 @router.get("/", response_model=List[PatientResponse])
-def get_patients(db: Session = Depends(get_db)):
-    patients = db.query(Patient).all()
-    return patients
+def get_patients(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "last_visit"] = "id",
+    status: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_db),
+):
+    query = build_patient_list_query(order_by, status, cursor)
+
+    # Streaming mode returns every matching row as NDJSON in flat memory
+    if stream:
+        return StreamingResponse(
+            stream_patients_ndjson(db.get_bind(), query),
+            media_type="application/x-ndjson",
+        )
 
-# Search patients
+    if limit is None and cursor is None:
+        return rows_response(db.execute(query).all())
+
+    limit = limit or DEFAULT_PAGE_SIZE
+    patients = db.execute(query.limit(limit)).all()
+    headers = {}
+    if len(patients) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(order_by, patients[-1])
+    return rows_response(patients, headers)
+
+# Search patients (ranked; hospital-number prefix matches first)
 @router.get("/search", response_model=List[PatientResponse])
-def search_patients(q: str, db: Session = Depends(get_db)):
-    patients = db.query(Patient).filter(
-        (Patient.hospital_number.contains(q)) | 
-        (Patient.full_name.contains(q))
-    ).all()
-    return patients
-
-# Get single patient
+def search_patients(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    return rows_response(patient_search.search_patients(db, q, limit, columns=LIST_COLUMNS))
+
+# Get single patient (read through the patient cache)
 @router.get("/{patient_id}", response_model=PatientResponse)
 def get_patient(patient_id: int, db: Session = Depends(get_db)):
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = cached_patient(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     return patient
 
 # Create new patient
 @router.post("/", response_model=PatientResponse)
-def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
+def create_patient(patient: PatientCreate, db: Session = Depends(get_write_db)):
     # Check if hospital number already exists
     existing = db.query(Patient).filter(
         Patient.hospital_number == patient.hospital_number
@@ -67,4 +157,5 @@ def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
     db.add(db_patient)
     db.commit()
     db.refresh(db_patient)
+    patient_cache.invalidate(db_patient.id)
     return db_patient
\ No newline at end of file
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.routes.patients import PatientResponse
+from app.services.patient_cache import cached_patient
+
+# Async versions of the hot patient endpoints (DB_MODE=async), registered
+# ahead of app.routes.patients. The :int path converter lets /search fall
+# through to the sync handler.
+router = APIRouter(prefix="/api/patients", tags=["patients"])
+
+# Get single patient (read through the patient cache)
+@router.get("/{patient_id:int}", response_model=PatientResponse)
+async def get_patient(patient_id: int, db: AsyncSession = Depends(get_async_db)):
+    patient = await db.run_sync(cached_patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return patient
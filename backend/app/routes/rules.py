@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from app.services.interpretation_cache import interpretation_cache
+from app.services.rule_engine import get_rules, reload_rules
+
+router = APIRouter(prefix="/api/rules", tags=["rules"])
+
+class RuleSetResponse(BaseModel):
+    version: str
+    source: str
+    rules: List[str]
+
+def _describe(rules):
+    return {
+        "version": rules.version,
+        "source": rules.source,
+        "rules": [rule.id for rule in rules.rules],
+    }
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+    rules_version: Optional[str]
+
+# Active interpretation rule set
+@router.get("/", response_model=RuleSetResponse)
+def get_rule_set():
+    return _describe(get_rules())
+
+# Re-read the rule file without a redeploy
+@router.post("/reload", response_model=RuleSetResponse)
+def reload_rule_set():
+    try:
+        rules = reload_rules()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Rule file rejected: {e}")
+    return _describe(rules)
+
+# Interpretation cache hit/miss counters
+@router.get("/cache", response_model=CacheStatsResponse)
+def get_cache_stats():
+    return interpretation_cache.stats()
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.models.patient import Patient
+from app.models.vitals import VitalSigns
+from app.services.similar_cases import VITAL_SCALES, get_case_index
+from app.services.vitals_archive import get_vitals_archive
+from app.telemetry import span
+from datetime import datetime
+
+router = APIRouter(prefix="/api/similar-cases", tags=["similar-cases"])
+
+class CaseQuery(BaseModel):
+    blood_pressure_systolic: Optional[int] = None
+    blood_pressure_diastolic: Optional[int] = None
+    heart_rate: Optional[int] = None
+    temperature: Optional[float] = None
+    respiratory_rate: Optional[int] = None
+    oxygen_saturation: Optional[int] = None
+    news2_score: Optional[int] = None
+    notes: str = ""
+    exclude_patient_id: Optional[int] = None
+
+class SimilarCase(BaseModel):
+    vitals_id: int
+    patient_id: int
+    distance: float
+    # From the live tables, or the archive once the reading has moved there
+    full_name: Optional[str] = None
+    recorded_at: Optional[datetime] = None
+    news2_score: Optional[int] = None
+    alert_level: Optional[str] = None
+    notes: Optional[str] = None
+
+DETAIL_COLUMNS = [
+    VitalSigns.id,
+    Patient.full_name,
+    VitalSigns.recorded_at,
+    VitalSigns.news2_score,
+    VitalSigns.alert_level,
+    VitalSigns.notes,
+]
+
+def case_index_dependency():
+    index = get_case_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Similar-case index is disabled")
+    return index
+
+def archived_details(db, archive, patient_ids):
+    """Vitals id -> details of the archived readings of some patients"""
+    names = dict(db.execute(select(Patient.id, Patient.full_name).where(Patient.id.in_(patient_ids))).all())
+    details = {}
+    for patient_id in patient_ids:
+        for row in archive.read_rows(patient_id):
+            details[row["id"]] = {
+                "id": row["id"],
+                "full_name": names.get(patient_id),
+                **{name: row[name] for name in ("recorded_at", "news2_score", "alert_level", "notes")},
+            }
+    return details
+
+def with_details(db, matches, archive=None):
+    """Attach patient name and reading details to index matches (one query for the k ids)"""
+    rows = db.execute(
+        select(*DETAIL_COLUMNS)
+        .join(Patient, Patient.id == VitalSigns.patient_id)
+        .where(VitalSigns.id.in_([vitals_id for vitals_id, _, _ in matches]))
+    ).mappings().all()
+    details = {row["id"]: row for row in rows}
+    archived_patients = {patient_id for vitals_id, patient_id, _ in matches if vitals_id not in details}
+    if archived_patients and archive is not None:
+        details.update(archived_details(db, archive, archived_patients))
+    results = []
+    for vitals_id, patient_id, distance in matches:
+        detail = dict(details.get(vitals_id, {}))
+        detail.pop("id", None)
+        results.append({"vitals_id": vitals_id, "patient_id": patient_id, "distance": distance, **detail})
+    return results
+
+# Readings most similar to a stored one (other patients only by default)
+@router.get("/{vitals_id}", response_model=List[SimilarCase])
+async def get_similar_cases(
+    vitals_id: int,
+    k: int = Query(10, ge=1, le=100),
+    other_patients: bool = True,
+    db: Session = Depends(get_db),
+    index=Depends(case_index_dependency),
+    archive=Depends(get_vitals_archive),
+):
+    vitals = await run_in_threadpool(db.get, VitalSigns, vitals_id)
+    if vitals is None:
+        raise HTTPException(status_code=404, detail="Vitals record not found")
+    query = {column: getattr(vitals, column) for column in [*VITAL_SCALES, "notes"]}
+
+    with span("ann_search"):
+        matches = await run_in_threadpool(
+            index.search, query, k + 1, vitals.patient_id if other_patients else None
+        )
+    matches = [m for m in matches if m[0] != vitals_id][:k]
+    return await run_in_threadpool(with_details, db, matches, archive)
+
+# Readings most similar to an ad-hoc presentation
+@router.post("/search", response_model=List[SimilarCase])
+async def search_similar_cases(
+    query: CaseQuery,
+    k: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    index=Depends(case_index_dependency),
+    archive=Depends(get_vitals_archive),
+):
+    with span("ann_search"):
+        matches = await run_in_threadpool(index.search, query.dict(), k, query.exclude_patient_id)
+    return await run_in_threadpool(with_details, db, matches, archive)
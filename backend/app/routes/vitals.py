@@ -1,16 +1,27 @@
-from app.services.ai_service import get_vitals_interpretation
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models.vitals import VitalSigns
+from typing import Dict, List, Literal, Optional
+from app.database import get_db, get_write_db
 from app.models.patient import Patient
-from app.services.news2_calculator import calculate_news2, get_alert_level
-from pydantic import BaseModel
-from datetime import datetime
+from app.models.vitals import VitalSigns
+from app.services.vitals_ingest import PatientNotFound, ingest_vitals_batch, record_vitals_reading
+from app.responses import rows_response
+from app.services.downsampling import bucket_aggregate, lttb
+from app.services.trends import TREND_FIELDS, TREND_WINDOW_HOURS, TrendState, hours_between, trend_findings
+from app.services.vitals_archive import get_vitals_archive
+from app.telemetry import span
+from pydantic import BaseModel, ValidationError
+from datetime import datetime, timedelta
+import json
+import logging
+import numpy as np
 
 router = APIRouter(prefix="/api/vitals", tags=["vitals"])
 
+logger = logging.getLogger(__name__)
+
 # Pydantic models
 class VitalsCreate(BaseModel):
     patient_id: int
@@ -33,104 +44,295 @@ class VitalsResponse(BaseModel):
     temperature: float
     respiratory_rate: int
     oxygen_saturation: int
-    weight: float = None
+    weight: Optional[float] = None
     news2_score: int
     alert_level: str
-    ai_interpretation: str = None
+    ai_interpretation: Optional[str] = None
    # ai_recommendations: str = None
-    notes: str = None
+    notes: Optional[str] = None
     recorded_at: datetime
     recorded_by_email: str
 
     class Config:
         from_attributes = True
 
+# Columns selected for history responses (VitalsResponse, in order)
+HISTORY_COLUMNS = [getattr(VitalSigns, name) for name in VitalsResponse.model_fields]
+
+class BulkInserted(BaseModel):
+    index: int
+    id: int
+
+class BulkRowError(BaseModel):
+    index: int
+    detail: str
+
+class BulkVitalsResponse(BaseModel):
+    received: int
+    inserted: List[BulkInserted]
+    errors: List[BulkRowError]
+
+class SeriesPoints(BaseModel):
+    t: List[datetime]
+    v: List[float]
+
+class VitalsSeriesResponse(BaseModel):
+    patient_id: int
+    method: str
+    since: Optional[datetime]
+    until: Optional[datetime]
+    raw_count: int
+    series: Dict[str, SeriesPoints]
+
+class TrendValue(BaseModel):
+    ewma: Optional[float]
+    slope_per_hour: Optional[float]
+
+class VitalsTrendsResponse(BaseModel):
+    patient_id: int
+    window_hours: float
+    readings: int
+    updated_at: Optional[datetime]
+    hours_since_alert: Optional[float]
+    trends: Dict[str, TrendValue]
+    findings: List[str]
+
+# Columns returned by the chart series endpoint
+SERIES_FIELDS = [
+    "blood_pressure_systolic",
+    "blood_pressure_diastolic",
+    "heart_rate",
+    "temperature",
+    "respiratory_rate",
+    "oxygen_saturation",
+    "news2_score",
+]
+
+# Upper bound on readings accepted by one bulk request
+MAX_BULK_READINGS = 10000
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
 # Record new vitals
 @router.post("/", response_model=VitalsResponse)
-def record_vitals(vitals: VitalsCreate, db: Session = Depends(get_db)):
-    print(f"=== RECORDING VITALS FOR PATIENT {vitals.patient_id} ===")
-    
-    # Check if patient exists
-    patient = db.query(Patient).filter(Patient.id == vitals.patient_id).first()
-    if not patient:
+def record_vitals(vitals: VitalsCreate, db: Session = Depends(get_write_db)):
+    try:
+        row, interpretation = record_vitals_reading(db, vitals.dict())
+    except PatientNotFound:
         raise HTTPException(status_code=404, detail="Patient not found")
+    except Exception as e:
+        db.rollback()
+        logger.error("vitals commit failed", extra={"patient_id": vitals.patient_id, "error": str(e)})
+        raise HTTPException(status_code=500, detail=f"Failed to save vitals: {str(e)}")
     
-    print(f"Patient found: {patient.full_name}")
-    
-    # Calculate NEWS2 score
-    vitals_dict = vitals.dict()
-    news2_score = calculate_news2(vitals_dict)
-    alert = get_alert_level(news2_score)
-    
-    print(f"NEWS2 Score: {news2_score}, Alert Level: {alert['level']}")
-    
-    # Get AI interpretation
-    ai_interpretation = get_vitals_interpretation(
-        vitals_data=vitals_dict,
-        patient_data=patient,
-        news2_score=news2_score,
-        alert_level=alert
-    )
-    
-    print("AI interpretation generated")
-    
-    # Create vitals record
-    db_vitals = VitalSigns(
-        **vitals_dict,
-        news2_score=news2_score,
-        alert_level=alert['level'],
-        ai_interpretation=ai_interpretation
+    logger.debug(
+        "vitals recorded",
+        extra={
+            "patient_id": row['patient_id'],
+            "vitals_id": row['id'],
+            "news2_score": row['news2_score'],
+            "alert_level": row['alert_level'],
+            "rules_fired": interpretation.rules_fired,
+            "rules_ms": interpretation.elapsed_ms,
+        },
     )
-    
-    print(f"Vitals object created: {db_vitals}")
-    
-    # Map alert levels to patient status
-    status_mapping = {
-        'low': 'stable',
-        'medium': 'monitoring',
-        'high': 'alert'
-    }
-    patient.status = status_mapping.get(alert['level'], 'stable')
-    
-    print(f"Patient status updated to: {patient.status}")
-    
-    # Add both to session
-    db.add(db_vitals)
-    db.add(patient)
-    
-    print("Added to session, attempting commit...")
-    
+    return row
+
+def _parse_reading(index, item, readings, errors):
+    if not isinstance(item, dict):
+        errors.append({"index": index, "detail": "Expected a JSON object"})
+        return
+    try:
+        readings.append((index, VitalsCreate(**item)))
+    except ValidationError as e:
+        errors.append({"index": index, "detail": str(e)})
+
+async def _iter_ndjson(request: Request):
+    """Yield decoded NDJSON lines from the request body as they arrive"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    yield buffer
+
+# Record many vitals at once (JSON array or NDJSON stream)
+@router.post("/bulk", response_model=BulkVitalsResponse)
+async def record_vitals_bulk(request: Request, db: Session = Depends(get_write_db)):
+    readings = []
+    errors = []
+    received = 0
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_CONTENT_TYPES:
+        async for line in _iter_ndjson(request):
+            if not line.strip():
+                continue
+            if received >= MAX_BULK_READINGS:
+                raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_READINGS} readings per request")
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                errors.append({"index": received, "detail": f"Invalid JSON: {e}"})
+            else:
+                _parse_reading(received, item, readings, errors)
+            received += 1
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of vitals")
+        if len(items) > MAX_BULK_READINGS:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_READINGS} readings per request")
+        for index, item in enumerate(items):
+            _parse_reading(index, item, readings, errors)
+        received = len(items)
+
     try:
-        db.commit()
-        print("COMMIT SUCCESSFUL")
-        db.refresh(db_vitals)
-        print(f"Vitals saved with ID: {db_vitals.id}")
-        
-        # Verify it was actually saved
-        check = db.query(VitalSigns).filter(VitalSigns.id == db_vitals.id).first()
-        print(f"Verification query result: {check}")
-        
+        inserted, missing = await run_in_threadpool(ingest_vitals_batch, db, readings)
     except Exception as e:
-        db.rollback()
-        print(f"ERROR DURING COMMIT: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save vitals: {str(e)}")
-    
-    print(f"=== RETURNING VITALS ===")
-    return db_vitals
-# Get patient's vital history
+
+    errors.extend(missing)
+    errors.sort(key=lambda e: e["index"])
+    return {"received": received, "inserted": inserted, "errors": errors}
+
+def _time_window(query, since, until):
+    if since is not None:
+        query = query.where(VitalSigns.recorded_at >= since)
+    if until is not None:
+        query = query.where(VitalSigns.recorded_at < until)
+    return query
+
+def merge_archived(vitals, archived, limit):
+    """Newest `limit` of live rows (ORM objects or rows) and archived row dicts, newest first"""
+    if not archived:
+        return vitals
+    return sorted(
+        [*vitals, *archived],
+        key=lambda v: v["recorded_at"] if isinstance(v, dict) else v.recorded_at,
+        reverse=True,
+    )[:limit]
+
+def history_rows(vitals):
+    """Merged history -> VitalsResponse-shaped dicts (archived rows carry extra columns)"""
+    fields = list(VitalsResponse.model_fields)  # = HISTORY_COLUMNS
+    return [
+        {name: v[name] for name in fields} if isinstance(v, dict) else dict(zip(fields, v))
+        for v in vitals
+    ]
+
+# Get patient's vital history (newest first)
 @router.get("/patient/{patient_id}", response_model=List[VitalsResponse])
-def get_patient_vitals(patient_id: int, db: Session = Depends(get_db)):
-    print(f"=== FETCHING VITALS FOR PATIENT {patient_id} ===")
-    
-    vitals = db.query(VitalSigns).filter(
-        VitalSigns.patient_id == patient_id
-    ).order_by(VitalSigns.recorded_at.desc()).all()
+def get_patient_vitals(
+    patient_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    archive=Depends(get_vitals_archive),
+):
+    query = _time_window(select(*HISTORY_COLUMNS).where(VitalSigns.patient_id == patient_id), since, until)
+    with span("query"):
+        vitals = db.execute(query.order_by(VitalSigns.recorded_at.desc()).limit(limit)).all()
+    with span("archive"):
+        archived = archive.read_rows(patient_id, since, until, limit)
+    vitals = merge_archived(vitals, archived, limit)
     
-    print(f"Found {len(vitals)} vitals records")
-    
-    return vitals
+    logger.debug(
+        "vitals history fetched",
+        extra={"patient_id": patient_id, "rows": len(vitals), "archived_rows": len(archived)},
+    )
+
+    # Rows come from our own tables: serialize them directly, without per-row validation
+    with span("serialize"):
+        return rows_response(history_rows(vitals))
+
+# Downsampled vitals series for charts, e.g. last 72h at 200 points
+@router.get("/patient/{patient_id}/series", response_model=VitalsSeriesResponse)
+def get_patient_vitals_series(
+    patient_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    hours: Optional[float] = Query(None, gt=0, description="Window ending at `until` (or now)"),
+    points: int = Query(200, ge=3, le=5000),
+    method: Literal["lttb", "mean", "min", "max"] = "lttb",
+    db: Session = Depends(get_db),
+    archive=Depends(get_vitals_archive),
+):
+    if hours is not None and since is None:
+        since = (until or datetime.utcnow()) - timedelta(hours=hours)
+
+    columns = [getattr(VitalSigns, field) for field in SERIES_FIELDS]
+    query = _time_window(
+        select(VitalSigns.recorded_at, *columns).where(VitalSigns.patient_id == patient_id),
+        since, until,
+    ).order_by(VitalSigns.recorded_at)
+    rows = db.execute(query).all()
+    archived = archive.read_columns(patient_id, SERIES_FIELDS, since, until)
+
+    # Archived readings first, then live ones, in time order
+    times = np.concatenate([
+        archived["recorded_at"], np.array([row[0] for row in rows], dtype="datetime64[us]")
+    ])
+    order = np.argsort(times, kind="stable")
+    seconds = times[order].astype(np.int64) / 1e6
+
+    series = {}
+    for i, field in enumerate(SERIES_FIELDS, start=1):
+        values = np.concatenate([
+            archived[field].astype(float), np.array([row[i] for row in rows], dtype=float)
+        ])[order]
+        present = ~np.isnan(values)
+        x, y = seconds[present], values[present]
+        if method == "lttb":
+            keep = lttb(x, y, points)
+            x, y = x[keep], y[keep]
+        else:
+            x, y = bucket_aggregate(x, y, points, method)
+        series[field] = {
+            "t": (x * 1e6).astype(np.int64).astype("datetime64[us]").tolist(),
+            "v": y.tolist(),
+        }
+
+    return {
+        "patient_id": patient_id,
+        "method": method,
+        "since": since,
+        "until": until,
+        "raw_count": len(times),
+        "series": series,
+    }
+
+# Rolling trends kept on the patient row (no history is read)
+@router.get("/patient/{patient_id}/trends", response_model=VitalsTrendsResponse)
+def get_patient_vitals_trends(patient_id: int, db: Session = Depends(get_db)):
+    patient = db.execute(
+        select(Patient.trend_state, Patient.trend_updated_at, Patient.last_alert_at)
+        .where(Patient.id == patient_id)
+    ).first()
+    if patient is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    state = TrendState.from_bytes(patient.trend_state)
+    hours_since_alert = hours_between(patient.last_alert_at, datetime.utcnow())
+    return {
+        "patient_id": patient_id,
+        "window_hours": TREND_WINDOW_HOURS,
+        "readings": state.readings,
+        "updated_at": patient.trend_updated_at,
+        "hours_since_alert": hours_since_alert,
+        "trends": {
+            name: {"ewma": state.ewma(name), "slope_per_hour": state.slope(name)}
+            for name in TREND_FIELDS
+        },
+        "findings": trend_findings(state, hours_since_alert),
+    }
 
-# Get single vitals record
+# Get single vitals record (live rows only: archived ones come back through the patient history)
 @router.get("/{vitals_id}", response_model=VitalsResponse)
 def get_vitals(vitals_id: int, db: Session = Depends(get_db)):
     vitals = db.query(VitalSigns).filter(VitalSigns.id == vitals_id).first()
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db, get_async_write_db
+from app.models.vitals import VitalSigns
+from app.responses import rows_response
+from app.routes.vitals import HISTORY_COLUMNS, VitalsCreate, VitalsResponse, history_rows, merge_archived
+from app.services.vitals_archive import get_vitals_archive
+from app.services.vitals_ingest import PatientNotFound, record_vitals_reading
+from datetime import datetime
+
+# Async versions of the hot vitals endpoints (DB_MODE=async). They are
+# registered ahead of app.routes.vitals, so the remaining endpoints there
+# still serve everything else.
+router = APIRouter(prefix="/api/vitals", tags=["vitals"])
+
+# Record new vitals (same write path as the sync handler)
+@router.post("/", response_model=VitalsResponse)
+async def record_vitals(vitals: VitalsCreate, db: AsyncSession = Depends(get_async_write_db)):
+    vitals_dict = vitals.dict()
+    try:
+        row, _ = await db.run_sync(record_vitals_reading, vitals_dict)
+    except PatientNotFound:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to save vitals: {str(e)}")
+    return row
+
+# Get patient's vital history (newest first)
+@router.get("/patient/{patient_id:int}", response_model=List[VitalsResponse])
+async def get_patient_vitals(
+    patient_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+    archive=Depends(get_vitals_archive),
+):
+    query = select(*HISTORY_COLUMNS).where(VitalSigns.patient_id == patient_id)
+    if since is not None:
+        query = query.where(VitalSigns.recorded_at >= since)
+    if until is not None:
+        query = query.where(VitalSigns.recorded_at < until)
+    result = await db.execute(query.order_by(VitalSigns.recorded_at.desc()).limit(limit))
+    archived = await run_in_threadpool(archive.read_rows, patient_id, since, until, limit)
+    return rows_response(history_rows(merge_archived(result.all(), archived, limit)))
+
+# Get single vitals record
+@router.get("/{vitals_id:int}", response_model=VitalsResponse)
+async def get_vitals(vitals_id: int, db: AsyncSession = Depends(get_async_db)):
+    vitals = await db.get(VitalSigns, vitals_id)
+    if not vitals:
+        raise HTTPException(status_code=404, detail="Vitals record not found")
+    return vitals
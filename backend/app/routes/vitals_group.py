@@ -0,0 +1,37 @@
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.routes.vitals import VitalsCreate, VitalsResponse
+from app.services.group_commit import QueueFull, get_group_committer
+from app.services.vitals_ingest import PatientNotFound
+from app.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# Group-commit version of the vitals write endpoint (VITALS_GROUP_COMMIT=1).
+# Registered ahead of app.routes.vitals; the handler is async so waiting for
+# the batch commit does not hold a threadpool thread.
+router = APIRouter(prefix="/api/vitals", tags=["vitals"])
+
+# Record new vitals (acknowledged once the batch holding it is committed)
+@router.post("/", response_model=VitalsResponse)
+async def record_vitals(vitals: VitalsCreate, committer=Depends(get_group_committer)):
+    try:
+        future = committer.submit(vitals.dict())
+    except QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Vitals queue is full, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        with span("group_commit"):
+            row, _ = await asyncio.wrap_future(future)
+    except PatientNotFound:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save vitals: {str(e)}")
+    return row
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from app.database import get_db
+from app.services.ward_snapshot import build_snapshot_query
+from app.telemetry import span
+from datetime import datetime
+
+router = APIRouter(prefix="/api/ward", tags=["ward"])
+
+class WardSnapshotRow(BaseModel):
+    patient_id: int
+    hospital_number: str
+    full_name: str
+    status: Optional[str]
+    ward: Optional[str]
+    vitals_id: Optional[int]
+    recorded_at: Optional[datetime]
+    blood_pressure_systolic: Optional[int]
+    blood_pressure_diastolic: Optional[int]
+    heart_rate: Optional[int]
+    temperature: Optional[float]
+    respiratory_rate: Optional[int]
+    oxygen_saturation: Optional[int]
+    news2_score: Optional[int]
+    alert_level: Optional[str]
+
+# Every patient with their latest reading, in one query
+@router.get("/snapshot", response_model=List[WardSnapshotRow])
+def get_ward_snapshot(
+    status: Optional[List[str]] = Query(None, description="Repeat to match several statuses"),
+    ward: Optional[List[str]] = Query(None, description="Repeat to match several wards"),
+    sort: Literal["score_desc", "score_asc", "recorded_at", "id"] = "score_desc",
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    with span("query"):
+        rows = db.execute(build_snapshot_query(status, sort, limit, ward)).mappings().all()
+    return rows
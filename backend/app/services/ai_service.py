@@ -1,103 +1,162 @@
-def get_vitals_interpretation(vitals_data, patient_data, news2_score, alert_level):
+import time
+from dataclasses import dataclass
+from typing import List
+
+from app.services.interpretation_cache import interpretation_cache
+from app.services.rule_engine import get_rules
+
+# Rule engine field names for the VitalSigns columns
+RULE_FIELDS = {
+    'sbp': 'blood_pressure_systolic',
+    'dbp': 'blood_pressure_diastolic',
+    'hr': 'heart_rate',
+    'temp': 'temperature',
+    'rr': 'respiratory_rate',
+    'spo2': 'oxygen_saturation',
+}
+
+FOOTER = "[AI SUPPORT: Validation by clinician required]"
+
+# Precision of the readings that are cached (temperature to 0.1°C,
+# everything else whole numbers). Readings with more precision are rare
+# and evaluated without the cache: rounding could change the result.
+RULE_PRECISION = {'temp': 1}
+
+
+@dataclass
+class Interpretation:
+    text: str
+    rules_fired: List[str]
+    elapsed_ms: float
+    cached: bool = False
+
+
+def _rule_values(vitals_data, news2_score, medications, rules):
+    """Rule inputs for one reading, as recorded"""
+    values = {name: vitals_data.get(column) for name, column in RULE_FIELDS.items()}
+    values['news2'] = news2_score
+    values.update(rules.flags_for(medications))
+    return values
+
+
+def _cache_key(values):
     """
-    Advanced rule-based AI interpretation for vital signs.
+    Interpretation cache key for rule inputs, or None when a value is more
+    precise than RULE_PRECISION. The type is part of the key because 101
+    and 101.0 render differently.
     """
-    
-    # Extract vitals
-    sys_bp = vitals_data['blood_pressure_systolic']
-    dia_bp = vitals_data['blood_pressure_diastolic']
-    hr = vitals_data['heart_rate']
-    temp = vitals_data['temperature']
-    rr = vitals_data['respiratory_rate']
-    spo2 = vitals_data['oxygen_saturation']
-    
-    bp_str = f"{sys_bp}/{dia_bp}"
-    
-    analysis = []
+    for name, value in values.items():
+        if isinstance(value, float) and value != round(value, RULE_PRECISION.get(name, 0)):
+            return None
+    return tuple(sorted((name, type(value).__name__, value) for name, value in values.items()))
+
+
+def format_interpretation(fired, values):
+    """Render fired rules as the interpretation text shown to clinicians"""
     clinical_impressions = []
+    analysis = []
     recommendations = []
-    
-    # --- 1. PATTERN RECOGNITION (Illness Suggestions) ---
-    
-    # Sepsis Pattern (qSOFA-like + Temp)
-    # infection signs + organ dysfunction
-    sepsis_signs = 0
-    if temp > 38.3 or temp < 36.0: sepsis_signs += 1
-    if hr > 90: sepsis_signs += 1
-    if rr > 20: sepsis_signs += 1
-    if sys_bp < 100: sepsis_signs += 1
-    
-    if sepsis_signs >= 2:
-        clinical_impressions.append("POSSIBLE SEPSIS: Multiple systematic inflammatory response signs detected.")
-        recommendations.append("URGENT: Sepsis screening required (Lactate, Blood Cultures)")
-        recommendations.append("Assess urine output and mental status")
-
-    # Hypovolemic Shock Pattern
-    if sys_bp < 90 and hr > 100:
-        clinical_impressions.append("POSSIBLE SHOCK: Hypotension with compensatory tachycardia.")
-        recommendations.append("URGENT: Assess fluid status and perfusion")
-        recommendations.append("Prepare for fluid resuscitation")
-
-    # Respiratory Failure Indicators
-    if spo2 < 92 and rr > 24:
-        clinical_impressions.append("RESPIRATORY DISTRESS: Hypoxia with tachypnea.")
-        recommendations.append("URGENT: Respiratory assessment required")
-        recommendations.append("Consider ABG and chest imaging")
-        
-    # Hypertensive Crisis
-    if sys_bp > 180 or dia_bp > 120:
-        clinical_impressions.append("HYPERTENSIVE CRISIS: Critical blood pressure elevation.")
-        recommendations.append("Immediate medical review required")
-        recommendations.append("Assess for end-organ damage (chest pain, headache, vision changes)")
-
-    # Isolated findings analysis
-    if temp > 38.0:
-        analysis.append(f"Pyrexia ({temp}°C)")
-    elif temp < 35.0:
-        analysis.append(f"Hypothermia ({temp}°C)")
-        
-    if hr > 100:
-        analysis.append(f"Tachycardia ({hr} bpm)")
-    elif hr < 60:
-        analysis.append(f"Bradycardia ({hr} bpm)")
-        
-    if spo2 < 94:
-        analysis.append(f"Hypoxia ({spo2}%)")
-        
-    # --- 2. RISK SCORING CONTEXT ---
-    
-    if news2_score >= 7:
-        analysis.append(f"CRITICAL NEWS2 Score ({news2_score})")
-    elif news2_score >= 5:
-        analysis.append(f"High NEWS2 Score ({news2_score})")
-
-    # --- 3. PATIENT CONTEXT ---
-    
-    if patient_data.medications:
-        # Simple interaction check (mock)
-        meds = patient_data.medications.lower()
-        if "beta blocker" in meds and hr < 60:
-             recommendations.append("Bradycardia may be medication-induced (Beta Blockers)")
-    
-    # --- FORMATTING OUTPUT ---
-    
+    for rule in fired:
+        if rule.impression:
+            clinical_impressions.append(rule.impression)
+        if rule.finding:
+            analysis.append(rule.finding.format(**values))
+        recommendations.extend(rule.recommendations)
+
     interpretation_text = ""
-    
+
     if clinical_impressions:
         interpretation_text += "POTENTIAL CLINICAL IMPLICATIONS:\n"
         interpretation_text += "\n".join(f"⚠️ {i}" for i in clinical_impressions)
         interpretation_text += "\n\n"
-        
+
     interpretation_text += "VITAL SIGNS ANALYSIS:\n"
     if analysis:
         interpretation_text += "\n".join(f"• {a}" for a in analysis)
     else:
         interpretation_text += "• Vital signs stable within normal limits."
-    
+
     if recommendations:
         interpretation_text += "\n\nRECOMMENDATIONS:\n"
         interpretation_text += "\n".join(f"-> {r}" for r in recommendations)
-        
-    interpretation_text += "\n\n[AI SUPPORT: Validation by clinician required]"
-    
-    return interpretation_text
\ No newline at end of file
+
+    interpretation_text += "\n\n" + FOOTER
+
+    return interpretation_text
+
+
+def with_trends(text, findings):
+    """Insert a trend section (per patient, so never cached) above the footer"""
+    if not findings:
+        return text
+    trends = "TRENDS:\n" + "\n".join(f"↗ {f}" for f in findings)
+    body = text[: -len(FOOTER)] if text.endswith(FOOTER) else text + "\n\n"
+    return body + trends + "\n\n" + FOOTER
+
+
+def trends_of(text):
+    """Trend findings in an interpretation rendered by with_trends"""
+    _, found, section = (text or "").partition("TRENDS:\n")
+    if not found:
+        return []
+    lines = section.split("\n\n", 1)[0].splitlines()
+    return [line[len("↗ "):] for line in lines if line.startswith("↗ ")]
+
+
+def interpret_vitals(vitals_data, patient_data, news2_score, trends=None):
+    """
+    Evaluate the rule table for one reading and render the result, with the
+    patient's trend findings (if any) appended.
+    """
+    start = time.perf_counter()
+    rules = get_rules()
+    values = _rule_values(vitals_data, news2_score, patient_data.medications, rules)
+    key = _cache_key(values)
+
+    cached = interpretation_cache.get(rules.version, key) if key is not None else None
+    if cached is not None:
+        text, rules_fired = cached
+        return Interpretation(
+            with_trends(text, trends), list(rules_fired), (time.perf_counter() - start) * 1000, cached=True
+        )
+
+    evaluation = rules.evaluate(values)
+    text = format_interpretation(evaluation.fired, values)
+    if key is not None:
+        interpretation_cache.put(rules.version, key, (text, tuple(evaluation.fired_ids)))
+    return Interpretation(with_trends(text, trends), evaluation.fired_ids, evaluation.elapsed_ms)
+
+
+def get_vitals_interpretation(vitals_data, patient_data, news2_score, alert_level):
+    """
+    Advanced rule-based AI interpretation for vital signs.
+    """
+    return interpret_vitals(vitals_data, patient_data, news2_score).text
+
+
+def interpret_vitals_batch(vitals_rows, medications, news2_scores, trends=None):
+    """
+    Interpret many readings with one vectorized rule evaluation.
+
+    `vitals_rows` are vitals dicts, `medications` the matching patients'
+    medication text, `news2_scores` their scores and `trends` optional
+    per-reading trend findings. Returns a list of Interpretation, one per
+    reading; elapsed_ms is the whole batch's time.
+    """
+    rules = get_rules()
+    values = [
+        _rule_values(row, score, meds, rules)
+        for row, meds, score in zip(vitals_rows, medications, news2_scores)
+    ]
+    columns = {name: [v[name] for v in values] for name in rules.fields}
+    evaluation = rules.evaluate_batch(columns)
+
+    results = []
+    for i, row_values in enumerate(values):
+        fired = evaluation.fired(i)
+        results.append(Interpretation(
+            text=with_trends(format_interpretation(fired, row_values), trends and trends[i]),
+            rules_fired=[rule.id for rule in fired],
+            elapsed_ms=evaluation.elapsed_ms,
+        ))
+    return results
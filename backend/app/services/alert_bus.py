@@ -0,0 +1,125 @@
+"""
+In-process publish/subscribe for patient alerts (served as SSE by
+app.routes.alerts).
+
+Publishers are the vitals write paths, which run in worker threads;
+subscribers are async request handlers. Subscriptions are indexed by ward
+and patient, so a publish only touches the subscribers that want the event.
+Each subscriber has a bounded buffer: when a slow consumer falls behind,
+its oldest events are dropped and counted rather than growing memory or
+slowing down publishers.
+
+The bus lives in one process. With several uvicorn workers, each worker
+only sees the writes it handled itself.
+"""
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+ALERT_BUFFER_SIZE = 256
+
+
+class Subscription:
+    def __init__(self, bus, wards=(), patient_ids=(), buffer_size=ALERT_BUFFER_SIZE):
+        self.bus = bus
+        self.wards = frozenset(wards)
+        self.patient_ids = frozenset(patient_ids)
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def _push(self, event):
+        """Called from any thread"""
+        with self._lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(event)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # subscriber's event loop already closed
+
+    async def get(self, timeout=None):
+        """
+        Wait for events. Returns (events, dropped_since_last_call); empty
+        events on timeout.
+        """
+        if not self.buffer:
+            self._ready.clear()
+            # Re-check after clearing so a push in between is not missed
+            if not self.buffer:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return [], 0
+        with self._lock:
+            events = list(self.buffer)
+            self.buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class AlertBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._all = set()
+        self._by_ward = {}
+        self._by_patient = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, wards=(), patient_ids=(), buffer_size=ALERT_BUFFER_SIZE):
+        """
+        Subscribe (from async code) to events for any of `wards` or
+        `patient_ids`; no filters means every event.
+        """
+        subscription = Subscription(self, wards, patient_ids, buffer_size)
+        with self._lock:
+            if not subscription.wards and not subscription.patient_ids:
+                self._all.add(subscription)
+            for ward in subscription.wards:
+                self._by_ward.setdefault(ward, set()).add(subscription)
+            for patient_id in subscription.patient_ids:
+                self._by_patient.setdefault(patient_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._all.discard(subscription)
+            for values, index in ((subscription.wards, self._by_ward), (subscription.patient_ids, self._by_patient)):
+                for value in values:
+                    subscribers = index.get(value)
+                    if subscribers is not None:
+                        subscribers.discard(subscription)
+                        if not subscribers:
+                            del index[value]
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            subscribers = set(self._all)
+            for index in (self._by_ward, self._by_patient):
+                for group in index.values():
+                    subscribers |= group
+            return len(subscribers)
+
+    def publish(self, event):
+        """Deliver `event` (a dict with patient_id and ward) to matching subscribers"""
+        with self._lock:
+            if not (self._all or self._by_ward or self._by_patient):
+                return 0
+            targets = set(self._all)
+            targets |= self._by_ward.get(event.get("ward"), set())
+            targets |= self._by_patient.get(event.get("patient_id"), set())
+            event = {"id": next(self._ids), **event}
+        for subscription in targets:
+            subscription._push(event)
+        return len(targets)
+
+
+alert_bus = AlertBus()
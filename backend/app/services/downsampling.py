@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of the `n_out` points of (x, y) that best preserve
+    the visual shape of the series. `x` must be sorted ascending. First and
+    last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("LTTB needs at least 3 output points")
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def bucket_aggregate(x, y, n_buckets, how="mean"):
+    """
+    Aggregate (x, y) into `n_buckets` equal-width x buckets.
+
+    `how` is one of "mean", "min" or "max". Returns (bucket_x, values) where
+    bucket_x is the midpoint of each non-empty bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) == 0:
+        return x, y
+    lo, hi = x[0], x[-1]
+    width = (hi - lo) / n_buckets or 1.0
+    bucket = np.minimum(((x - lo) / width).astype(np.int64), n_buckets - 1)
+
+    counts = np.bincount(bucket, minlength=n_buckets)
+    if how == "mean":
+        values = np.bincount(bucket, weights=y, minlength=n_buckets)
+        values = np.divide(values, counts, out=np.full(n_buckets, np.nan), where=counts > 0)
+    elif how in ("min", "max"):
+        fill = np.inf if how == "min" else -np.inf
+        values = np.full(n_buckets, fill)
+        ufunc = np.minimum if how == "min" else np.maximum
+        ufunc.at(values, bucket, y)
+    else:
+        raise ValueError(f"Unknown aggregation: {how}")
+
+    occupied = counts > 0
+    midpoints = lo + (np.arange(n_buckets) + 0.5) * width
+    return midpoints[occupied], values[occupied]
@@ -0,0 +1,167 @@
+"""
+Group commit for single vitals readings (VITALS_GROUP_COMMIT=1).
+
+Requests hand their reading to a bounded queue and wait; one flusher thread
+stores whatever has queued up - at most GROUP_COMMIT_MAX_ROWS readings, or
+what arrived within GROUP_COMMIT_MAX_DELAY_MS of the first one - in a single
+transaction, then resolves each request's future. A request is therefore
+acknowledged only once the commit that contains it has succeeded, but many
+requests share one commit (and one fsync).
+
+When the queue is full, `submit` raises QueueFull straight away so the API
+can answer 503 instead of letting latency grow without bound. A request
+cancelled (client gone) before its batch is taken is dropped unstored;
+once taken, its reading is committed whatever happens to the request.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from app.metrics import GROUP_COMMIT_BATCH, GROUP_COMMIT_QUEUE
+from app.services.vitals_ingest import record_vitals_readings
+
+GROUP_COMMIT_ENABLED = os.getenv("VITALS_GROUP_COMMIT", "0").lower() in ("1", "true", "yes")
+GROUP_COMMIT_MAX_ROWS = int(os.getenv("GROUP_COMMIT_MAX_ROWS", "256"))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "5"))
+GROUP_COMMIT_QUEUE_SIZE = int(os.getenv("GROUP_COMMIT_QUEUE_SIZE", "10000"))
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class QueueFull(Exception):
+    pass
+
+
+class GroupCommitter:
+    def __init__(self, session_factory, max_rows=GROUP_COMMIT_MAX_ROWS,
+                 max_delay_ms=GROUP_COMMIT_MAX_DELAY_MS, queue_size=GROUP_COMMIT_QUEUE_SIZE):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self.batches = 0
+        self.rows = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="vitals-group-commit", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Flush everything queued so far, then stop the flusher"""
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, vitals_dict):
+        """
+        Queue one reading. Returns a Future resolving to (row, interpretation)
+        after commit, or failing with PatientNotFound or the commit error.
+        """
+        future = Future()
+        try:
+            self.queue.put_nowait((vitals_dict, future))
+        except queue.Full:
+            raise QueueFull() from None
+        GROUP_COMMIT_QUEUE.set(self.queue.qsize())
+        return future
+
+    def _next_batch(self):
+        """Block for the first item, then gather until full or the delay passes"""
+        first = self.queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._flush_safely(batch)
+        # Drain anything submitted while stopping
+        leftover = []
+        while True:
+            try:
+                leftover.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        leftover = [item for item in leftover if item is not _STOP]
+        if leftover:
+            self._flush_safely(leftover)
+
+    def _flush_safely(self, batch):
+        """Flush, never letting one bad batch kill the flusher thread"""
+        try:
+            self._flush(batch)
+        except Exception as e:
+            logger.exception("group commit flusher error", extra={"rows": len(batch)})
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _flush(self, batch):
+        GROUP_COMMIT_QUEUE.set(self.queue.qsize())
+        # Drop requests cancelled while queued; the rest can no longer be cancelled
+        batch = [(vitals_dict, future) for vitals_dict, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        GROUP_COMMIT_BATCH.observe(len(batch))
+        db = self.session_factory()
+        try:
+            results = record_vitals_readings(db, [vitals_dict for vitals_dict, _ in batch])
+        except Exception as e:
+            logger.error("group commit failed", extra={"rows": len(batch), "error": str(e)})
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            db.close()
+
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# Created at startup when group commit is enabled
+group_committer = None
+
+
+def start_group_commit(session_factory):
+    global group_committer
+    group_committer = GroupCommitter(session_factory).start()
+    return group_committer
+
+
+def stop_group_commit():
+    global group_committer
+    if group_committer is not None:
+        group_committer.stop()
+        group_committer = None
+
+
+def get_group_committer():
+    return group_committer
@@ -0,0 +1,74 @@
+"""
+Bounded LRU cache of rendered vitals interpretations.
+
+Most readings repeat: integer HR/RR/SpO2/BP and temperature to one decimal
+place, so the same interpretation text is built over and over. Entries are
+keyed on the normalized rule inputs (vitals, NEWS2 score and medication
+flags, see ai_service._rule_values). The cache is tagged with the rule set
+version and empties itself when a different rule set is loaded.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = int(os.getenv("INTERPRETATION_CACHE_SIZE", "4096"))
+
+
+class InterpretationCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version, key):
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                # Least recently used entry goes first
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "rules_version": self._version,
+            }
+
+
+interpretation_cache = InterpretationCache()
@@ -1,81 +1,156 @@
+from bisect import bisect_right
+
+import numpy as np
+
+# NEWS2 banding tables: (low, high, points), both bounds inclusive.
+# Values that fall between two bands (e.g. a respiratory rate of 8.5)
+# score 0, exactly as the original if/elif chain did.
+NEWS2_BANDS = {
+    'respiratory_rate': [
+        (float('-inf'), 8, 3),
+        (9, 11, 1),
+        (21, 24, 2),
+        (25, float('inf'), 3),
+    ],
+    'oxygen_saturation': [
+        (float('-inf'), 91, 3),
+        (92, 93, 2),
+        (94, 95, 1),
+    ],
+    'temperature': [
+        (float('-inf'), 35.0, 3),
+        (35.1, 36.0, 1),
+        (38.1, 39.0, 1),
+        (39.1, float('inf'), 2),
+    ],
+    'blood_pressure_systolic': [
+        (float('-inf'), 90, 3),
+        (91, 100, 2),
+        (101, 110, 1),
+        (220, float('inf'), 3),
+    ],
+    'heart_rate': [
+        (float('-inf'), 40, 3),
+        (41, 50, 1),
+        (91, 110, 1),
+        (111, 130, 2),
+        (131, float('inf'), 3),
+    ],
+}
+
+# Precomputed lookup arrays for the batch path
+_BAND_TABLES = {
+    field: (
+        np.array([band[0] for band in bands], dtype=float),
+        np.array([band[1] for band in bands], dtype=float),
+        np.array([band[2] for band in bands], dtype=np.int64),
+    )
+    for field, bands in NEWS2_BANDS.items()
+}
+_BAND_LOWS = {field: [band[0] for band in bands] for field, bands in NEWS2_BANDS.items()}
+
+ALERT_LEVELS = {
+    'high': {
+        'level': 'high',
+        'color': 'red',
+        'text': 'High Risk - Urgent Medical Attention Required'
+    },
+    'medium': {
+        'level': 'medium',
+        'color': 'yellow',
+        'text': 'Medium Risk - Monitor Closely'
+    },
+    'low': {
+        'level': 'low',
+        'color': 'green',
+        'text': 'Low Risk - Stable'
+    },
+}
+
+# Highest possible NEWS2 score from the tables above
+MAX_NEWS2_SCORE = sum(max(band[2] for band in bands) for bands in NEWS2_BANDS.values())
+
+# Alert level for every possible score, indexed by score
+_ALERT_LEVEL_BY_SCORE = np.array(
+    ['high' if s >= 7 else 'medium' if s >= 5 else 'low' for s in range(MAX_NEWS2_SCORE + 1)]
+)
+
+
+def _band_points(field, value):
+    bands = NEWS2_BANDS[field]
+    i = bisect_right(_BAND_LOWS[field], value) - 1
+    if i >= 0 and value <= bands[i][1]:
+        return bands[i][2]
+    return 0
+
+
 def calculate_news2(vitals):
     """Calculate NEWS2 score from vital signs"""
     score = 0
-    
-    # Respiratory Rate
-    rr = vitals.get('respiratory_rate', 0)
-    if rr <= 8:
-        score += 3
-    elif 9 <= rr <= 11:
-        score += 1
-    elif 21 <= rr <= 24:
-        score += 2
-    elif rr >= 25:
-        score += 3
-    
-    # Oxygen Saturation
-    spo2 = vitals.get('oxygen_saturation', 0)
-    if spo2 <= 91:
-        score += 3
-    elif 92 <= spo2 <= 93:
-        score += 2
-    elif 94 <= spo2 <= 95:
-        score += 1
-    
-    # Temperature
-    temp = vitals.get('temperature', 0)
-    if temp <= 35.0:
-        score += 3
-    elif 35.1 <= temp <= 36.0:
-        score += 1
-    elif 38.1 <= temp <= 39.0:
-        score += 1
-    elif temp >= 39.1:
-        score += 2
-    
-    # Blood Pressure (Systolic)
-    bp_sys = vitals.get('blood_pressure_systolic', 0)
-    if bp_sys <= 90:
-        score += 3
-    elif 91 <= bp_sys <= 100:
-        score += 2
-    elif 101 <= bp_sys <= 110:
-        score += 1
-    elif bp_sys >= 220:
-        score += 3
-    
-    # Heart Rate
-    hr = vitals.get('heart_rate', 0)
-    if hr <= 40:
-        score += 3
-    elif 41 <= hr <= 50:
-        score += 1
-    elif 91 <= hr <= 110:
-        score += 1
-    elif 111 <= hr <= 130:
-        score += 2
-    elif hr >= 131:
-        score += 3
-    
+    for field in NEWS2_BANDS:
+        score += _band_points(field, vitals.get(field, 0))
     return score
 
+
 def get_alert_level(score):
     """Determine alert level from NEWS2 score"""
     if score >= 7:
-        return {
-            'level': 'high',
-            'color': 'red',
-            'text': 'High Risk - Urgent Medical Attention Required'
-        }
+        return ALERT_LEVELS['high']
     elif score >= 5:
-        return {
-            'level': 'medium',
-            'color': 'yellow',
-            'text': 'Medium Risk - Monitor Closely'
-        }
+        return ALERT_LEVELS['medium']
     else:
-        return {
-            'level': 'low',
-            'color': 'green',
-            'text': 'Low Risk - Stable'
-        }
\ No newline at end of file
+        return ALERT_LEVELS['low']
+
+
+def _as_columns(vitals):
+    """Normalize a list of row dicts or a mapping of columns to float arrays"""
+    if isinstance(vitals, dict):
+        columns = {}
+        for field in NEWS2_BANDS:
+            column = vitals.get(field)
+            columns[field] = None if column is None else np.asarray(column, dtype=float)
+        n = max((len(c) for c in columns.values() if c is not None), default=0)
+        for field, column in columns.items():
+            if column is None:
+                columns[field] = np.zeros(n)
+        return columns, n
+
+    rows = list(vitals)
+    columns = {
+        field: np.fromiter(
+            (row.get(field, 0) for row in rows), dtype=float, count=len(rows)
+        )
+        for field in NEWS2_BANDS
+    }
+    return columns, len(rows)
+
+
+def calculate_news2_batch(vitals):
+    """
+    Calculate NEWS2 scores for many readings at once.
+
+    `vitals` is either a mapping of column name -> array-like (e.g. NumPy
+    arrays) or an iterable of row dicts. Missing values score as 0, like
+    `calculate_news2`. Returns an int64 array of scores.
+    """
+    columns, n = _as_columns(vitals)
+    scores = np.zeros(n, dtype=np.int64)
+    for field, (lows, highs, points) in _BAND_TABLES.items():
+        values = np.nan_to_num(columns[field], nan=0.0)
+        idx = np.searchsorted(lows, values, side='right') - 1
+        safe_idx = np.clip(idx, 0, None)
+        in_band = (idx >= 0) & (values <= highs[safe_idx])
+        scores += np.where(in_band, points[safe_idx], 0)
+    return scores
+
+
+def get_alert_level_batch(scores):
+    """Alert level strings ('low', 'medium', 'high') for an array of scores"""
+    scores = np.clip(np.asarray(scores, dtype=np.int64), 0, MAX_NEWS2_SCORE)
+    return _ALERT_LEVEL_BY_SCORE[scores]
+
+
+def score_batch(vitals):
+    """Return (scores, alert_levels) arrays for a batch of readings"""
+    scores = calculate_news2_batch(vitals)
+    return scores, get_alert_level_batch(scores)
@@ -0,0 +1,236 @@
+"""
+Read-through cache of patient rows: the fields GET /api/patients/{id}
+returns plus medications, which the vitals write path needs for the
+interpretation.
+
+Entries expire after PATIENT_CACHE_TTL seconds and are replaced or dropped
+when a patient is created or its status changes. Backends (PATIENT_CACHE):
+
+- memory (default): a bounded LRU per process. With several uvicorn
+  workers each one has its own copy, so a change made through another
+  worker shows up after at most the TTL;
+- redis://host:port/db: one store shared by every worker (needs the
+  `redis` package). Its size is bounded by the server's maxmemory policy,
+  e.g. allkeys-lru;
+- off: no caching.
+
+The rolling trend state is deliberately not cached: it changes with every
+reading and is read inside the write transaction.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy import select
+
+from app.metrics import PATIENT_CACHE_LOOKUPS
+from app.models.patient import Patient
+from app.responses import dumps
+
+PATIENT_CACHE = os.getenv("PATIENT_CACHE", "memory")
+PATIENT_CACHE_TTL = float(os.getenv("PATIENT_CACHE_TTL", "60"))
+PATIENT_CACHE_SIZE = int(os.getenv("PATIENT_CACHE_SIZE", "10000"))
+
+# Columns kept per patient
+CACHED_FIELDS = (
+    "id", "hospital_number", "full_name", "age", "gender", "last_visit", "status", "ward", "medications",
+)
+CACHED_COLUMNS = [getattr(Patient, name) for name in CACHED_FIELDS]
+
+logger = logging.getLogger(__name__)
+
+
+def entry_from_row(row):
+    """Cache entry (a dict of CACHED_FIELDS) from a row that has them"""
+    return {name: getattr(row, name) for name in CACHED_FIELDS}
+
+
+class MemoryBackend:
+    """LRU of entries with per-entry expiry, private to one process"""
+
+    def __init__(self, maxsize=PATIENT_CACHE_SIZE, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(value)
+
+    def set(self, key, value, ttl):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (dict(value), self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                # Least recently used entry goes first
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Entries as JSON in Redis (or anything with its get/set/delete), shared by workers"""
+
+    def __init__(self, client, prefix="patient:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5))
+
+    def get(self, key):
+        data = self.client.get(f"{self.prefix}{key}")
+        if data is None:
+            return None
+        value = json.loads(data)
+        if value.get("last_visit"):
+            value["last_visit"] = date.fromisoformat(value["last_visit"])
+        return value
+
+    def set(self, key, value, ttl):
+        self.client.set(f"{self.prefix}{key}", dumps(value), px=max(int(ttl * 1000), 1))
+
+    def delete(self, key):
+        self.client.delete(f"{self.prefix}{key}")
+
+    def clear(self):
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            self.client.delete(key)
+
+
+def backend_from_setting(setting=PATIENT_CACHE):
+    if setting == "off":
+        return None
+    if setting == "memory":
+        return MemoryBackend()
+    if setting.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(setting)
+    raise ValueError(f"Unknown PATIENT_CACHE backend {setting!r}")
+
+
+class PatientCache:
+    """
+    Patient id -> entry through a backend. Backend errors (e.g. Redis being
+    down) are logged and count as misses: the database stays the source of
+    truth.
+    """
+
+    def __init__(self, backend=None, ttl=PATIENT_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a load that raced one is not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _call(self, method, *args):
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception:
+            self.errors += 1
+            logger.exception("patient cache %s failed", method)
+            return None
+
+    def get(self, patient_id):
+        if self.backend is None:
+            return None
+        entry = self._call("get", patient_id)
+        if entry is None:
+            self.misses += 1
+            PATIENT_CACHE_LOOKUPS.labels("miss").inc()
+        else:
+            self.hits += 1
+            PATIENT_CACHE_LOOKUPS.labels("hit").inc()
+        return entry
+
+    def put(self, patient_id, entry, generation=None):
+        """Store an entry; skipped if anything was invalidated since `generation`"""
+        if self.backend is None or (generation is not None and generation != self.generation):
+            return
+        self._call("set", patient_id, entry, self.ttl)
+
+    def invalidate(self, *patient_ids):
+        with self._lock:
+            self.generation += 1
+        if self.backend is None:
+            return
+        for patient_id in patient_ids:
+            self._call("delete", patient_id)
+
+    def get_or_load(self, patient_id, load):
+        """The cached entry, or `load()` (an entry or None) stored on the way out"""
+        entry = self.get(patient_id)
+        if entry is not None:
+            return entry
+        generation = self.generation
+        entry = load()
+        if entry is not None:
+            self.put(patient_id, entry, generation)
+        return entry
+
+    def clear(self):
+        if self.backend is not None:
+            self._call("clear")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# In-process until configure_patient_cache() runs at startup
+patient_cache = PatientCache(MemoryBackend())
+
+
+def configure_patient_cache(setting=PATIENT_CACHE):
+    """Switch the shared cache to the configured backend (called at startup)"""
+    patient_cache.clear()
+    patient_cache.backend = backend_from_setting(setting)
+    return patient_cache
+
+
+def load_patient(db, patient_id):
+    row = db.execute(select(*CACHED_COLUMNS).where(Patient.id == patient_id)).first()
+    return entry_from_row(row) if row is not None else None
+
+
+def cached_patient(db, patient_id):
+    """Read-through lookup of one patient; None if there is no such patient"""
+    return patient_cache.get_or_load(patient_id, lambda: load_patient(db, patient_id))
@@ -0,0 +1,131 @@
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import OperationalError
+
+from app.models.patient import Patient
+
+# SQLite FTS5 trigram index over the searchable patient columns. It is an
+# external-content table, so the triggers below keep it in step with
+# `patients` on every insert, update and delete.
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE patients_fts USING fts5(
+        full_name, hospital_number,
+        content='patients', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO patients_fts(rowid, full_name, hospital_number)
+        VALUES (new.id, new.full_name, new.hospital_number);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, full_name, hospital_number)
+        VALUES ('delete', old.id, old.full_name, old.hospital_number);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS patients_fts_au
+    AFTER UPDATE OF full_name, hospital_number ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, full_name, hospital_number)
+        VALUES ('delete', old.id, old.full_name, old.hospital_number);
+        INSERT INTO patients_fts(rowid, full_name, hospital_number)
+        VALUES (new.id, new.full_name, new.hospital_number);
+    END
+    """,
+    "INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')",
+]
+
+# Trigram matching needs at least three characters
+MIN_TRIGRAM_LENGTH = 3
+
+# Highest code point, used to turn a prefix into an index range scan
+_PREFIX_END = "\U0010ffff"
+
+
+def install_patient_search(bind):
+    """Create the search index for this database if it does not exist yet"""
+    if bind.dialect.name != "sqlite":
+        return
+    if inspect(bind).has_table("patients_fts"):
+        return
+    try:
+        with bind.begin() as conn:
+            for statement in SQLITE_FTS_DDL:
+                conn.execute(text(statement))
+    except OperationalError:
+        # SQLite built without FTS5 / trigram support: search falls back to LIKE
+        pass
+
+
+def has_fts_index(db):
+    bind = db.get_bind()
+    return bind.dialect.name == "sqlite" and inspect(bind).has_table("patients_fts")
+
+
+def _prefix_ids(db, column, prefix, limit):
+    return db.scalars(
+        select(Patient.id)
+        .where(column >= prefix, column < prefix + _PREFIX_END)
+        .order_by(column)
+        .limit(limit)
+    ).all()
+
+
+def _fts_ids(db, q, limit):
+    phrase = '"' + q.replace('"', '""') + '"'
+    return db.scalars(
+        text("SELECT rowid FROM patients_fts WHERE patients_fts MATCH :q ORDER BY rank LIMIT :limit"),
+        {"q": phrase, "limit": limit},
+    ).all()
+
+
+def _like_ids(db, q, limit):
+    return db.scalars(
+        select(Patient.id)
+        .where(Patient.hospital_number.contains(q) | Patient.full_name.contains(q))
+        .order_by(Patient.full_name)
+        .limit(limit)
+    ).all()
+
+
+def search_patient_ids(db, q, limit=20):
+    """
+    Ranked patient ids for a search box query: hospital-number prefix
+    matches first (index range scan), then full-name/hospital-number
+    substring matches from the trigram index ranked by bm25.
+    """
+    q = q.strip()
+    if not q:
+        return []
+
+    ids = []
+    for prefix in dict.fromkeys([q, q.upper()]):
+        ids += _prefix_ids(db, Patient.hospital_number, prefix, limit)
+
+    if len(q) < MIN_TRIGRAM_LENGTH:
+        ids += _prefix_ids(db, Patient.full_name, q, limit)
+        ids += _prefix_ids(db, Patient.full_name, q.title(), limit)
+    elif has_fts_index(db):
+        ids += _fts_ids(db, q, limit)
+    else:
+        ids += _like_ids(db, q, limit)
+
+    return list(dict.fromkeys(ids))[:limit]
+
+
+def search_patients(db, q, limit=20, columns=None):
+    """
+    Patients matching `q`, in rank order: ORM objects, or rows of
+    `columns` (which must include Patient.id) when given.
+    """
+    ids = search_patient_ids(db, q, limit)
+    if not ids:
+        return []
+    if columns is None:
+        rows = db.query(Patient).filter(Patient.id.in_(ids)).all()
+    else:
+        rows = db.execute(select(*columns).where(Patient.id.in_(ids))).all()
+    patients = {p.id: p for p in rows}
+    return [patients[i] for i in ids if i in patients]
@@ -0,0 +1,493 @@
+"""
+Similar-case retrieval: "past readings that looked like this one".
+
+Each reading is embedded as one float32 vector: its vitals (and NEWS2) as
+deviations from normal, scaled so one unit is roughly one clinically
+meaningful step, followed by its notes text. Text is embedded with a
+deterministic hashing embedder (signed feature hashing of words and word
+pairs, no model download), or with sentence-transformers when
+SIMILAR_CASES_EMBEDDER=sentence-transformers and the package is installed.
+Cases are compared by L2 distance.
+
+The index lives in SIMILAR_CASES_DIR:
+
+    meta.json      embedder name and dimension
+    cases.rec      one record per reading: vitals id, patient id, vector;
+                   append-only
+    index.lock     flock()ed around appends (exclusive) and reads of new
+                   records (shared)
+    centroids.npy  coarse quantizer of the NumPy index (written on retrain)
+    index.faiss    FAISS HNSW snapshot (FAISS only, written by save())
+
+Readings are appended as they are stored (see app.services.vitals_ingest),
+so the index is updated incrementally; app.jobs.build_similar_cases
+builds it for existing rows. Every process (uvicorn workers, the build
+job) appends to the same record file and, before appending or searching,
+reads the records other processes added since it last looked, so all of
+them see every reading and agree on the row order. With faiss-cpu
+installed, searches go through an HNSW graph (logarithmic in the number of
+cases). Without it, a NumPy inverted-file index probes the
+SIMILAR_CASES_NPROBE nearest of about sqrt(N) clusters, so a query scores
+a small fraction of the cases; it is retrained in a background thread
+whenever the index has doubled since the last training.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+SIMILAR_CASES_DIR = os.getenv("SIMILAR_CASES_DIR", "./similar_cases")
+SIMILAR_CASES_ENABLED = os.getenv("SIMILAR_CASES", "1").lower() in ("1", "true", "yes")
+SIMILAR_CASES_EMBEDDER = os.getenv("SIMILAR_CASES_EMBEDDER", "hashing")
+SIMILAR_CASES_NPROBE = int(os.getenv("SIMILAR_CASES_NPROBE", "8"))
+
+# Column -> (normal value, one step); the vitals part of the vector is (value - normal) / step
+VITAL_SCALES = {
+    "blood_pressure_systolic": (120, 15),
+    "blood_pressure_diastolic": (80, 10),
+    "heart_rate": (75, 12),
+    "temperature": (37.0, 0.5),
+    "respiratory_rate": (16, 3),
+    "oxygen_saturation": (97, 2),
+    "news2_score": (0, 2),
+}
+
+# Text part: dimensions of the hashing embedder and its weight relative to the vitals
+TEXT_DIM = 64
+TEXT_WEIGHT = 2.0
+
+# Below this many cases the NumPy index just scans everything
+IVF_MIN_ROWS = 4096
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+logger = logging.getLogger(__name__)
+
+
+class HashingEmbedder:
+    name = "hashing"
+
+    def __init__(self, dim=TEXT_DIM):
+        self.dim = dim
+
+    def encode(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = _TOKEN.findall((text or "").lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                out[i, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return np.divide(out, norms, out=out, where=norms > 0)
+
+
+class SentenceTransformerEmbedder:
+    name = "sentence-transformers"
+
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        vectors = self.model.encode([t or "" for t in texts], normalize_embeddings=True)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        vectors[[not t for t in texts]] = 0  # no notes: no text signal
+        return vectors
+
+
+def make_embedder(name=SIMILAR_CASES_EMBEDDER):
+    if name == "sentence-transformers":
+        try:
+            return SentenceTransformerEmbedder()
+        except ImportError:
+            pass  # offline fallback
+    return HashingEmbedder()
+
+
+class CaseEmbedder:
+    """Reading dict (VitalSigns columns) -> vector"""
+
+    def __init__(self, text_embedder=None):
+        self.text = text_embedder or HashingEmbedder()
+        self.name = self.text.name
+        self.dim = len(VITAL_SCALES) + self.text.dim
+
+    def embed(self, rows):
+        vitals = np.array(
+            [[np.nan if row.get(c) is None else row[c] for c in VITAL_SCALES] for row in rows],
+            dtype=np.float32,
+        ).reshape(len(rows), len(VITAL_SCALES))
+        normal = np.array([n for n, _ in VITAL_SCALES.values()], dtype=np.float32)
+        step = np.array([s for _, s in VITAL_SCALES.values()], dtype=np.float32)
+        vitals = np.nan_to_num((vitals - normal) / step)  # missing value: treated as normal
+        text = self.text.encode([row.get("notes") for row in rows]) * TEXT_WEIGHT
+        return np.hstack([vitals, text]).astype(np.float32)
+
+
+def record_dtype(dim):
+    """One index record: vitals id, patient id and the reading's vector"""
+    return np.dtype([("id", "<i8"), ("patient_id", "<i8"), ("vector", "<f4", (dim,))])
+
+
+def _kmeans(vectors, k, iterations=10, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest(vectors, centroids)
+        for j in range(k):
+            members = vectors[labels == j]
+            if len(members):
+                centroids[j] = members.mean(axis=0)
+    return centroids
+
+
+def _nearest(vectors, centroids, n=1):
+    """Index of the `n` nearest centroids per vector (n=1: flat array)"""
+    distances = (
+        (vectors * vectors).sum(axis=1, keepdims=True)
+        - 2 * vectors @ centroids.T
+        + (centroids * centroids).sum(axis=1)
+    )
+    if n == 1:
+        return distances.argmin(axis=1)
+    n = min(n, len(centroids))
+    return np.argpartition(distances, n - 1, axis=1)[:, :n]
+
+
+class _Rows:
+    """Append-only 2-D array with amortized O(1) appends"""
+
+    def __init__(self, data):
+        self._buffer = data
+        self.n = len(data)
+
+    def append(self, rows):
+        needed = self.n + len(rows)
+        if needed > len(self._buffer):
+            grown = np.empty((max(needed, 2 * len(self._buffer), 1024),) + self._buffer.shape[1:],
+                             dtype=self._buffer.dtype)
+            grown[: self.n] = self._buffer[: self.n]
+            self._buffer = grown
+        self._buffer[self.n:needed] = rows
+        self.n = needed
+
+    @property
+    def array(self):
+        return self._buffer[: self.n]
+
+
+class CaseIndex:
+    def __init__(self, root=SIMILAR_CASES_DIR, embedder=None, background_training=True):
+        self.root = Path(root)
+        self.embedder = embedder or CaseEmbedder(make_embedder())
+        self.dim = self.embedder.dim
+        self.record = record_dtype(self.dim)
+        # False: retraining is left to the caller (see app.jobs.build_similar_cases)
+        self.background_training = background_training
+        self._lock = threading.RLock()
+        self._training = None
+        self._faiss = None
+        self._load()
+
+    # Storage
+
+    def _load(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path = self.root / "meta.json"
+        meta = {"embedder": self.embedder.name, "dim": self.dim}
+        if meta_path.exists():
+            stored = json.loads(meta_path.read_text())
+            if stored != meta:
+                raise ValueError(
+                    f"Index in {self.root} was built with {stored}, not {meta}; "
+                    "rebuild it with `python -m app.jobs.build_similar_cases --rebuild`"
+                )
+        else:
+            meta_path.write_text(json.dumps(meta))
+
+        self._path = self.root / "cases.rec"
+        self._offset = 0
+        self._ids = _Rows(np.zeros((0, 2), dtype=np.int64))
+        self._vectors = _Rows(np.zeros((0, self.dim), dtype=np.float32))
+        self._known = set()
+        self.centroids = None
+        self._assign_all()
+        self._load_faiss()
+        self._convert_split_files()
+        self._catch_up()
+        if (self.root / "centroids.npy").exists():
+            self.centroids = np.load(self.root / "centroids.npy")
+            self._assign_all()
+        if self.background_training:
+            self._maybe_train()
+
+    @contextmanager
+    def _file_lock(self, operation):
+        with open(self.root / "index.lock", "a") as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_new(self):
+        """Whole records appended since the last read (by any process); call holding the file lock"""
+        size = self._path.stat().st_size if self._path.exists() else 0
+        count = (size - self._offset) // self.record.itemsize
+        if count <= 0:
+            return np.zeros(0, dtype=self.record)
+        with open(self._path, "rb") as f:
+            f.seek(self._offset)
+            return np.fromfile(f, dtype=self.record, count=count)
+
+    def _extend(self, records):
+        """Add records, in file order, to the in-memory index; call holding self._lock"""
+        if not len(records):
+            return
+        start = len(self)
+        self._offset += len(records) * self.record.itemsize
+        self._vectors.append(records["vector"])
+        self._ids.append(np.stack([records["id"], records["patient_id"]], axis=1))
+        self._known.update(records["id"].tolist())
+        if self._faiss is not None:
+            # A snapshot already holds the records it was saved with
+            new = records["vector"][max(self._faiss.ntotal - start, 0):]
+            if len(new):
+                self._faiss.add(np.ascontiguousarray(new))
+        elif self.centroids is not None:
+            self._assign(start)
+
+    def _catch_up(self):
+        """Pick up readings other processes appended"""
+        with self._lock:
+            if (self._path.stat().st_size if self._path.exists() else 0) <= self._offset:
+                return
+            with self._file_lock(fcntl.LOCK_SH):
+                self._extend(self._read_new())
+
+    def _convert_split_files(self):
+        """Indexes written before cases.rec kept ids and vectors in two files"""
+        ids_path, vectors_path = self.root / "ids.i64", self.root / "vectors.f32"
+        with self._file_lock(fcntl.LOCK_EX):
+            if self._path.exists() or not ids_path.exists():
+                return
+            ids = np.fromfile(ids_path, dtype=np.int64)
+            vectors = np.fromfile(vectors_path, dtype=np.float32) if vectors_path.exists() else ids[:0]
+            n = min(len(ids) // 2, len(vectors) // self.dim)
+            records = np.zeros(n, dtype=self.record)
+            records["id"], records["patient_id"] = ids[: 2 * n].reshape(n, 2).T
+            records["vector"] = vectors[: n * self.dim].reshape(n, self.dim)
+            tmp = self.root / "cases.rec.tmp"
+            records.tofile(tmp)
+            os.replace(tmp, self._path)
+            ids_path.unlink()
+            vectors_path.unlink(missing_ok=True)
+
+    def _load_faiss(self):
+        try:
+            import faiss
+        except ImportError:
+            return
+        path = self.root / "index.faiss"
+        # Rows after the snapshot are added by _catch_up (FAISS ids are record numbers)
+        self._faiss = faiss.read_index(str(path)) if path.exists() else faiss.IndexHNSWFlat(self.dim, 32)
+
+    def save(self):
+        """Snapshot the FAISS graph (the record file is always current)"""
+        if self._faiss is not None:
+            import faiss
+
+            with self._lock:
+                tmp = self.root / f"index.faiss.{os.getpid()}.tmp"
+                faiss.write_index(self._faiss, str(tmp))
+                os.replace(tmp, self.root / "index.faiss")
+
+    @property
+    def ids(self):
+        """(N, 2) vitals id, patient id"""
+        return self._ids.array
+
+    @property
+    def vectors(self):
+        return self._vectors.array
+
+    def __len__(self):
+        return self._ids.n
+
+    # Updates
+
+    def add_readings(self, rows):
+        """Embed and append stored readings (dicts with id and patient_id); known ids are skipped"""
+        with self._lock:
+            with self._file_lock(fcntl.LOCK_EX):
+                # Other processes may have indexed some of these already
+                self._extend(self._read_new())
+                rows = [row for row in rows if row["id"] not in self._known]
+                if not rows:
+                    return 0
+                records = np.zeros(len(rows), dtype=self.record)
+                records["id"] = [row["id"] for row in rows]
+                records["patient_id"] = [row["patient_id"] for row in rows]
+                records["vector"] = self.embedder.embed(rows)
+                with open(self._path, "ab") as f:
+                    # An interrupted append can leave a partial record: cut it off
+                    f.truncate(self._offset)
+                    records.tofile(f)
+                self._extend(records)
+        if self.background_training:
+            self._maybe_train()
+        return len(rows)
+
+    def needs_training(self):
+        if self._faiss is not None or len(self) < IVF_MIN_ROWS:
+            return False
+        return self.centroids is None or len(self) >= 2 * self._trained_rows
+
+    def _maybe_train(self):
+        """Retrain in a background thread, off the request that noticed it is due"""
+        with self._lock:
+            if not self.needs_training() or (self._training is not None and self._training.is_alive()):
+                return
+            self._training = threading.Thread(target=self._train_logged, name="similar-cases-train", daemon=True)
+            self._training.start()
+
+    def _train_logged(self):
+        try:
+            self.train()
+        except Exception:
+            logger.exception("similar-case index training failed")
+
+    def wait_for_training(self, timeout=None):
+        training = self._training
+        if training is not None:
+            training.join(timeout)
+
+    def train(self, sample_size=20000, seed=0):
+        """
+        (Re)build the NumPy coarse quantizer with about sqrt(N) clusters.
+        Clustering and assignment run on a snapshot without holding the
+        lock, so searches and appends carry on meanwhile.
+        """
+        with self._lock:
+            n = len(self)
+            vectors = self.vectors
+        k = int(min(4096, max(16, np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, min(n, sample_size), replace=False)]
+        centroids = _kmeans(sample, min(k, len(sample)), seed=seed)
+        lists = [[] for _ in range(len(centroids))]
+        for i in range(0, n, 65536):
+            labels = _nearest(vectors[i:i + 65536], centroids)
+            for position, label in enumerate(labels.tolist(), start=i):
+                lists[label].append(position)
+
+        with self._lock:
+            tmp = self.root / f"centroids.{os.getpid()}.tmp.npy"
+            np.save(tmp, centroids)
+            os.replace(tmp, self.root / "centroids.npy")
+            self.centroids = centroids
+            self._lists = lists
+            self._list_arrays = {}
+            self._trained_rows = n
+            # Rows added while training
+            self._assign(n)
+
+    def _assign_all(self):
+        self._trained_rows = len(self)
+        self._lists = []
+        self._list_arrays = {}
+        if self.centroids is not None:
+            self._lists = [[] for _ in range(len(self.centroids))]
+            self._assign(0)
+
+    def _assign(self, start):
+        """Put rows from `start` on into their clusters' inverted lists"""
+        for i in range(start, len(self), 65536):
+            labels = _nearest(self.vectors[i:i + 65536], self.centroids)
+            for position, label in enumerate(labels.tolist(), start=i):
+                self._lists[label].append(position)
+                self._list_arrays.pop(label, None)
+
+    def _inverted_list(self, cluster):
+        array = self._list_arrays.get(cluster)
+        if array is None:
+            array = self._list_arrays[cluster] = np.array(self._lists[cluster], dtype=np.int64)
+        return array
+
+    # Queries
+
+    def search(self, row, k=10, exclude_patient=None, nprobe=SIMILAR_CASES_NPROBE):
+        """
+        The `k` cases nearest to the reading `row`, as (vitals_id,
+        patient_id, distance) tuples, nearest first. `exclude_patient` drops
+        that patient's own readings.
+        """
+        query = self.embedder.embed([row])
+        self._catch_up()
+        with self._lock:
+            if not len(self):
+                return []
+            # Over-fetch so excluded readings do not leave the result short
+            fetch = k if exclude_patient is None else k * 4 + 16
+            if self._faiss is not None:
+                distances, positions = self._faiss.search(query, min(fetch, len(self)))
+                candidates = positions[0][positions[0] >= 0]
+                distances = distances[0][: len(candidates)]
+            else:
+                if self.centroids is None:
+                    candidates = np.arange(len(self))
+                else:
+                    probes = _nearest(query, self.centroids, nprobe)[0]
+                    candidates = np.concatenate([self._inverted_list(j) for j in probes.tolist()])
+                diff = self.vectors[candidates] - query
+                distances = np.einsum("ij,ij->i", diff, diff)
+                top = np.argsort(distances, kind="stable")[:fetch]
+                candidates, distances = candidates[top], distances[top]
+            ids = self.ids[candidates]
+
+        results = []
+        for (vitals_id, patient_id), distance in zip(ids.tolist(), distances.tolist()):
+            if exclude_patient is not None and patient_id == exclude_patient:
+                continue
+            results.append((vitals_id, patient_id, float(np.sqrt(max(distance, 0.0)))))
+            if len(results) == k:
+                break
+        return results
+
+
+# Opened by app.main's startup (None when SIMILAR_CASES=0)
+case_index = None
+
+
+def open_case_index():
+    global case_index
+    if SIMILAR_CASES_ENABLED and case_index is None:
+        case_index = CaseIndex()
+    return case_index
+
+
+def close_case_index():
+    global case_index
+    if case_index is not None:
+        case_index.wait_for_training()
+        case_index.save()
+        case_index = None
+
+
+def index_readings(rows):
+    """Add stored readings to the index, if one is open"""
+    if case_index is not None:
+        case_index.add_readings(rows)
+
+
+def get_case_index():
+    return case_index
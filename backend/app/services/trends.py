@@ -0,0 +1,164 @@
+"""
+Per-patient deterioration trends, updated in O(1) per reading.
+
+For each tracked value the state holds exponentially time-decayed sums of
+a weighted least-squares fit over reading times (in hours, measured from the
+latest reading):
+
+    w, w*t, w*t^2, w*y, w*t*y
+
+Each new reading shifts the time origin to itself, decays the old sums by
+exp(-dt / TREND_WINDOW_HOURS) and adds itself with weight 1. From the sums:
+EWMA = sum(w*y) / sum(w), and the slope of the weighted regression line.
+Nothing ever re-reads history. The whole state is a few hundred bytes,
+stored on the patient row (see `to_bytes`).
+"""
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+TREND_WINDOW_HOURS = float(os.getenv("TREND_WINDOW_HOURS", "2"))
+
+# Tracked values: rule engine name -> VitalSigns column
+TREND_FIELDS = {
+    'news2': 'news2_score',
+    'sbp': 'blood_pressure_systolic',
+    'dbp': 'blood_pressure_diastolic',
+    'hr': 'heart_rate',
+    'temp': 'temperature',
+    'rr': 'respiratory_rate',
+    'spo2': 'oxygen_saturation',
+}
+_FIELD_INDEX = {name: i for i, name in enumerate(TREND_FIELDS)}
+
+# Name -> (label, direction of deterioration, change over the window worth reporting)
+DETERIORATION = {
+    'news2': ('NEWS2', 1, 2),
+    'sbp': ('Systolic BP', -1, 20),
+    'hr': ('Heart rate', 1, 20),
+    'temp': ('Temperature', 1, 1.0),
+    'rr': ('Respiratory rate', 1, 5),
+    'spo2': ('SpO2', -1, 3),
+}
+
+# A slope needs readings spread over at least this long (hours^2 of variance)
+MIN_TIME_VARIANCE = (10 / 60) ** 2
+
+W, WT, WTT, WY, WTY = range(5)
+
+
+@dataclass
+class TrendState:
+    sums: np.ndarray  # (len(TREND_FIELDS), 5)
+    readings: int = 0
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((len(TREND_FIELDS), 5)))
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data:
+            return cls.empty()
+        flat = np.frombuffer(data, dtype="<f8")
+        return cls(flat[1:].reshape(len(TREND_FIELDS), 5).copy(), int(flat[0]))
+
+    def to_bytes(self):
+        return np.concatenate([[self.readings], self.sums.ravel()]).astype("<f8").tobytes()
+
+    def update(self, values, hours_since_last, window_hours=TREND_WINDOW_HOURS):
+        """Add one reading `hours_since_last` after the previous one"""
+        dt = max(hours_since_last, 0.0) if self.readings else 0.0
+        s = self.sums
+        if dt:
+            # Move the time origin to the new reading (old points at t - dt)
+            s[:, WTY] -= dt * s[:, WY]
+            s[:, WTT] += -2 * dt * s[:, WT] + dt * dt * s[:, W]
+            s[:, WT] -= dt * s[:, W]
+            s *= math.exp(-dt / window_hours)
+        for name, value in values.items():
+            if value is not None and name in _FIELD_INDEX:
+                row = s[_FIELD_INDEX[name]]
+                row[W] += 1
+                row[WY] += value
+        self.readings += 1
+        return self
+
+    def ewma(self, name):
+        row = self.sums[_FIELD_INDEX[name]]
+        return row[WY] / row[W] if row[W] else None
+
+    def slope(self, name):
+        """Change per hour of the weighted regression line, if well defined"""
+        row = self.sums[_FIELD_INDEX[name]]
+        if row[W] < 2:
+            return None
+        mean_t = row[WT] / row[W]
+        var_t = row[WTT] / row[W] - mean_t * mean_t
+        if var_t < MIN_TIME_VARIANCE:
+            return None
+        cov = row[WTY] / row[W] - mean_t * (row[WY] / row[W])
+        return cov / var_t
+
+
+def trend_values(row):
+    """Tracked values of a stored reading dict, by rule engine name"""
+    return {name: row.get(column) for name, column in TREND_FIELDS.items()}
+
+
+def trend_findings(state, hours_since_alert=None, window_hours=TREND_WINDOW_HOURS):
+    """Deteriorating trends worth showing, e.g. 'NEWS2 rising by 3 over 2h'"""
+    findings = []
+    for name, (label, direction, threshold) in DETERIORATION.items():
+        slope = state.slope(name)
+        if slope is None:
+            continue
+        change = slope * window_hours
+        if change * direction >= threshold:
+            verb = "rising" if change > 0 else "falling"
+            findings.append(f"{label} {verb} by {abs(change):.{1 if name == 'temp' else 0}f} over {window_hours:g}h")
+    if findings and hours_since_alert is not None:
+        findings.append(f"Last medium/high alert {hours_since_alert:.1f}h ago")
+    return findings
+
+
+def hours_between(earlier, later):
+    if earlier is None or later is None:
+        return None
+    return (later - earlier).total_seconds() / 3600
+
+
+@dataclass
+class TrendUpdate:
+    state: TrendState
+    updated_at: Optional[datetime]
+    last_alert_at: Optional[datetime]
+    findings: List[str]
+
+    def columns(self):
+        """Patient column values to persist"""
+        return {
+            'trend_state': self.state.to_bytes(),
+            'trend_updated_at': self.updated_at,
+            'last_alert_at': self.last_alert_at,
+        }
+
+
+def apply_reading(state_bytes, updated_at, last_alert_at, row, at, is_alert):
+    """
+    Fold one reading (a dict with the VitalSigns columns) taken at `at` into
+    a patient's persisted trend state. Readings older than the state are
+    not folded in (the time axis only moves forward) but still get findings.
+    """
+    state = TrendState.from_bytes(state_bytes)
+    if updated_at is None or at >= updated_at:
+        state.update(trend_values(row), hours_between(updated_at, at) or 0.0)
+        updated_at = at
+    findings = trend_findings(state, hours_between(last_alert_at, at))
+    if is_alert:
+        last_alert_at = max(last_alert_at or at, at)
+    return TrendUpdate(state, updated_at, last_alert_at, findings)
@@ -0,0 +1,286 @@
+"""
+Columnar archive of old vital signs (see app.jobs.archive_vitals).
+
+Layout, one directory per patient and calendar month (UTC, by recorded_at):
+
+    <VITALS_ARCHIVE_DIR>/patient=<id>/month=<YYYY-MM>.v<N>/<column>.npy
+
+Each column is a plain .npy file, opened with mmap_mode="r" on read, and
+rows within a partition are sorted by recorded_at. Text columns (e.g.
+ai_interpretation, which repeats a lot) are dictionary encoded: an int32
+code per row in <column>.npy (-1 for NULL) plus the distinct values in
+<column>.dict.json.
+
+Partitions are immutable. A rewrite (archiving more rows into a month)
+writes a new version directory, month=<YYYY-MM>.v<N>, and then atomically
+replaces the patient's manifest.json, which maps each month to its current
+version. Readers load the manifest once and so see a consistent snapshot.
+If the writer deletes a superseded version mid-read, the read is retried
+from the new manifest. Only the writer, holding the archive's lock file,
+changes anything on disk, including cleaning up after an interrupted
+rewrite. Patients archived before manifests existed (plain month=<YYYY-MM>
+directories) are still read, and get a manifest on their next rewrite.
+"""
+import fcntl
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+VITALS_ARCHIVE_DIR = os.getenv("VITALS_ARCHIVE_DIR", "./vitals_archive")
+
+# Column -> NumPy dtype for numeric columns (NULL weight is stored as NaN)
+NUMERIC_COLUMNS = {
+    "id": "int64",
+    "recorded_at": "datetime64[us]",
+    "blood_pressure_systolic": "int32",
+    "blood_pressure_diastolic": "int32",
+    "heart_rate": "int32",
+    "temperature": "float64",
+    "respiratory_rate": "int32",
+    "oxygen_saturation": "int32",
+    "weight": "float64",
+    "news2_score": "int32",
+}
+TEXT_COLUMNS = ["recorded_by_email", "alert_level", "ai_interpretation", "notes"]
+ARCHIVED_COLUMNS = list(NUMERIC_COLUMNS) + TEXT_COLUMNS
+
+MANIFEST = "manifest.json"
+
+# Reads retried when the writer removes a partition under them
+READ_ATTEMPTS = 3
+
+
+def month_of(timestamp):
+    return f"{timestamp.year:04d}-{timestamp.month:02d}"
+
+
+def _month_bounds(month):
+    start = np.datetime64(month, "M")
+    return start.astype("datetime64[us]"), (start + 1).astype("datetime64[us]")
+
+
+def _encode_text(values):
+    distinct = sorted({v for v in values if v is not None})
+    index = {v: i for i, v in enumerate(distinct)}
+    codes = np.array([-1 if v is None else index[v] for v in values], dtype=np.int32)
+    return codes, distinct
+
+
+def _column_array(name, values):
+    dtype = NUMERIC_COLUMNS[name]
+    if name == "weight":
+        values = [np.nan if v is None else v for v in values]
+    return np.array(values, dtype=dtype)
+
+
+class VitalsArchive:
+    def __init__(self, root=VITALS_ARCHIVE_DIR):
+        self.root = Path(root)
+
+    def _patient_dir(self, patient_id):
+        return self.root / f"patient={int(patient_id)}"
+
+    def manifest(self, patient_id):
+        """Month -> partition directory name: a snapshot of the patient's archive"""
+        patient_dir = self._patient_dir(patient_id)
+        try:
+            return json.loads((patient_dir / MANIFEST).read_text())
+        except FileNotFoundError:
+            if not patient_dir.is_dir():
+                return {}
+            # Written before manifests: one month=<YYYY-MM> directory per month
+            return {
+                p.name[len("month="):]: p.name
+                for p in patient_dir.glob("month=*")
+                if p.is_dir() and "." not in p.name
+            }
+
+    def months(self, patient_id):
+        """Archived months of a patient, oldest first"""
+        return sorted(self.manifest(patient_id))
+
+    @contextmanager
+    def _writer_lock(self):
+        """Held by whoever changes the archive (one archive job at a time, across processes)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".writer.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _recover(self, patient_dir, manifest):
+        """Writer only: finish or discard whatever an interrupted rewrite left behind"""
+        for old in patient_dir.glob(".month=*.old"):
+            # Pre-manifest rewrites moved the live partition aside first
+            target = old.with_name(old.name[1:-len(".old")])
+            if target.exists():
+                shutil.rmtree(old)
+            else:
+                old.rename(target)
+                manifest.setdefault(target.name[len("month="):], target.name)
+        for tmp in patient_dir.glob(".month=*.tmp"):
+            shutil.rmtree(tmp)
+        live = set(manifest.values())
+        for partition in patient_dir.glob("month=*"):
+            if partition.name not in live:
+                shutil.rmtree(partition)
+
+    def _write_manifest(self, patient_dir, manifest):
+        tmp = patient_dir / f".{MANIFEST}.tmp"
+        tmp.write_text(json.dumps(manifest, sort_keys=True))
+        os.replace(tmp, patient_dir / MANIFEST)
+
+    def _load(self, partition, columns, mmap=True):
+        data = {}
+        for name in columns:
+            data[name] = np.load(partition / f"{name}.npy", mmap_mode="r" if mmap else None)
+            if name in TEXT_COLUMNS:
+                distinct = json.loads((partition / f"{name}.dict.json").read_text())
+                data[name] = (data[name], distinct)
+        return data
+
+    def _decode_partition(self, partition):
+        """All columns of a partition as plain lists (for rewriting)"""
+        loaded = self._load(partition, ARCHIVED_COLUMNS, mmap=False)
+        rows = {}
+        for name in ARCHIVED_COLUMNS:
+            if name in TEXT_COLUMNS:
+                codes, distinct = loaded[name]
+                rows[name] = [None if c < 0 else distinct[c] for c in codes.tolist()]
+            elif name == "recorded_at":
+                rows[name] = loaded[name].astype("datetime64[us]").tolist()
+            else:
+                values = loaded[name].tolist()
+                rows[name] = [None if v != v else v for v in values] if name == "weight" else values
+        return rows
+
+    def append(self, patient_id, month, rows):
+        """
+        Add rows (dicts with ARCHIVED_COLUMNS) to a partition. Rows whose id
+        is already archived are skipped, so re-running after a crash is safe.
+        Returns the number of rows added.
+        """
+        patient_dir = self._patient_dir(patient_id)
+        with self._writer_lock():
+            manifest = self.manifest(patient_id)
+            if patient_dir.is_dir():
+                self._recover(patient_dir, manifest)
+            current = manifest.get(month)
+
+            columns = {name: [] for name in ARCHIVED_COLUMNS}
+            if current is not None:
+                columns = self._decode_partition(patient_dir / current)
+            known = set(columns["id"])
+            new_rows = [row for row in rows if row["id"] not in known]
+            if not new_rows:
+                return 0
+            for row in new_rows:
+                for name in ARCHIVED_COLUMNS:
+                    columns[name].append(row[name])
+
+            order = sorted(range(len(columns["id"])), key=lambda i: (columns["recorded_at"][i], columns["id"][i]))
+            version = int(current.rpartition(".v")[2]) + 1 if current and ".v" in current else 1
+            partition = patient_dir / f"month={month}.v{version}"
+            tmp = patient_dir / f".{partition.name}.tmp"
+            tmp.mkdir(parents=True)
+            for name in ARCHIVED_COLUMNS:
+                values = [columns[name][i] for i in order]
+                if name in TEXT_COLUMNS:
+                    codes, distinct = _encode_text(values)
+                    np.save(tmp / f"{name}.npy", codes)
+                    (tmp / f"{name}.dict.json").write_text(json.dumps(distinct))
+                else:
+                    np.save(tmp / f"{name}.npy", _column_array(name, values))
+            tmp.rename(partition)
+
+            # Readers switch to the new version when the manifest is replaced
+            manifest[month] = partition.name
+            self._write_manifest(patient_dir, manifest)
+            if current is not None:
+                shutil.rmtree(patient_dir / current, ignore_errors=True)
+            return len(new_rows)
+
+    def _read(self, read):
+        """Run a read against a fresh snapshot, again if a partition vanished under it"""
+        for attempt in range(READ_ATTEMPTS):
+            try:
+                return read()
+            except FileNotFoundError:
+                if attempt == READ_ATTEMPTS - 1:
+                    raise
+
+    def read_columns(self, patient_id, columns, since=None, until=None):
+        """
+        Archived values of `columns` (numeric only) plus recorded_at in
+        [since, until), oldest first, as NumPy arrays.
+        """
+        names = ["recorded_at", *[c for c in columns if c != "recorded_at"]]
+
+        def read():
+            parts = {name: [] for name in names}
+            for partition, lo, hi in self._partitions(patient_id, since, until):
+                data = self._load(partition, names)
+                for name in names:
+                    parts[name].append(data[name][lo:hi])
+            return {
+                name: np.concatenate(chunks) if chunks else np.empty(0, dtype=NUMERIC_COLUMNS[name])
+                for name, chunks in parts.items()
+            }
+
+        return self._read(read)
+
+    def read_rows(self, patient_id, since=None, until=None, limit=None):
+        """Archived rows in [since, until) as dicts, newest first"""
+
+        def read():
+            rows = []
+            for partition, lo, hi in reversed(self._partitions(patient_id, since, until)):
+                data = self._load(partition, ARCHIVED_COLUMNS)
+                for i in range(hi - 1, lo - 1, -1):
+                    row = {"patient_id": int(patient_id)}
+                    for name in ARCHIVED_COLUMNS:
+                        if name in TEXT_COLUMNS:
+                            codes, distinct = data[name]
+                            row[name] = None if codes[i] < 0 else distinct[codes[i]]
+                        else:
+                            row[name] = data[name][i].item()
+                    if row["weight"] != row["weight"]:
+                        row["weight"] = None
+                    rows.append(row)
+                    if limit is not None and len(rows) >= limit:
+                        return rows
+            return rows
+
+        return self._read(read)
+
+    def _partitions(self, patient_id, since, until):
+        """(partition dir, lo, hi) row ranges overlapping [since, until), oldest first"""
+        since = None if since is None else np.datetime64(since, "us")
+        until = None if until is None else np.datetime64(until, "us")
+        found = []
+        patient_dir = self._patient_dir(patient_id)
+        manifest = self.manifest(patient_id)
+        for month in sorted(manifest):
+            start, end = _month_bounds(month)
+            if (since is not None and end <= since) or (until is not None and start >= until):
+                continue
+            partition = patient_dir / manifest[month]
+            times = np.load(partition / "recorded_at.npy", mmap_mode="r")
+            lo = 0 if since is None else int(np.searchsorted(times, since, side="left"))
+            hi = len(times) if until is None else int(np.searchsorted(times, until, side="left"))
+            if hi > lo:
+                found.append((partition, lo, hi))
+        return found
+
+
+vitals_archive = VitalsArchive()
+
+
+def get_vitals_archive():
+    return vitals_archive
@@ -0,0 +1,302 @@
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import case, insert, select, update
+
+from app.metrics import record_readings
+from app.models.patient import Patient
+from app.models.vitals import VitalSigns
+from app.services.ai_service import interpret_vitals, interpret_vitals_batch
+from app.services.alert_bus import alert_bus
+from app.services.news2_calculator import calculate_news2, get_alert_level, score_batch
+from app.services.patient_cache import CACHED_COLUMNS, entry_from_row, patient_cache
+from app.services.similar_cases import index_readings
+from app.services.trends import apply_reading
+from app.telemetry import span
+
+# Map alert levels to patient status
+STATUS_BY_ALERT = {
+    'low': 'stable',
+    'medium': 'monitoring',
+    'high': 'alert'
+}
+
+# Alert levels published on the alert stream even without a status change
+ALERTING_LEVELS = {'medium', 'high'}
+
+# Read with every reading, never cached (see app.services.patient_cache)
+TREND_COLUMNS = [Patient.trend_state, Patient.trend_updated_at, Patient.last_alert_at]
+
+logger = logging.getLogger(__name__)
+
+
+class PatientNotFound(LookupError):
+    pass
+
+
+def publish_reading(row, ward, status, status_changed):
+    """Publish a stored reading if it changed the status or is an alert"""
+    if not status_changed and row['alert_level'] not in ALERTING_LEVELS:
+        return
+    alert_bus.publish({
+        'type': 'status_change' if status_changed else 'alert',
+        'patient_id': row['patient_id'],
+        'ward': ward,
+        'status': status,
+        'vitals_id': row['id'],
+        'news2_score': row['news2_score'],
+        'alert_level': row['alert_level'],
+        'recorded_at': row['recorded_at'].isoformat() if row['recorded_at'] else None,
+    })
+
+
+def after_commit(effect, *args):
+    """Run a side effect of a committed write; log failures, the write stands"""
+    try:
+        effect(*args)
+    except Exception:
+        logger.exception("%s failed after commit", effect.__name__)
+
+
+def publish_readings(rows, wards, changes):
+    for row, (status, changed) in zip(rows, changes):
+        publish_reading(row, wards[row['patient_id']], status, changed)
+
+
+def index_stored(rows):
+    """Add committed readings to the similar-case index; never fails the write"""
+    try:
+        with span("similar_cases"):
+            index_readings(rows)
+    except Exception:
+        logger.exception("similar-case indexing failed", extra={"rows": len(rows)})
+
+
+def record_vitals_reading(db, vitals_dict):
+    """
+    Score, interpret and store one reading in three statements plus commit:
+
+    1. SELECT the patient's trend state, which is also the existence check.
+       Medications, ward and status come from the patient cache; on a miss
+       they are read by the same SELECT and cached after the commit;
+    2. INSERT INTO vital_signs ... RETURNING id;
+    3. UPDATE patients SET trend state, status ... RETURNING
+       status_changed_at, the only write to the patient row. Status only
+       depends on NEWS2, so it is known up front; status_changed_at is only
+       bumped when the stored status actually changes, which tells us
+       whether to publish a status change.
+
+    Returns (row, interpretation) where row is the stored reading as a dict.
+    Raises PatientNotFound (after rolling back) for an unknown patient.
+    """
+    with span("news2"):
+        news2_score = calculate_news2(vitals_dict)
+        alert = get_alert_level(news2_score)
+
+    status = STATUS_BY_ALERT.get(alert['level'], 'stable')
+    now = datetime.utcnow()
+    patient_id = vitals_dict['patient_id']
+    with span("patient_lookup"):
+        generation = patient_cache.generation
+        entry = patient_cache.get(patient_id)
+        columns = TREND_COLUMNS if entry is not None else TREND_COLUMNS + CACHED_COLUMNS
+        patient = db.execute(select(*columns).where(Patient.id == patient_id)).first()
+    if patient is None:
+        db.rollback()
+        if entry is not None:
+            patient_cache.invalidate(patient_id)
+        raise PatientNotFound(patient_id)
+    cached = entry is not None
+    if not cached:
+        entry = entry_from_row(patient)
+
+    row = {
+        **vitals_dict,
+        'news2_score': news2_score,
+        'alert_level': alert['level'],
+        'recorded_at': now,
+    }
+    trend = apply_reading(
+        patient.trend_state, patient.trend_updated_at, patient.last_alert_at,
+        row, now, alert['level'] in ALERTING_LEVELS,
+    )
+
+    with span("interpretation"):
+        interpretation = interpret_vitals(
+            vitals_data=vitals_dict,
+            patient_data=SimpleNamespace(medications=entry['medications']),
+            news2_score=news2_score,
+            trends=trend.findings,
+        )
+    row['ai_interpretation'] = interpretation.text
+
+    with span("commit"):
+        row['id'] = db.execute(insert(VitalSigns).values(**row).returning(VitalSigns.id)).scalar_one()
+        status_changed_at = db.execute(
+            update(Patient)
+            .where(Patient.id == patient_id)
+            .values(
+                status=status,
+                status_changed_at=case(
+                    (Patient.status.is_distinct_from(status), now),
+                    else_=Patient.status_changed_at,
+                ),
+                **trend.columns(),
+            )
+            .returning(Patient.status_changed_at)
+        ).scalar_one()
+        db.commit()
+    status_changed = status_changed_at == now
+    if entry['status'] != status:
+        # Another request may commit a newer status before we could store
+        # ours, so drop the entry and let the next read load the latest
+        after_commit(patient_cache.invalidate, patient_id)
+    elif not cached:
+        after_commit(patient_cache.put, patient_id, entry, generation)
+    after_commit(record_readings, [alert['level']], [interpretation.rules_fired])
+    after_commit(publish_reading, row, entry['ward'], status, status_changed)
+    index_stored([row])
+    return row, interpretation
+
+
+def _store_readings(db, vitals_rows, patients):
+    """
+    Score, interpret, insert and commit readings of known patients in one
+    transaction. `patients` maps patient id to a row with medications,
+    status, ward and trend state. Returns (rows, interpretations) with each
+    row's id and recorded_at filled in.
+    """
+    scores, levels = score_batch(vitals_rows)
+    now = datetime.utcnow()
+
+    rows = []
+    latest_status = {pid: patient.status for pid, patient in patients.items()}
+    trends = {
+        pid: (patient.trend_state, patient.trend_updated_at, patient.last_alert_at)
+        for pid, patient in patients.items()
+    }
+    touched = set()
+    changes = []
+    findings = []
+    for vitals_dict, score, level in zip(vitals_rows, scores, levels):
+        level = str(level)
+        row = {
+            **vitals_dict,
+            'news2_score': int(score),
+            'alert_level': level,
+            'recorded_at': now,
+        }
+        rows.append(row)
+        # Readings apply in order: the last one decides the patient's status
+        pid = vitals_dict['patient_id']
+        status = STATUS_BY_ALERT.get(level, 'stable')
+        changes.append((status, status != latest_status[pid]))
+        latest_status[pid] = status
+        trend = apply_reading(*trends[pid], row, now, level in ALERTING_LEVELS)
+        trends[pid] = (trend.state.to_bytes(), trend.updated_at, trend.last_alert_at)
+        touched.add(pid)
+        findings.append(trend.findings)
+
+    interpretations = interpret_vitals_batch(
+        vitals_rows,
+        [patients[v['patient_id']].medications for v in vitals_rows],
+        [row['news2_score'] for row in rows],
+        findings,
+    )
+    for row, interpretation in zip(rows, interpretations):
+        row['ai_interpretation'] = interpretation.text
+
+    patient_updates = []
+    for pid in touched:
+        trend_state, trend_updated_at, last_alert_at = trends[pid]
+        values = {
+            "id": pid,
+            "trend_state": trend_state,
+            "trend_updated_at": trend_updated_at,
+            "last_alert_at": last_alert_at,
+            "status": latest_status[pid],
+            "status_changed_at": patients[pid].status_changed_at,
+        }
+        if latest_status[pid] != patients[pid].status:
+            values["status_changed_at"] = now
+        patient_updates.append(values)
+
+    try:
+        ids = db.scalars(
+            insert(VitalSigns).returning(VitalSigns.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        db.execute(update(Patient), patient_updates)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for row, vid in zip(rows, ids):
+        row['id'] = vid
+    changed = [pid for pid in touched if latest_status[pid] != patients[pid].status]
+    if changed:
+        after_commit(patient_cache.invalidate, *changed)
+    after_commit(record_readings, [row['alert_level'] for row in rows], [i.rules_fired for i in interpretations])
+    wards = {pid: patient.ward for pid, patient in patients.items()}
+    after_commit(publish_readings, rows, wards, changes)
+    index_stored(rows)
+    return rows, interpretations
+
+
+def _patients_by_id(db, patient_ids):
+    rows = db.query(
+        Patient.id, Patient.medications, Patient.status, Patient.ward, Patient.status_changed_at,
+        Patient.trend_state, Patient.trend_updated_at, Patient.last_alert_at,
+    ).filter(Patient.id.in_(patient_ids))
+    return {row.id: row for row in rows}
+
+
+def record_vitals_readings(db, vitals_dicts):
+    """
+    Store many single readings with one commit (used by group commit).
+
+    Returns one result per input, in order: (row, interpretation) like
+    `record_vitals_reading`, or a PatientNotFound instance.
+    """
+    patients = _patients_by_id(db, {v['patient_id'] for v in vitals_dicts})
+    known = [v for v in vitals_dicts if v['patient_id'] in patients]
+    stored = iter(())
+    if known:
+        stored = zip(*_store_readings(db, known, patients))
+    return [
+        next(stored) if v['patient_id'] in patients else PatientNotFound(v['patient_id'])
+        for v in vitals_dicts
+    ]
+
+
+def ingest_vitals_batch(db, readings):
+    """
+    Score, interpret and store many readings in one transaction.
+
+    `readings` is a list of (index, VitalsCreate) pairs; the index is only
+    echoed back so callers can match results to their input. Readings for
+    unknown patients are reported as errors and skipped, the rest are
+    inserted. Returns (inserted, errors) where inserted is a list of
+    {"index", "id"} and errors a list of {"index", "detail"}.
+    """
+    errors = []
+    if not readings:
+        return [], errors
+
+    patients = _patients_by_id(db, {vitals.patient_id for _, vitals in readings})
+
+    valid = []
+    for index, vitals in readings:
+        if vitals.patient_id in patients:
+            valid.append((index, vitals.dict()))
+        else:
+            errors.append({"index": index, "detail": "Patient not found"})
+    if not valid:
+        return [], errors
+
+    vitals_rows = [vitals_dict for _, vitals_dict in valid]
+    rows, _ = _store_readings(db, vitals_rows, patients)
+
+    inserted = [{"index": index, "id": row['id']} for (index, _), row in zip(valid, rows)]
+    return inserted, errors
@@ -0,0 +1,102 @@
+from sqlalchemy import nulls_last, select, text
+
+from app.models.latest_vitals import LatestVitals
+from app.models.patient import Patient
+
+# Columns copied from vital_signs into latest_vitals (vitals_id <- id)
+PROJECTED_COLUMNS = [
+    "recorded_at",
+    "blood_pressure_systolic",
+    "blood_pressure_diastolic",
+    "heart_rate",
+    "temperature",
+    "respiratory_rate",
+    "oxygen_saturation",
+    "news2_score",
+    "alert_level",
+]
+
+_TARGET = ", ".join(["patient_id", "vitals_id", *PROJECTED_COLUMNS])
+_NEW_VALUES = ", ".join(["new.patient_id", "new.id", *(f"new.{c}" for c in PROJECTED_COLUMNS)])
+_EXCLUDED = ", ".join(f"{c} = excluded.{c}" for c in ["vitals_id", *PROJECTED_COLUMNS])
+_FROM_NEW = ", ".join(f"{c} = new.{c}" for c in PROJECTED_COLUMNS)
+
+# The triggers keep latest_vitals current inside the transaction that writes
+# vital_signs, whichever code path does the write. A reading only replaces
+# the projection if it is newer (backfilled readings do not). Deleting
+# readings (archiving) leaves the projection alone: the last reading stays
+# the last reading even once it has moved to the archive.
+SQLITE_LATEST_VITALS_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS latest_vitals_ai AFTER INSERT ON vital_signs BEGIN
+        INSERT INTO latest_vitals ({_TARGET}) VALUES ({_NEW_VALUES})
+        ON CONFLICT(patient_id) DO UPDATE SET {_EXCLUDED}
+        WHERE (excluded.recorded_at, excluded.vitals_id)
+            > (latest_vitals.recorded_at, latest_vitals.vitals_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS latest_vitals_au
+    AFTER UPDATE OF {", ".join(PROJECTED_COLUMNS)} ON vital_signs BEGIN
+        UPDATE latest_vitals SET {_FROM_NEW} WHERE vitals_id = new.id;
+    END
+    """,
+]
+
+# Fills the projection from existing readings when the triggers are installed
+SQLITE_LATEST_VITALS_BACKFILL = f"""
+    INSERT OR REPLACE INTO latest_vitals ({_TARGET})
+    SELECT patient_id, id, {", ".join(PROJECTED_COLUMNS)} FROM vital_signs v
+    WHERE v.id = (
+        SELECT w.id FROM vital_signs w WHERE w.patient_id = v.patient_id
+        ORDER BY w.recorded_at DESC, w.id DESC LIMIT 1
+    )
+"""
+
+
+def install_latest_vitals(bind):
+    """Create the latest_vitals triggers (and backfill) if they do not exist yet"""
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        installed = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'latest_vitals_ai'"
+        )).first()
+        if installed:
+            return
+        for statement in SQLITE_LATEST_VITALS_DDL:
+            conn.execute(text(statement))
+        conn.execute(text(SQLITE_LATEST_VITALS_BACKFILL))
+
+
+SNAPSHOT_COLUMNS = [
+    Patient.id.label("patient_id"),
+    Patient.hospital_number,
+    Patient.full_name,
+    Patient.status,
+    Patient.ward,
+    LatestVitals.vitals_id,
+    *(getattr(LatestVitals, c) for c in PROJECTED_COLUMNS),
+]
+
+
+def build_snapshot_query(statuses=None, sort="score_desc", limit=500, wards=None):
+    """
+    One query for the ward view: every patient (optionally only those with
+    the given statuses / in the given wards) with their latest reading, if
+    any. Patients without readings sort last.
+    """
+    query = select(*SNAPSHOT_COLUMNS).outerjoin(LatestVitals, LatestVitals.patient_id == Patient.id)
+    if wards:
+        query = query.where(Patient.ward.in_(wards))
+    if statuses:
+        query = query.where(Patient.status.in_(statuses))
+    if sort == "score_desc":
+        query = query.order_by(nulls_last(LatestVitals.news2_score.desc()), Patient.id)
+    elif sort == "score_asc":
+        query = query.order_by(nulls_last(LatestVitals.news2_score.asc()), Patient.id)
+    elif sort == "recorded_at":
+        query = query.order_by(nulls_last(LatestVitals.recorded_at.desc()), Patient.id)
+    else:
+        query = query.order_by(Patient.id)
+    return query.limit(limit)
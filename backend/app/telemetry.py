@@ -0,0 +1,144 @@
+"""
+Structured logging and per-request stage timings.
+
+Log records are handed to a queue and written as JSON lines by a background
+listener thread, so request handlers never block on stdout. Use %-style
+arguments or `extra=` fields (never pre-formatted f-strings) so nothing is
+formatted when the level is disabled.
+
+Stage timings: wrap each stage of a request in `span("name")`. The
+middleware collects the spans of the current request, returns them in a
+`Server-Timing` header and logs them at DEBUG.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from contextlib import contextmanager
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+logger = logging.getLogger("app.requests")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+_listener = None
+
+
+def setup_logging(level=LOG_LEVEL, stream=None):
+    """Route the `app` loggers through a queue to a JSON stream handler"""
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level)
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.propagate = False
+
+
+class RequestTimings:
+    """Stage name -> milliseconds for one request"""
+
+    def __init__(self):
+        self.spans = {}
+
+    def add(self, name, elapsed_ms):
+        self.spans[name] = self.spans.get(name, 0.0) + elapsed_ms
+
+    def server_timing(self):
+        return ", ".join(f"{name};dur={ms:.3f}" for name, ms in self.spans.items())
+
+
+_current_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def span(name):
+    """Time a stage of the current request (no-op outside a request)"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - start) * 1000)
+
+
+def current_timings():
+    return _current_timings.get()
+
+
+class TimingMiddleware:
+    """ASGI middleware collecting `span` timings for each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        status = None
+
+        async def send_with_timings(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timings.add("total", (time.perf_counter() - start) * 1000)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _current_timings.reset(token)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "request timings",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "spans_ms": timings.spans,
+                },
+            )
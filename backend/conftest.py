@@ -0,0 +1,92 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Ensure we can import from app
+sys.path.append(os.getcwd())
+
+# The module-level engines use a throwaway database file, never the
+# checked-in healthcare_erp.db or one in the current directory
+TEST_DB_DIR = tempfile.mkdtemp(prefix="healthcare_erp_test_")
+os.environ["SQLITE_DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DB_DIR, 'healthcare_erp.db')}"
+# That database is migrated once below, not by every client's startup
+os.environ["AUTO_MIGRATE"] = "0"
+# Tests that need the similar-case index open their own (see test_similar_cases.py)
+os.environ["SIMILAR_CASES"] = "0"
+
+from app.migrations import init_db
+
+# test_db.py queries the module-level database directly
+init_db()
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def engine():
+    """Fresh in-memory SQLite database per test"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    init_db(engine)
+    # Patient ids repeat across tests
+    from app.services.patient_cache import patient_cache
+
+    patient_cache.clear()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Empty vitals archive in a temporary directory"""
+    from app.services.vitals_archive import VitalsArchive
+
+    return VitalsArchive(tmp_path / "vitals_archive")
+
+
+@pytest.fixture
+def client(engine, archive):
+    """TestClient for the API, wired to the in-memory database"""
+    from fastapi.testclient import TestClient
+    from app.database import get_db, get_write_db
+    from app.main import app
+    from app.services.vitals_archive import get_vitals_archive
+
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_db
+    app.dependency_overrides[get_vitals_archive] = lambda: archive
+    try:
+        # Entering the client runs the app's startup/shutdown
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
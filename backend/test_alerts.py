@@ -0,0 +1,124 @@
+import asyncio
+import json
+from datetime import date
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import init_db
+from app.models import Patient
+from app.routes.alerts import alert_event_stream
+from app.services.alert_bus import AlertBus, alert_bus
+
+
+def reading(patient_id, high=False):
+    return {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 85 if high else 120, "blood_pressure_diastolic": 50 if high else 80,
+        "heart_rate": 125 if high else 80, "temperature": 37.0, "respiratory_rate": 22 if high else 16,
+        "oxygen_saturation": 95 if high else 98, "weight": 70.0, "notes": "",
+    }
+
+
+def test_bus_routes_by_ward_and_patient():
+    async def scenario():
+        bus = AlertBus()
+        everything = bus.subscribe()
+        icu = bus.subscribe(wards=["ICU"])
+        patient_7 = bus.subscribe(patient_ids=[7])
+        assert bus.subscriber_count == 3
+
+        assert bus.publish({"type": "alert", "patient_id": 7, "ward": "ICU"}) == 3
+        assert bus.publish({"type": "alert", "patient_id": 8, "ward": "A&E"}) == 1
+
+        assert [e["patient_id"] for e in (await everything.get(timeout=1))[0]] == [7, 8]
+        assert [e["patient_id"] for e in (await icu.get(timeout=1))[0]] == [7]
+        assert [e["patient_id"] for e in (await patient_7.get(timeout=1))[0]] == [7]
+        assert await icu.get(timeout=0.01) == ([], 0)
+
+        icu.close()
+        assert bus.subscriber_count == 2
+        assert bus.publish({"type": "alert", "patient_id": 9, "ward": "ICU"}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_keeps_newest_events():
+    async def scenario():
+        bus = AlertBus()
+        slow = bus.subscribe(buffer_size=3)
+        for i in range(10):
+            bus.publish({"type": "alert", "patient_id": i, "ward": None})
+        events, dropped = await slow.get(timeout=1)
+        assert [e["patient_id"] for e in events] == [7, 8, 9]
+        assert dropped == 7
+
+    asyncio.run(scenario())
+
+
+def test_vitals_writes_publish_alerts(client, db):
+    db.add(Patient(id=1, hospital_number="P001", full_name="Ward Patient", ward="ICU",
+                   date_of_birth=date(1970, 1, 1), age=56, gender="F", medications=""))
+    db.add(Patient(id=2, hospital_number="P002", full_name="Other Ward", ward="A&E",
+                   date_of_birth=date(1970, 1, 1), age=56, gender="F", medications=""))
+    db.commit()
+
+    async def scenario():
+        subscription = alert_bus.subscribe(wards=["ICU"])
+        try:
+            for patient_id, high in ((1, True), (1, True), (2, True), (1, False), (1, False)):
+                response = await asyncio.to_thread(client.post, "/api/vitals/", json=reading(patient_id, high))
+                assert response.status_code == 200
+            bulk = await asyncio.to_thread(
+                client.post, "/api/vitals/bulk", json=[reading(1), reading(1, high=True)]
+            )
+            assert bulk.status_code == 200
+            return (await subscription.get(timeout=1))[0]
+        finally:
+            subscription.close()
+
+    events = asyncio.run(scenario())
+    assert [(e["type"], e["status"]) for e in events] == [
+        ("status_change", "alert"),  # stable -> alert
+        ("alert", "alert"),          # still high, no change
+        ("status_change", "stable"),  # back to normal; the next normal reading is silent
+        ("status_change", "alert"),  # from the bulk upload
+    ]
+    assert all(e["ward"] == "ICU" and e["patient_id"] == 1 for e in events)
+    assert db.get(Patient, 1).status_changed_at is not None
+
+
+def test_event_stream_frames():
+    class FakeRequest:
+        async def is_disconnected(self):
+            return False
+
+    async def scenario():
+        bus = AlertBus()
+        subscription = bus.subscribe(buffer_size=1)
+        stream = alert_event_stream(FakeRequest(), subscription, heartbeat=0.01)
+        assert await anext(stream) == ": connected\n\n"
+        assert await anext(stream) == ": keep-alive\n\n"
+
+        bus.publish({"type": "alert", "patient_id": 1, "ward": None})
+        bus.publish({"type": "status_change", "patient_id": 2, "ward": None})
+        dropped = await anext(stream)
+        assert dropped.startswith("event: dropped\n") and '"dropped": 1' in dropped
+        frame = await anext(stream)
+        assert frame.startswith("id: 2\nevent: status_change\ndata: ")
+        assert json.loads(frame.split("data: ", 1)[1])["patient_id"] == 2
+
+        await stream.aclose()
+        assert bus.subscriber_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_init_db_adds_new_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE patients (id INTEGER PRIMARY KEY, hospital_number VARCHAR, "
+                          "full_name VARCHAR NOT NULL, date_of_birth DATE, age INTEGER, gender VARCHAR, "
+                          "allergies TEXT, medications TEXT, last_visit DATE, status VARCHAR)"))
+    init_db(engine)
+    columns = {c["name"] for c in inspect(engine).get_columns("patients")}
+    assert {"ward", "status_changed_at"} <= columns
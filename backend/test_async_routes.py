@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_async_sqlite_engine, get_async_db, get_async_write_db, get_db, get_write_db
+from app.models import Patient
+from app.migrations import init_db
+from app.routes import patients, patients_async, vitals_async
+from app.services.trends import TrendState
+from app.services.vitals_archive import VitalsArchive, get_vitals_archive
+
+
+def make_app(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    init_db(sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    Session = async_sessionmaker(async_engine, expire_on_commit=False)
+    WriteSession = async_sessionmaker(
+        create_async_sqlite_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), writer=True),
+        expire_on_commit=False,
+    )
+
+    async def override_get_async_db():
+        async with Session() as db:
+            yield db
+
+    async def override_get_async_write_db():
+        async with WriteSession() as db:
+            yield db
+
+    def override_get_db():
+        with SyncSession() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(patients_async.router)
+    app.include_router(vitals_async.router)
+    app.include_router(patients.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_write_db] = override_get_async_write_db
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_db
+    app.dependency_overrides[get_vitals_archive] = lambda: VitalsArchive(tmp_path / "archive")
+    return app
+
+
+PATIENT = {
+    "hospital_number": "A001", "full_name": "Async Patient",
+    "date_of_birth": "1970-01-01", "age": 56, "gender": "M",
+}
+
+
+def test_async_vitals_round_trip(tmp_path):
+    client = TestClient(make_app(tmp_path))
+    created = client.post("/api/patients/", json=PATIENT)
+    assert created.status_code == 200
+    pid = created.json()["id"]
+
+    response = client.post("/api/vitals/", json={
+        "patient_id": pid, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 85, "blood_pressure_diastolic": 50,
+        "heart_rate": 125, "temperature": 36.5, "respiratory_rate": 22,
+        "oxygen_saturation": 95, "weight": 80.0,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["alert_level"] == "high"
+    assert "POSSIBLE SHOCK" in body["ai_interpretation"]
+
+    assert client.get(f"/api/patients/{pid}").json()["status"] == "alert"
+    assert [v["id"] for v in client.get(f"/api/vitals/patient/{pid}").json()] == [body["id"]]
+    assert client.get(f"/api/vitals/{body['id']}").status_code == 200
+    assert client.get("/api/vitals/999").status_code == 404
+    # Non-numeric paths fall through to the sync router
+    assert client.get("/api/patients/search", params={"q": "Async"}).status_code == 200
+
+
+def test_concurrent_async_writes_keep_every_trend_update(tmp_path):
+    app = make_app(tmp_path)
+    pid = TestClient(app).post("/api/patients/", json=PATIENT).json()["id"]
+
+    async def post_readings(n):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/api/vitals/", json={
+                "patient_id": pid, "recorded_by_email": "nurse@example.com",
+                "blood_pressure_systolic": 120, "blood_pressure_diastolic": 80,
+                "heart_rate": 70 + i, "temperature": 37.0, "respiratory_rate": 16,
+                "oxygen_saturation": 97,
+            }) for i in range(n)))
+
+    responses = asyncio.run(post_readings(20))
+    assert [r.status_code for r in responses] == [200] * 20
+
+    # Each reading's read-modify-write of the trend state saw the previous one
+    db = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'async.db'}"))()
+    assert TrendState.from_bytes(db.get(Patient, pid).trend_state).readings == 20
+    db.close()
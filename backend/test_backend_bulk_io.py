@@ -0,0 +1,81 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+
+from app.jobs import bulk_io
+from app.models import Patient, VitalSigns
+from app.services.news2_calculator import calculate_news2
+
+PATIENTS_CSV = """id,hospital_number,full_name,date_of_birth,age,gender,medications,ward
+1,B001,Ada Obi,1970-03-02,56,F,"metformin, insulin",A
+2,B002,Musa Bello,1965-07-19,60.0,M,,
+"""
+
+VITALS_NDJSON = """{"patient_id": 1, "heart_rate": 88, "respiratory_rate": 16, "oxygen_saturation": 97, "recorded_at": "2026-01-01T08:00:00"}
+{"patient_id": 2, "heart_rate": 131, "respiratory_rate": 26, "oxygen_saturation": 90, "temperature": 39.2, "recorded_at": "2026-01-01T08:15:00"}
+"""
+
+
+def load(engine, table, text, fmt, **kwargs):
+    rows = bulk_io.typed_rows(bulk_io.TABLES[table], bulk_io.read_rows(io.StringIO(text), fmt))
+    return bulk_io.import_rows(engine, bulk_io.TABLES[table], rows, chunk_size=1, **kwargs)
+
+
+def test_import_scores_and_exports(engine, db):
+    assert load(engine, "patients", PATIENTS_CSV, "csv") == 2
+    assert load(engine, "vitals", VITALS_NDJSON, "ndjson", news2=True) == 2
+
+    patient = db.get(Patient, 1)
+    assert patient.date_of_birth == date(1970, 3, 2) and patient.medications == "metformin, insulin"
+    assert db.get(Patient, 2).age == 60
+    vital = db.query(VitalSigns).filter(VitalSigns.patient_id == 2).one()
+    expected = calculate_news2({"heart_rate": 131, "respiratory_rate": 26, "oxygen_saturation": 90,
+                                "temperature": 39.2})
+    assert vital.news2_score == expected and vital.alert_level == "high"
+    assert vital.blood_pressure_systolic is None
+
+    out = io.StringIO()
+    assert bulk_io.export_rows(engine, bulk_io.TABLES["patients"], out, "csv") == 2
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert "trend_state" not in rows[0]
+    assert rows[0]["medications"] == "metformin, insulin" and rows[0]["date_of_birth"] == "1970-03-02"
+
+    # An export imports back unchanged
+    out = io.StringIO()
+    bulk_io.export_rows(engine, bulk_io.TABLES["vitals"], out, "ndjson", chunk_size=1)
+    db.query(VitalSigns).delete()
+    db.commit()
+    assert load(engine, "vitals", out.getvalue(), "ndjson") == 2
+    assert db.query(VitalSigns).filter(VitalSigns.patient_id == 2).one().news2_score == expected
+
+
+def test_bad_rows_name_the_line(engine, db):
+    with pytest.raises(bulk_io.BadRow, match="line 3, date_of_birth: "):
+        load(engine, "patients", "full_name,date_of_birth\nA,1970-01-01\nB,01/02/1970\n", "csv")
+    # Chunks before the bad row are kept
+    assert db.query(Patient).count() == 1
+    with pytest.raises(bulk_io.BadRow, match="unknown column.*trend_state"):
+        load(engine, "patients", '{"full_name": "A", "trend_state": "x"}\n', "ndjson")
+
+
+def test_missing_and_empty_fields_get_column_defaults(engine, db):
+    load(engine, "patients", "id,full_name,status\n1,A,\n2,B,alert\n", "csv")
+    assert [db.get(Patient, i).status for i in (1, 2)] == ["stable", "alert"]
+
+    # One reading with recorded_at, one without, in the same chunk
+    rows = bulk_io.typed_rows(bulk_io.TABLES["vitals"], bulk_io.read_rows(io.StringIO(
+        '{"patient_id": 1, "heart_rate": 80, "recorded_at": "2026-01-01T08:00:00"}\n'
+        '{"patient_id": 1, "heart_rate": 90, "recorded_at": null}\n'
+    ), "ndjson"))
+    assert bulk_io.import_rows(engine, bulk_io.TABLES["vitals"], rows) == 2
+    assert db.query(VitalSigns).filter(VitalSigns.recorded_at.is_(None)).count() == 0
+
+
+def test_constraint_violations_name_the_chunk(engine, db):
+    text = "id,full_name\n1,A\n2,B\n3,C\n1,D\n5,E\n"
+    rows = bulk_io.typed_rows(bulk_io.TABLES["patients"], bulk_io.read_rows(io.StringIO(text), "csv"))
+    with pytest.raises(bulk_io.BadRow, match="lines 4-5: UNIQUE constraint failed: patients.id"):
+        bulk_io.import_rows(engine, bulk_io.TABLES["patients"], rows, chunk_size=2)
+    assert db.query(Patient).count() == 2
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import responses
+from app.jobs.archive_vitals import archive_vitals
+from app.models import VitalSigns
+from app.routes.patients import PatientResponse
+from app.routes.vitals import VitalsResponse
+from test_vitals_history import seed
+
+
+def test_history_matches_validated_output(client, db, archive, monkeypatch):
+    seed(db, 50)
+    db.query(VitalSigns).filter(VitalSigns.id == 3).update({"weight": None, "notes": None})
+    db.commit()
+    archive_vitals(db, archive, older_than=datetime(2026, 3, 1, 1))  # first 12 readings
+    live = db.query(VitalSigns).order_by(VitalSigns.recorded_at.desc()).all()
+    archived = archive.read_rows(1)
+
+    body = client.get("/api/vitals/patient/1", params={"limit": 50}).json()
+    expected = TypeAdapter(List[VitalsResponse]).dump_python(
+        TypeAdapter(List[VitalsResponse]).validate_python([*live, *archived], from_attributes=True),
+        mode="json",
+    )
+    assert body == expected
+
+    # Same bytes-level content without orjson
+    monkeypatch.setattr(responses, "orjson", None)
+    assert client.get("/api/vitals/patient/1", params={"limit": 50}).json() == expected
+
+
+def test_patient_lists_match_validated_output(client, db):
+    seed(db, 1)
+    adapter = TypeAdapter(List[PatientResponse])
+    for path, params in [("/api/patients/", {"limit": 1}), ("/api/patients/search", {"q": "Moni"})]:
+        response = client.get(path, params=params)
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == adapter.dump_python(adapter.validate_python(response.json()), mode="json")
+        assert response.json()[0]["full_name"] == "Monitored"
+    assert client.get("/api/patients/", params={"limit": 1}).headers["X-Next-Cursor"]
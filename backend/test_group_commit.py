@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Patient, VitalSigns
+from app.routes import vitals_group
+from app.services.group_commit import GroupCommitter, QueueFull, get_group_committer
+from app.services.vitals_ingest import PatientNotFound
+
+
+def reading(patient_id):
+    return {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 95, "blood_pressure_diastolic": 60,
+        "heart_rate": 112, "temperature": 38.9, "respiratory_rate": 23,
+        "oxygen_saturation": 93, "weight": 64.5, "notes": "",
+    }
+
+
+@pytest.fixture
+def patient(db):
+    db.add(Patient(id=1, hospital_number="P001", full_name="Group Commit",
+                   date_of_birth=date(1975, 1, 1), age=51, gender="F", medications=""))
+    db.commit()
+
+
+def test_readings_share_commits(engine, db, patient):
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    committer = GroupCommitter(sessionmaker(bind=engine), max_rows=64, max_delay_ms=50).start()
+    try:
+        with ThreadPoolExecutor(16) as pool:
+            futures = list(pool.map(committer.submit, [reading(1) for _ in range(40)] + [reading(99)]))
+        results = [f.exception() or f.result() for f in futures]
+    finally:
+        committer.stop()
+
+    stored = [r for r in results if not isinstance(r, Exception)]
+    assert len(stored) == 40
+    assert isinstance(results[-1], PatientNotFound)
+    assert len({row["id"] for row, _ in stored}) == 40
+    assert all(row["news2_score"] == 9 and row["recorded_at"] for row, _ in stored)
+    assert db.query(VitalSigns).count() == 40
+    assert committer.rows == 41 and committer.batches < 41
+    assert len(commits) == committer.batches
+
+
+def make_client(committer):
+    app = FastAPI()
+    app.include_router(vitals_group.router)
+    app.dependency_overrides[get_group_committer] = lambda: committer
+    return TestClient(app)
+
+
+def test_group_commit_endpoint(engine, patient):
+    committer = GroupCommitter(sessionmaker(bind=engine), max_delay_ms=1).start()
+    try:
+        client = make_client(committer)
+        response = client.post("/api/vitals/", json=reading(1))
+        assert response.status_code == 200
+        assert response.json()["alert_level"] == "high"
+        assert client.post("/api/vitals/", json=reading(99)).status_code == 404
+    finally:
+        committer.stop()
+
+
+def test_full_queue_is_rejected(engine):
+    # Never started, so nothing drains the queue
+    committer = GroupCommitter(sessionmaker(bind=engine), queue_size=1)
+    committer.submit(reading(1))
+    with pytest.raises(QueueFull):
+        committer.submit(reading(1))
+
+    response = make_client(committer).post("/api/vitals/", json=reading(1))
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_cancelled_request_does_not_stop_the_flusher(engine, db, patient):
+    committer = GroupCommitter(sessionmaker(bind=engine), max_delay_ms=1)
+    cancelled = committer.submit(reading(1))
+    assert cancelled.cancel()  # e.g. the client disconnected while queued
+    later = committer.submit(reading(1))
+    committer.start()
+    try:
+        row, _ = later.result(timeout=5)
+        assert committer._thread.is_alive()
+        # Still flushing after the cancelled one
+        assert committer.submit(reading(1)).result(timeout=5)[0]["id"] > row["id"]
+    finally:
+        committer.stop()
+    assert db.query(VitalSigns).count() == 2
+
+
+def test_flusher_survives_a_failing_batch(engine, patient, monkeypatch):
+    def explode(batch):
+        raise RuntimeError("boom")
+
+    committer = GroupCommitter(sessionmaker(bind=engine), max_delay_ms=1).start()
+    try:
+        monkeypatch.setattr(committer, "_flush", explode)
+        with pytest.raises(RuntimeError):
+            committer.submit(reading(1)).result(timeout=5)
+        monkeypatch.undo()
+        assert committer.submit(reading(1)).result(timeout=5)[0]["id"]
+    finally:
+        committer.stop()
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.metrics import instrument_engine, registry
+from app.models import Patient
+
+
+def sample(name, **labels):
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+def reading(patient_id, **overrides):
+    return {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 95, "blood_pressure_diastolic": 60,
+        "heart_rate": 112, "temperature": 38.9, "respiratory_rate": 23,
+        "oxygen_saturation": 93, "weight": 64.5, "notes": "", **overrides,
+    }
+
+
+def test_metrics_endpoint(client, db, engine):
+    instrument_engine(engine, name="test")
+    db.add(Patient(id=1, hospital_number="P001", full_name="Metrics Patient",
+                   date_of_birth=date(1980, 1, 1), age=46, gender="M", medications=""))
+    db.commit()
+
+    high = sample("news2_alerts_total", level="high")
+    sepsis = sample("interpretation_rules_fired_total", rule="sepsis")
+    requests = sample("http_request_duration_seconds_count",
+                      method="GET", route="/api/patients/{patient_id}", status="200")
+
+    assert client.post("/api/vitals/", json=reading(1)).status_code == 200
+    assert client.post("/api/vitals/bulk", json=[reading(1), reading(1)]).status_code == 200
+    assert client.get("/api/patients/1").status_code == 200
+
+    assert sample("news2_alerts_total", level="high") == high + 3
+    assert sample("interpretation_rules_fired_total", rule="sepsis") == sepsis + 3
+    assert sample("http_request_duration_seconds_count",
+                  method="GET", route="/api/patients/{patient_id}", status="200") == requests + 1
+    assert sample("db_statement_duration_seconds_count", engine="test", statement="INSERT") >= 2
+    assert sample("db_pool_checkout_wait_seconds_count", engine="test") >= 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'db_pool_checked_out{engine="main"}' in body
+    assert "http_requests_in_progress" in body
+    # Unknown paths share one label instead of one series per raw path
+    client.get("/no/such/path/123")
+    assert sample("http_request_duration_seconds_count",
+                  method="GET", route="unmatched", status="404") >= 1
+
+
+def test_failed_statement_does_not_leave_a_start_time(engine):
+    instrument_engine(engine, name="errors")
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert "statement_start" not in conn.info
+        conn.execute(text("SELECT 1"))
+        assert "statement_start" not in conn.info
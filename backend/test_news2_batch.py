@@ -0,0 +1,100 @@
+import itertools
+import random
+from datetime import date
+
+import numpy as np
+
+from app.models import Patient, VitalSigns
+from app.jobs.rescore_news2 import rescore_vitals
+from app.services.ai_service import interpret_vitals_batch, trends_of, with_trends
+from app.services.news2_calculator import (
+    calculate_news2,
+    calculate_news2_batch,
+    get_alert_level,
+    score_batch,
+)
+
+FIELDS = ['respiratory_rate', 'oxygen_saturation', 'temperature',
+          'blood_pressure_systolic', 'heart_rate']
+
+
+def random_rows(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            'respiratory_rate': rng.choice([rng.randint(4, 40), rng.uniform(4, 40)]),
+            'oxygen_saturation': rng.randint(80, 100),
+            'temperature': round(rng.uniform(33.0, 41.5), rng.choice([1, 2])),
+            'blood_pressure_systolic': rng.randint(60, 240),
+            'heart_rate': rng.randint(25, 180),
+        }
+        for _ in range(n)
+    ]
+
+
+def test_batch_matches_scalar_on_rows():
+    rows = random_rows(5000)
+    scores, levels = score_batch(rows)
+    for row, score, level in zip(rows, scores, levels):
+        expected = calculate_news2(row)
+        assert score == expected
+        assert level == get_alert_level(expected)['level']
+
+
+def test_batch_accepts_columns_and_band_edges():
+    # Every band boundary plus the gaps between bands
+    edges = [8, 8.5, 9, 11, 11.5, 21, 24, 24.5, 25, 35.0, 35.05, 35.1, 36.0,
+             36.05, 38.0, 38.1, 39.0, 39.05, 39.1, 40, 41, 50, 90, 91, 93,
+             94, 95, 96, 100, 101, 110, 111, 130, 131, 219, 220]
+    combos = list(itertools.product(edges, repeat=2))
+    columns = {field: np.array([c[i % 2] for c in combos]) for i, field in enumerate(FIELDS)}
+    rows = [{field: columns[field][j] for field in FIELDS} for j in range(len(combos))]
+    assert list(calculate_news2_batch(columns)) == [calculate_news2(r) for r in rows]
+
+
+def test_rescore_job_updates_stale_rows(db):
+    db.add(Patient(id=1, hospital_number="P001", full_name="Test", date_of_birth=date(1970, 1, 1)))
+    rows = random_rows(25, seed=3)
+    for i, row in enumerate(rows):
+        stale = i % 2 == 0
+        score = calculate_news2(row)
+        db.add(VitalSigns(
+            patient_id=1, recorded_by_email="nurse@example.com", blood_pressure_diastolic=70,
+            news2_score=score + 1 if stale else score,
+            alert_level='low' if stale else get_alert_level(score)['level'],
+            **row,
+        ))
+    db.commit()
+
+    scanned, updated = rescore_vitals(db, chunk_size=4)
+    assert scanned == 25
+    assert updated >= 13
+
+    for v in db.query(VitalSigns).all():
+        row = {field: getattr(v, field) for field in FIELDS}
+        assert v.news2_score == calculate_news2(row)
+        assert v.alert_level == get_alert_level(v.news2_score)['level']
+    assert rescore_vitals(db, chunk_size=4) == (25, 0)
+
+
+def test_rescore_renders_interpretation_and_status_again(db):
+    db.add(Patient(id=1, hospital_number="P001", full_name="Test", date_of_birth=date(1970, 1, 1),
+                   medications="", status="stable"))
+    septic = {'respiratory_rate': 26, 'oxygen_saturation': 90, 'temperature': 39.2,
+              'blood_pressure_systolic': 88, 'heart_rate': 125}
+    score = calculate_news2(septic)
+    stale = interpret_vitals_batch([septic], [""], [0])[0].text
+    db.add(VitalSigns(id=1, patient_id=1, recorded_by_email="nurse@example.com", blood_pressure_diastolic=60,
+                      news2_score=0, alert_level="low",
+                      ai_interpretation=with_trends(stale, ["heart rate rising"]), **septic))
+    db.commit()
+
+    assert rescore_vitals(db) == (1, 1)
+    db.expire_all()
+    vital = db.get(VitalSigns, 1)
+    expected = interpret_vitals_batch([{**septic, 'blood_pressure_diastolic': 60}], [""], [score],
+                                      [["heart rate rising"]])[0].text
+    assert vital.ai_interpretation == expected != stale
+    assert trends_of(vital.ai_interpretation) == ["heart rate rising"]
+    patient = db.get(Patient, 1)
+    assert patient.status == "alert" and patient.status_changed_at is not None
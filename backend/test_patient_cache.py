@@ -0,0 +1,179 @@
+import fnmatch
+from datetime import date
+
+import pytest
+
+from app.models import Patient
+from app.services import patient_cache as cache_module
+from app.services import vitals_ingest
+from app.services.patient_cache import MemoryBackend, PatientCache, RedisBackend, patient_cache
+from test_write_path import count_statements, reading
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """The slice of the redis-py client the cache uses, with expiry"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    def get(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= self.clock():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, px=None):
+        self.data[key] = (value, self.clock() + px / 1000 if px else None)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+
+ENTRY = {
+    "id": 1, "hospital_number": "C001", "full_name": "Cache Patient", "age": 56, "gender": "F",
+    "last_visit": date(2026, 1, 2), "status": "stable", "ward": "A", "medications": "",
+}
+
+
+def add_patient(db):
+    db.add(Patient(id=1, hospital_number="C001", full_name="Cache Patient",
+                   date_of_birth=date(1970, 1, 1), age=56, gender="F", medications="beta blocker",
+                   last_visit=date(2026, 1, 2), ward="A"))
+    db.commit()
+
+
+def test_memory_backend_ttl_and_lru():
+    clock = FakeClock()
+    cache = PatientCache(MemoryBackend(maxsize=2, clock=clock), ttl=10)
+    cache.put(1, ENTRY)
+    cache.put(2, {**ENTRY, "id": 2})
+    assert cache.get(1)["full_name"] == "Cache Patient"  # 1 is now most recent
+    cache.put(3, {**ENTRY, "id": 3})
+    assert cache.get(2) is None and cache.backend.evictions == 1
+
+    clock.now = 11
+    assert cache.get(1) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = PatientCache(MemoryBackend())
+
+    def load():
+        cache.invalidate(1)  # e.g. a status change committed meanwhile
+        return ENTRY
+
+    assert cache.get_or_load(1, load) == ENTRY
+    assert cache.get(1) is None
+
+
+def test_shared_store_across_workers():
+    clock = FakeClock()
+    redis = FakeRedis(clock)
+    worker_a = PatientCache(RedisBackend(redis), ttl=30)
+    worker_b = PatientCache(RedisBackend(redis), ttl=30)
+
+    worker_a.put(1, ENTRY)
+    assert worker_b.get(1) == ENTRY  # dates survive the round trip
+
+    worker_b.invalidate(1)
+    assert worker_a.get(1) is None
+
+    worker_a.put(1, ENTRY)
+    clock.now = 31
+    assert worker_b.get(1) is None
+
+
+def test_backend_errors_are_misses(caplog):
+    class DownRedis(FakeRedis):
+        def get(self, key):
+            raise ConnectionError("redis is down")
+
+    cache = PatientCache(RedisBackend(DownRedis(FakeClock())))
+    assert cache.get_or_load(1, lambda: ENTRY) == ENTRY
+    assert cache.stats()["errors"] == 1
+    assert "patient cache get failed" in caplog.text
+
+
+def test_get_patient_reads_through(client, db, engine):
+    add_patient(db)
+
+    with count_statements(engine) as statements:
+        first = client.get("/api/patients/1").json()
+        second = client.get("/api/patients/1").json()
+    assert first == second and first["last_visit"] == "2026-01-02"
+    assert len(statements) == 1
+    assert client.get("/api/patients/2").status_code == 404
+
+
+def test_status_change_reaches_cache(client, db, engine):
+    add_patient(db)
+    assert client.get("/api/patients/1").json()["status"] == "stable"
+
+    with count_statements(engine) as statements:
+        assert client.post("/api/vitals/", json=reading(1)).status_code == 200
+    # Cache hit: the lookup only reads the trend state
+    assert "medications" not in statements[0]
+
+    # The status change dropped the entry: the next read loads the committed status
+    assert patient_cache.get(1) is None
+    with count_statements(engine) as statements:
+        assert client.get("/api/patients/1").json()["status"] == "alert"
+        assert client.get("/api/patients/1").json()["status"] == "alert"
+    assert len(statements) == 1
+
+    response = client.post("/api/vitals/bulk", json=[{**reading(1), "heart_rate": 80, "temperature": 37.0,
+                                                     "respiratory_rate": 16, "oxygen_saturation": 98,
+                                                     "blood_pressure_systolic": 120}])
+    assert response.status_code == 200
+    assert client.get("/api/patients/1").json()["status"] == "stable"
+
+
+def test_create_invalidates(client):
+    patient_cache.put(7, {**ENTRY, "id": 7, "full_name": "Stale"})
+    response = client.post("/api/patients/", json={
+        "hospital_number": "C007", "full_name": "Fresh", "date_of_birth": "1980-01-01",
+        "age": 46, "gender": "M",
+    })
+    patient_id = response.json()["id"]
+    assert client.get(f"/api/patients/{patient_id}").json()["full_name"] == "Fresh"
+
+
+def test_backend_setting():
+    assert cache_module.backend_from_setting("off") is None
+    assert isinstance(cache_module.backend_from_setting("memory"), MemoryBackend)
+    with pytest.raises(ValueError):
+        cache_module.backend_from_setting("memcached://localhost")
+
+
+def test_side_effect_failures_after_commit_keep_the_reading(client, db, monkeypatch):
+    add_patient(db)
+
+    def fail(*args):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(vitals_ingest, "publish_reading", fail)
+    monkeypatch.setattr(vitals_ingest, "record_readings", fail)
+    monkeypatch.setattr(patient_cache, "invalidate", fail)
+    response = client.post("/api/vitals/", json=reading(1))
+    assert response.status_code == 200
+    assert client.get(f"/api/vitals/{response.json()['id']}").status_code == 200
+
+    response = client.post("/api/vitals/bulk", json=[{**reading(1), "heart_rate": 80, "temperature": 37.0,
+                                                     "respiratory_rate": 16, "oxygen_saturation": 98,
+                                                     "blood_pressure_systolic": 120}])
+    assert response.status_code == 200
+    assert client.get("/api/vitals/patient/1").json()[0]["alert_level"] == "low"
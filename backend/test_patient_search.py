@@ -0,0 +1,51 @@
+from datetime import date
+
+from app.models import Patient
+from app.services.patient_search import has_fts_index, search_patient_ids
+
+
+def add(db, pid, number, name):
+    db.add(Patient(id=pid, hospital_number=number, full_name=name,
+                   date_of_birth=date(1990, 5, 5), age=36, gender="F"))
+
+
+def seed(db):
+    add(db, 1, "P001", "Amina Bello")
+    add(db, 2, "P002", "Chinedu Okafor")
+    add(db, 3, "Q100", "Bello Adamu")
+    add(db, 4, "P010", "Grace Obi")
+    db.commit()
+
+
+def test_search_index_is_installed(db):
+    assert has_fts_index(db)
+
+
+def test_prefix_then_substring_ranking(db):
+    seed(db)
+    assert search_patient_ids(db, "P00") == [1, 2]
+    assert search_patient_ids(db, "p0") == [1, 2, 4]
+    assert sorted(search_patient_ids(db, "bello")) == [1, 3]
+    assert search_patient_ids(db, "okaf") == [2]
+    assert search_patient_ids(db, "P0", limit=2) == [1, 2]
+
+
+def test_index_follows_inserts_and_updates(db):
+    seed(db)
+    patient = db.get(Patient, 2)
+    patient.full_name = "Chinedu Eze"
+    add(db, 5, "P050", "Ngozi Okafor")
+    db.commit()
+    assert search_patient_ids(db, "okafor") == [5]
+    assert search_patient_ids(db, "Eze") == [2]
+    db.delete(db.get(Patient, 5))
+    db.commit()
+    assert search_patient_ids(db, "okafor") == []
+
+
+def test_search_endpoint(client, db):
+    seed(db)
+    response = client.get("/api/patients/search", params={"q": "Bello", "limit": 1})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert client.get("/api/patients/search", params={"q": ""}).status_code == 422
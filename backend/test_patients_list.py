@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from app.models import Patient
+
+
+def add_patients(db, n):
+    for i in range(1, n + 1):
+        db.add(Patient(
+            id=i, hospital_number=f"P{i:04}", full_name=f"Patient {i}",
+            date_of_birth=date(1980, 1, 1), age=45, gender="M",
+            last_visit=None if i % 7 == 0 else date(2026, 1, 1) + timedelta(days=i % 5),
+            status="alert" if i % 3 == 0 else "stable",
+        ))
+    db.commit()
+
+
+def collect_pages(client, **params):
+    ids, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get("/api/patients/", params=query)
+        assert response.status_code == 200
+        ids += [p["id"] for p in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return ids
+
+
+def test_keyset_pages_by_id_and_status(client, db):
+    add_patients(db, 53)
+    assert collect_pages(client, limit=10) == list(range(1, 54))
+    assert collect_pages(client, limit=4, status="alert") == list(range(3, 54, 3))
+
+
+def test_keyset_pages_by_last_visit(client, db):
+    add_patients(db, 53)
+    ids = collect_pages(client, limit=6, order_by="last_visit")
+    patients = {p.id: p for p in db.query(Patient).all()}
+    expected = sorted(
+        patients,
+        key=lambda i: (patients[i].last_visit is not None, patients[i].last_visit or date.min, i),
+        reverse=True,
+    )
+    assert ids == expected
+
+
+def test_invalid_cursor(client):
+    assert client.get("/api/patients/", params={"cursor": "nope"}).status_code == 400
+
+
+def test_stream_ndjson(client, db):
+    add_patients(db, 25)
+    response = client.get("/api/patients/", params={"stream": True, "status": "stable"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == 17
+    assert '"hospital_number": "P0001"' in lines[0]
+
+
+def test_no_limit_returns_every_patient(client, db):
+    add_patients(db, 120)
+    response = client.get("/api/patients/")
+    assert [p["id"] for p in response.json()] == list(range(1, 121))
+    assert "X-Next-Cursor" not in response.headers
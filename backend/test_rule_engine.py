@@ -0,0 +1,171 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.services import rule_engine
+from app.services.ai_service import format_interpretation, interpret_vitals, interpret_vitals_batch
+
+
+class MockPatient:
+    def __init__(self, medications=None):
+        self.medications = medications
+
+
+def random_readings(n, seed=11):
+    rng = random.Random(seed)
+    readings = []
+    for _ in range(n):
+        vitals = {
+            'blood_pressure_systolic': rng.randint(70, 200),
+            'blood_pressure_diastolic': rng.randint(40, 130),
+            'heart_rate': rng.randint(30, 160),
+            'temperature': round(rng.uniform(33.0, 41.0), 1),
+            'respiratory_rate': rng.randint(6, 35),
+            'oxygen_saturation': rng.randint(80, 100),
+        }
+        readings.append((vitals, rng.choice([None, "Beta blocker 5mg", "aspirin"]), rng.randint(0, 12)))
+    return readings
+
+
+def test_batch_and_single_paths_agree():
+    readings = random_readings(2000)
+    batch = interpret_vitals_batch(*zip(*readings))
+    for (vitals, meds, score), result in zip(readings, batch):
+        single = interpret_vitals(vitals, MockPatient(meds), score)
+        assert single.rules_fired == result.rules_fired
+        assert single.text == result.text
+
+
+def test_groups_fire_first_match_only():
+    rules = rule_engine.get_rules()
+    fired = rules.evaluate({'temp': 39.5, 'hr': 45, 'news2': 9, 'beta_blocker': 1}).fired_ids
+    assert 'pyrexia' in fired and 'hypothermia' not in fired
+    assert 'news2_critical' in fired and 'news2_high' not in fired
+    assert 'bradycardia' in fired and 'beta_blocker_bradycardia' in fired
+
+
+def test_interpretation_reports_rules_and_timing():
+    vitals = {
+        'blood_pressure_systolic': 85, 'blood_pressure_diastolic': 50,
+        'heart_rate': 125, 'temperature': 36.5, 'respiratory_rate': 22,
+        'oxygen_saturation': 95,
+    }
+    result = interpret_vitals(vitals, MockPatient(), 9)
+    assert result.rules_fired == ['sepsis', 'shock', 'tachycardia', 'news2_critical']
+    assert result.elapsed_ms >= 0
+    assert "POSSIBLE SHOCK" in result.text
+    assert "• Tachycardia (125 bpm)" in result.text
+
+
+def test_reload_rejects_invalid_file_and_keeps_rules(tmp_path):
+    current = rule_engine.get_rules()
+    bad = tmp_path / "rules.json"
+    bad.write_text(json.dumps({"rules": [{"id": "x", "when": {"field": "hr", "op": "~", "value": 1}}]}))
+    with pytest.raises(ValueError):
+        rule_engine.reload_rules(bad)
+    assert rule_engine.get_rules() is current
+
+
+@pytest.mark.parametrize("spec", [
+    {"rules": [{"when": {"field": "hr", "op": ">", "value": 1}}]},  # no id
+    {"rules": [{"id": "x"}]},  # no clause
+    {"rules": ["x"]},
+    {"medication_flags": []},  # no rules
+    [],
+])
+def test_malformed_rule_set_is_a_value_error(spec):
+    with pytest.raises(ValueError):
+        rule_engine.RuleSet(spec)
+
+
+def test_malformed_reload_is_a_bad_request(client, tmp_path, monkeypatch):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [{"when": {"field": "hr", "op": ">", "value": 1}}]}))
+    monkeypatch.setenv("VITALS_RULES_PATH", str(path))
+    response = client.post("/api/rules/reload")
+    assert response.status_code == 400
+    assert "Invalid rule" in response.json()["detail"]
+
+
+def test_services_share_the_same_engine():
+    inference_engine = Path(__file__).resolve().parents[1] / "app" / "rule_engine.py"
+    assert inference_engine.read_bytes() == Path(rule_engine.__file__).read_bytes(), (
+        "app/rule_engine.py and backend/app/services/rule_engine.py have drifted apart"
+    )
+
+
+def test_reload_endpoint(client, tmp_path, monkeypatch):
+    spec = {"rules": [{"id": "fever_only", "when": {"field": "temp", "op": ">", "value": 38},
+                       "finding": "Fever ({temp})"}]}
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(spec))
+    monkeypatch.setenv("VITALS_RULES_PATH", str(path))
+    try:
+        body = client.post("/api/rules/reload").json()
+        assert body["rules"] == ["fever_only"]
+        assert client.get("/api/rules/").json()["version"] == body["version"]
+    finally:
+        monkeypatch.delenv("VITALS_RULES_PATH")
+        rule_engine.reload_rules()
+
+
+def test_interpretation_cache_hits_and_invalidation():
+    from app.services.interpretation_cache import interpretation_cache
+
+    interpretation_cache.clear()
+    vitals = {
+        'blood_pressure_systolic': 120, 'blood_pressure_diastolic': 80,
+        'heart_rate': 101, 'temperature': 38.4, 'respiratory_rate': 16,
+        'oxygen_saturation': 97,
+    }
+    first = interpret_vitals(vitals, MockPatient("beta blocker"), 2)
+    again = interpret_vitals(dict(vitals), MockPatient("Beta Blocker"), 2)
+    assert not first.cached and again.cached
+    assert again.text == first.text and again.rules_fired == first.rules_fired
+    # Different medication flags are a different entry
+    assert not interpret_vitals(vitals, MockPatient(), 2).cached
+
+    stats = interpretation_cache.stats()
+    assert stats["hits"] >= 1 and stats["size"] >= 2
+
+    rule_engine.reload_rules()  # same file, same version: entries survive
+    assert interpret_vitals(vitals, MockPatient(), 2).cached
+
+
+@pytest.mark.parametrize("temperature", [35.96, 36.0, 38.0, 38.04, 38.34, 38.35, 39.05])
+def test_cache_never_changes_the_interpretation(temperature):
+    from app.services.interpretation_cache import interpretation_cache
+
+    vitals = {
+        'blood_pressure_systolic': 120, 'blood_pressure_diastolic': 80,
+        'heart_rate': 95, 'temperature': temperature, 'respiratory_rate': 22,
+        'oxygen_saturation': 97,
+    }
+    interpretation_cache.clear()
+    values = {'sbp': 120, 'dbp': 80, 'hr': 95, 'temp': temperature, 'rr': 22, 'spo2': 97,
+              'news2': 3, 'beta_blocker': 0}
+    uncached = rule_engine.get_rules().evaluate(values)
+    # Fill the cache with neighbouring readings first, then the reading itself twice
+    for neighbour in (round(temperature, 1), round(temperature, 1) + 0.1, round(temperature, 1) - 0.1):
+        interpret_vitals(dict(vitals, temperature=neighbour), MockPatient(), 3)
+    first = interpret_vitals(vitals, MockPatient(), 3)
+    second = interpret_vitals(vitals, MockPatient(), 3)
+    assert first.rules_fired == second.rules_fired == uncached.fired_ids
+    assert first.text == second.text == format_interpretation(uncached.fired, values)
+
+
+def test_lru_eviction():
+    from app.services.interpretation_cache import InterpretationCache
+
+    cache = InterpretationCache(maxsize=2)
+    cache.put("v1", "a", 1)
+    cache.put("v1", "b", 2)
+    assert cache.get("v1", "a") == 1
+    cache.put("v1", "c", 3)
+    assert cache.get("v1", "b") is None
+    assert cache.get("v1", "a") == 1
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("v2", "a") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,134 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.jobs.build_similar_cases import build_similar_cases
+from app.models import Patient, VitalSigns
+from app.services import similar_cases
+from app.services.similar_cases import CaseIndex, HashingEmbedder
+
+
+def reading(patient_id, notes="", **overrides):
+    return {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 120, "blood_pressure_diastolic": 80,
+        "heart_rate": 75, "temperature": 37.0, "respiratory_rate": 16,
+        "oxygen_saturation": 97, "weight": 70.0, "notes": notes, **overrides,
+    }
+
+
+SEPTIC = {"blood_pressure_systolic": 88, "heart_rate": 125, "temperature": 39.2, "respiratory_rate": 26}
+
+
+@pytest.fixture
+def case_index(tmp_path, monkeypatch):
+    index = CaseIndex(tmp_path / "similar_cases")
+    monkeypatch.setattr(similar_cases, "case_index", index)
+    return index
+
+
+def add_patients(db, n):
+    for i in range(1, n + 1):
+        db.add(Patient(id=i, hospital_number=f"S{i:03}", full_name=f"Similar Patient {i}",
+                       date_of_birth=date(1970, 1, 1), age=56, gender="F", medications=""))
+    db.commit()
+
+
+def test_hashing_embedder_is_deterministic():
+    embedder = HashingEmbedder()
+    a, b, empty = embedder.encode(["Rigors and confusion", "rigors and confusion", None])
+    assert np.array_equal(a, b) and np.linalg.norm(a) == pytest.approx(1)
+    assert not empty.any()
+
+
+def test_inserts_are_indexed_and_searchable(client, db, case_index):
+    add_patients(db, 3)
+    client.post("/api/vitals/", json=reading(1))
+    client.post("/api/vitals/bulk", json=[reading(2, "rigors, confused", **SEPTIC), reading(2)])
+    own = client.post("/api/vitals/", json=reading(3, "rigors and confusion", **SEPTIC)).json()
+    assert len(case_index) == 4
+
+    similar = client.get(f"/api/similar-cases/{own['id']}", params={"k": 2}).json()
+    assert [c["patient_id"] for c in similar] != [3, 3]
+    assert (similar[0]["patient_id"], similar[0]["notes"]) == (2, "rigors, confused")
+    assert similar[0]["distance"] < similar[1]["distance"]
+    assert similar[0]["full_name"] == "Similar Patient 2" and similar[0]["news2_score"] >= 5
+
+    adhoc = client.post("/api/similar-cases/search", params={"k": 1},
+                        json={**SEPTIC, "notes": "confused", "exclude_patient_id": 2}).json()
+    assert adhoc[0]["vitals_id"] == own["id"]
+
+    assert client.get("/api/similar-cases/999").status_code == 404
+
+
+def test_index_persists_and_builds_from_table(tmp_path, db):
+    add_patients(db, 1)
+    db.add_all([VitalSigns(id=i, news2_score=0, alert_level="low", ai_interpretation="",
+                           **reading(1, heart_rate=70 + i)) for i in range(1, 6)])
+    db.commit()
+
+    index = CaseIndex(tmp_path / "cases")
+    assert build_similar_cases(db, index, chunk_size=2) == (5, 5)
+    assert build_similar_cases(db, index) == (5, 0)  # already indexed
+
+    # A torn append is ignored on open and cut off by the next append
+    with open(tmp_path / "cases" / "cases.rec", "ab") as f:
+        f.write(b"\0\0\0")
+    reopened = CaseIndex(tmp_path / "cases")
+    assert len(reopened) == 5
+    assert reopened.search(reading(1, heart_rate=74), k=1)[0][0] == 4
+    reopened.add_readings([{"id": 6, **reading(1, heart_rate=90)}])
+    assert len(CaseIndex(tmp_path / "cases")) == 6
+
+
+def test_processes_share_one_record_file(tmp_path):
+    # Two workers (or a worker and the build job) on the same index
+    worker_a = CaseIndex(tmp_path / "cases")
+    worker_b = CaseIndex(tmp_path / "cases")
+    worker_a.add_readings([{"id": 1, **reading(1, heart_rate=60)}, {"id": 2, **reading(2, heart_rate=90)}])
+    assert worker_b.add_readings([{"id": 2, **reading(2, heart_rate=90)}, {"id": 3, **reading(3, heart_rate=120)}]) == 1
+    worker_a.add_readings([{"id": 4, **reading(4, heart_rate=150)}])
+
+    assert worker_b.search(reading(4, heart_rate=150), k=1)[0][:2] == (4, 4)
+    reopened = CaseIndex(tmp_path / "cases")
+    assert reopened.ids.tolist() == [[1, 1], [2, 2], [3, 3], [4, 4]]
+    for heart_rate, vitals_id in [(60, 1), (90, 2), (120, 3), (150, 4)]:
+        for index in (worker_a, worker_b, reopened):
+            assert index.search(reading(0, heart_rate=heart_rate), k=1)[0][0] == vitals_id
+
+
+def test_split_files_are_converted(tmp_path):
+    index = CaseIndex(tmp_path / "cases")
+    index.add_readings([{"id": i, **reading(i, heart_rate=60 + 10 * i)} for i in range(1, 4)])
+    records = np.fromfile(tmp_path / "cases" / "cases.rec", dtype=index.record)
+    (tmp_path / "cases" / "cases.rec").unlink()
+    np.stack([records["id"], records["patient_id"]], axis=1).tofile(tmp_path / "cases" / "ids.i64")
+    records["vector"].tofile(tmp_path / "cases" / "vectors.f32")
+
+    converted = CaseIndex(tmp_path / "cases")
+    assert converted.ids.tolist() == [[1, 1], [2, 2], [3, 3]]
+    assert np.array_equal(converted.vectors, records["vector"])
+    assert not (tmp_path / "cases" / "ids.i64").exists()
+
+
+def test_inverted_file_probes_a_fraction(tmp_path, monkeypatch):
+    monkeypatch.setattr(similar_cases, "IVF_MIN_ROWS", 500)
+    rng = np.random.default_rng(0)
+    index = CaseIndex(tmp_path / "cases")
+    rows = [
+        {"id": i, "patient_id": i % 50, "notes": "",
+         **{c: float(v) for c, v in zip(similar_cases.VITAL_SCALES, rng.normal(
+             [120, 80, 75, 37, 16, 97, 2], [20, 10, 15, 1, 4, 2, 2]))}}
+        for i in range(1, 2001)
+    ]
+    for start in range(0, len(rows), 250):
+        index.add_readings(rows[start:start + 250])
+    # Training runs off the appending thread
+    index.wait_for_training()
+    assert index.centroids is not None and len(index.centroids) >= 16
+
+    target = rows[1234]
+    assert index.search(target, k=1, nprobe=4)[0][0] == target["id"]
+    probes = similar_cases._nearest(index.embedder.embed([target]), index.centroids, 4)[0]
+    assert sum(len(index._inverted_list(j)) for j in probes) < len(index) / 2
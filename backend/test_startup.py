@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Cold `import app.main` must stay under this many seconds (CI fails above it)
+IMPORT_BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "2.0"))
+
+# Optional heavy dependencies that must only load on first use
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "langchain", "faiss", "sklearn", "pandas"]
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+PROBE = f"""
+import json, sys, threading, time
+sys.path.insert(0, {str(BACKEND_DIR)!r})
+start = time.perf_counter()
+import app.main
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+    "threads": threading.active_count(),
+}}))
+"""
+
+
+def test_cold_import_is_fast_and_side_effect_free(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=tmp_path, capture_output=True, text=True,
+        env={**os.environ, "AUTO_MIGRATE": "1"},
+    )
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["seconds"] < IMPORT_BUDGET_S, probe
+    assert probe["heavy"] == []
+    assert probe["threads"] == 1  # no log listener or flusher thread yet
+    assert list(tmp_path.iterdir()) == []  # no database created at import
@@ -0,0 +1,107 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models import Patient
+from app.services import vitals_ingest
+from app.services.trends import TrendState, apply_reading, trend_findings
+from test_write_path import count_statements
+
+
+def reading(patient_id, heart_rate=80, respiratory_rate=16, oxygen_saturation=98):
+    return {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 120, "blood_pressure_diastolic": 80,
+        "heart_rate": heart_rate, "temperature": 37.0, "respiratory_rate": respiratory_rate,
+        "oxygen_saturation": oxygen_saturation, "weight": 70.0, "notes": "",
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Readings recorded 15 minutes apart"""
+    times = iter(datetime(2026, 1, 1, 8) + timedelta(minutes=15 * i) for i in range(1000))
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return next(times)
+
+    monkeypatch.setattr(vitals_ingest, "datetime", FakeDatetime)
+
+
+def test_slope_and_ewma_of_linear_series():
+    state = TrendState.empty()
+    for i in range(9):
+        state.update({"hr": 80 + 10 * i, "news2": 1}, 0.25)
+    # A straight line has the same slope whatever the weights
+    assert state.slope("hr") == pytest.approx(40)
+    assert state.slope("news2") == pytest.approx(0)
+    assert 80 < state.ewma("hr") < 160
+    assert state.slope("spo2") is None  # never measured
+    assert trend_findings(state) == ["Heart rate rising by 80 over 2h"]
+
+    restored = TrendState.from_bytes(state.to_bytes())
+    assert restored.readings == 9
+    assert restored.slope("hr") == pytest.approx(40)
+    assert len(state.to_bytes()) == 8 * (1 + 7 * 5)
+
+
+def test_old_readings_decay_away():
+    state = TrendState.empty()
+    for _ in range(5):
+        state.update({"hr": 150}, 0.25)
+    state.update({"hr": 80}, 24)
+    assert state.ewma("hr") == pytest.approx(80, abs=0.01)
+
+
+def test_out_of_order_reading_does_not_move_state():
+    at = datetime(2026, 1, 1, 8)
+    first = apply_reading(None, None, None, {"heart_rate": 80}, at, False)
+    late = apply_reading(first.state.to_bytes(), at, None, {"heart_rate": 150}, at - timedelta(hours=1), True)
+    assert late.state.readings == 1 and late.updated_at == at
+    assert late.last_alert_at == at - timedelta(hours=1)
+
+
+def test_findings_reach_interpretation(client, db, engine, clock):
+    db.add(Patient(id=1, hospital_number="T001", full_name="Trend Patient",
+                   date_of_birth=date(1970, 1, 1), age=56, gender="F", medications=""))
+    db.commit()
+
+    client.post("/api/vitals/", json=reading(1, heart_rate=135, oxygen_saturation=90))  # medium
+    for heart_rate in (80, 80, 80, 80):
+        body = client.post("/api/vitals/", json=reading(1, heart_rate=heart_rate)).json()
+    assert "TRENDS:" not in body["ai_interpretation"]
+
+    for respiratory_rate in (18, 20, 22, 24):
+        with count_statements(engine) as statements:
+            body = client.post("/api/vitals/", json=reading(1, respiratory_rate=respiratory_rate)).json()
+        # Constant work per reading: no history is read
+        assert not any("FROM vital_signs" in s for s in statements)
+
+    text = body["ai_interpretation"]
+    assert "TRENDS:" in text and "Respiratory rate rising by" in text
+    assert "Last medium/high alert 2.0h ago" in text
+    assert text.endswith("[AI SUPPORT: Validation by clinician required]")
+
+    trends = client.get("/api/vitals/patient/1/trends").json()
+    assert trends["readings"] == 9
+    assert trends["trends"]["rr"]["slope_per_hour"] > 2
+    assert trends["trends"]["spo2"]["ewma"] > 96
+    assert client.get("/api/vitals/patient/2/trends").status_code == 404
+
+
+def test_batch_path_updates_trends(client, db, clock):
+    db.add(Patient(id=1, hospital_number="T001", full_name="Trend Patient",
+                   date_of_birth=date(1970, 1, 1), age=56, gender="F", medications=""))
+    db.commit()
+    client.post("/api/vitals/", json=reading(1))
+
+    response = client.post("/api/vitals/bulk", json=[reading(1, heart_rate=90), reading(1, heart_rate=100)])
+    assert response.status_code == 200
+
+    db.expire_all()
+    patient = db.get(Patient, 1)
+    state = TrendState.from_bytes(patient.trend_state)
+    assert state.readings == 3
+    assert patient.trend_updated_at == datetime(2026, 1, 1, 8, 15)
@@ -0,0 +1,156 @@
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.jobs.archive_vitals import archive_vitals
+from app.models import Patient, VitalSigns
+from app.routes.similar_cases import with_details
+
+START = datetime(2026, 1, 20)
+
+
+def seed(db, n=60):
+    """A reading every 12 hours from START: spans January to February"""
+    db.add(Patient(id=1, hospital_number="P001", full_name="Archived",
+                   date_of_birth=date(1960, 1, 1), age=66, gender="M"))
+    for i in range(n):
+        db.add(VitalSigns(
+            patient_id=1, recorded_by_email="nurse@example.com",
+            recorded_at=START + timedelta(hours=12 * i),
+            blood_pressure_systolic=120, blood_pressure_diastolic=80,
+            heart_rate=60 + i, temperature=37.0, respiratory_rate=16, oxygen_saturation=97,
+            news2_score=i % 4, alert_level="low", weight=None if i % 2 else 70.0,
+            notes="", ai_interpretation=f"interpretation {i % 3}",
+        ))
+    db.commit()
+
+
+def test_archive_moves_old_rows(db, archive):
+    seed(db)
+    cutoff = START + timedelta(days=20)
+
+    assert archive_vitals(db, archive, cutoff, chunk_size=7) == 40
+    assert db.query(VitalSigns).count() == 20
+    assert archive.months(1) == ["2026-01", "2026-02"]
+
+    rows = archive.read_rows(1)
+    assert len(rows) == 40
+    assert [r["heart_rate"] for r in rows] == list(range(99, 59, -1))
+    assert rows[-1]["weight"] == 70.0 and rows[-2]["weight"] is None
+    assert rows[-1]["ai_interpretation"] == "interpretation 0"
+    assert rows[-1]["recorded_at"] == START
+
+    # Re-archiving the same rows (e.g. after a crash before the delete) is a no-op
+    assert archive.append(1, "2026-01", [dict(rows[-1])]) == 0
+    assert len(archive.read_rows(1)) == 40
+
+
+def test_history_merges_archive_and_live(client, db, archive):
+    seed(db)
+    archive_vitals(db, archive, START + timedelta(days=20))
+
+    body = client.get("/api/vitals/patient/1").json()
+    assert len(body) == 60
+    assert [v["heart_rate"] for v in body] == list(range(119, 59, -1))
+    assert body[-1]["ai_interpretation"] == "interpretation 0"
+
+    limited = client.get("/api/vitals/patient/1", params={"limit": 25}).json()
+    assert [v["heart_rate"] for v in limited] == list(range(119, 94, -1))
+
+    window = client.get("/api/vitals/patient/1", params={
+        "since": (START + timedelta(days=15)).isoformat(),
+        "until": (START + timedelta(days=25)).isoformat(),
+    }).json()
+    assert [v["heart_rate"] for v in window] == list(range(109, 89, -1))
+
+    series = client.get("/api/vitals/patient/1/series", params={"points": 500}).json()
+    assert series["raw_count"] == 60
+    assert series["series"]["heart_rate"]["v"] == list(range(60, 120))
+
+
+def tree(root):
+    return sorted(str(p.relative_to(root)) for p in root.rglob("*"))
+
+
+def test_reads_never_change_the_archive(db, archive):
+    seed(db)
+    archive_vitals(db, archive, START + timedelta(days=20))
+    # Left by an interrupted rewrite: only the writer cleans it up
+    patient_dir = archive.root / "patient=1"
+    (patient_dir / ".month=2026-01.v9.tmp").mkdir()
+    before = tree(archive.root)
+
+    assert len(archive.read_rows(1)) == 40
+    assert archive.months(1) == ["2026-01", "2026-02"]
+    assert tree(archive.root) == before
+
+    rows = archive.read_rows(1)
+    archive.append(1, "2026-03", [{**rows[0], "id": 10_000, "recorded_at": datetime(2026, 3, 1)}])
+    assert not (patient_dir / ".month=2026-01.v9.tmp").exists()
+
+
+def test_read_retries_when_a_rewrite_removes_its_snapshot(db, archive):
+    seed(db)
+    archive_vitals(db, archive, START + timedelta(days=20))
+    newest = archive.read_rows(1, limit=1)[0]
+    load = archive._load
+    rewrites = []
+
+    def load_during_rewrite(partition, columns, mmap=True):
+        if not rewrites:
+            # Only once: the rewrite itself decodes the partition through _load
+            rewrites.append(partition)
+            # The writer swaps in a new version of this month mid-read
+            archive.append(1, "2026-02", [{**newest, "id": 10_000, "recorded_at": datetime(2026, 2, 27)}])
+        return load(partition, columns, mmap)
+
+    archive._load = load_during_rewrite
+    rows = archive.read_rows(1)
+    assert not rewrites[0].exists()
+    assert len(rows) == 41 and rows[0]["id"] == 10_000
+
+
+def test_reads_archives_written_before_manifests(db, archive):
+    seed(db)
+    archive_vitals(db, archive, START + timedelta(days=20))
+    patient_dir = archive.root / "patient=1"
+    manifest = json.loads((patient_dir / "manifest.json").read_text())
+    (patient_dir / "manifest.json").unlink()
+    for month, name in manifest.items():
+        (patient_dir / name).rename(patient_dir / f"month={month}")
+
+    assert archive.months(1) == ["2026-01", "2026-02"]
+    assert len(archive.read_rows(1)) == 40
+
+    # The next rewrite moves the month to a versioned partition
+    rows = archive.read_rows(1)
+    assert archive.append(1, "2026-01", [{**rows[-1], "id": 10_000}]) == 1
+    assert not (patient_dir / "month=2026-01").exists()
+    assert archive.months(1) == ["2026-01", "2026-02"]
+    assert len(archive.read_rows(1)) == 41
+
+
+def test_write_session_opens_after_the_files_are_written(db, engine, archive):
+    seed(db)
+    opened = []
+
+    def write_session():
+        # Every partition of the chunk is already on disk
+        opened.append(len(archive.read_rows(1)))
+        return sessionmaker(bind=engine)()
+
+    assert archive_vitals(db, archive, START + timedelta(days=20), chunk_size=25, write_session=write_session) == 40
+    assert opened == [25, 40]
+    assert db.query(VitalSigns).count() == 20
+
+
+def test_similar_case_details_fall_back_to_the_archive(db, archive):
+    seed(db)
+    archive_vitals(db, archive, START + timedelta(days=20))
+    live_id = db.query(VitalSigns.id).order_by(VitalSigns.id.desc()).first()[0]
+
+    archived, live = with_details(db, [(1, 1, 0.5), (live_id, 1, 0.7)], archive)
+    assert archived["full_name"] == "Archived" and archived["recorded_at"] == START
+    assert archived["news2_score"] == 0 and archived["alert_level"] == "low"
+    assert live["full_name"] == "Archived" and live["distance"] == 0.7
@@ -0,0 +1,72 @@
+import json
+from datetime import date
+
+from app.models import Patient, VitalSigns
+
+
+def reading(patient_id, **overrides):
+    data = {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 120, "blood_pressure_diastolic": 80,
+        "heart_rate": 70, "temperature": 37.0, "respiratory_rate": 16,
+        "oxygen_saturation": 98,
+    }
+    data.update(overrides)
+    return data
+
+
+def add_patients(db, *ids):
+    for pid in ids:
+        db.add(Patient(id=pid, hospital_number=f"P{pid:03}", full_name=f"Patient {pid}",
+                       date_of_birth=date(1980, 1, 1), age=45, gender="F"))
+    db.commit()
+
+
+def test_bulk_json_array_reports_row_errors(client, db):
+    add_patients(db, 1, 2)
+    payload = [
+        reading(1),
+        reading(99),                      # unknown patient
+        reading(2, heart_rate="fast"),    # validation error
+        reading(2, respiratory_rate=30, oxygen_saturation=88, heart_rate=135),
+    ]
+    response = client.post("/api/vitals/bulk", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["received"] == 4
+    assert [row["index"] for row in body["inserted"]] == [0, 3]
+    assert [e["index"] for e in body["errors"]] == [1, 2]
+    assert body["errors"][0]["detail"] == "Patient not found"
+
+    stored = {v.id: v for v in db.query(VitalSigns).all()}
+    assert sorted(stored) == sorted(row["id"] for row in body["inserted"])
+    high = stored[body["inserted"][1]["id"]]
+    assert high.news2_score == 9 and high.alert_level == "high"
+    assert "RESPIRATORY DISTRESS" in high.ai_interpretation
+    assert db.get(Patient, 2).status == "alert"
+    assert db.get(Patient, 1).status == "stable"
+
+
+def test_bulk_ndjson_stream(client, db):
+    add_patients(db, 1)
+    lines = [json.dumps(reading(1, heart_rate=60 + i)) for i in range(50)]
+    lines.insert(10, "{not json")
+    response = client.post(
+        "/api/vitals/bulk",
+        content="\n".join(lines) + "\n",
+        headers={"content-type": "application/x-ndjson"},
+    )
+    body = response.json()
+    assert body["received"] == 51
+    assert len(body["inserted"]) == 50
+    assert body["errors"][0]["index"] == 10
+    assert db.query(VitalSigns).count() == 50
+
+
+def test_record_vitals_reports_stage_timings(client, db):
+    add_patients(db, 1)
+    response = client.post("/api/vitals/", json=reading(1, weight=70.0))
+    assert response.status_code == 200
+    stages = dict(part.strip().split(";dur=") for part in response.headers["server-timing"].split(","))
+    assert {"patient_lookup", "news2", "interpretation", "commit", "total"} <= set(stages)
+    assert all(float(ms) >= 0 for ms in stages.values())
@@ -0,0 +1,71 @@
+import math
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.models import Patient, VitalSigns
+from app.services.downsampling import bucket_aggregate, lttb
+
+START = datetime(2026, 3, 1)
+
+
+def seed(db, n=1000):
+    db.add(Patient(id=1, hospital_number="P001", full_name="Monitored",
+                   date_of_birth=date(1960, 1, 1), age=66, gender="M"))
+    for i in range(n):
+        db.add(VitalSigns(
+            patient_id=1, recorded_by_email="monitor", recorded_at=START + timedelta(minutes=5 * i),
+            blood_pressure_systolic=120, blood_pressure_diastolic=80,
+            heart_rate=int(80 + 20 * math.sin(i / 20)), temperature=37.0,
+            respiratory_rate=16, oxygen_saturation=97, news2_score=0, alert_level="low",
+            weight=70.0, notes="", ai_interpretation="",
+        ))
+    db.commit()
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[500] = 10
+    keep = lttb(x, y, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 500 in keep
+    assert list(keep) == sorted(keep)
+
+
+def test_bucket_aggregate():
+    x = np.array([0, 1, 2, 3, 10], dtype=float)
+    y = np.array([1, 3, 5, 7, 9], dtype=float)
+    bx, mean = bucket_aggregate(x, y, 2, "mean")
+    assert list(mean) == [4, 9]
+    assert list(bucket_aggregate(x, y, 2, "max")[1]) == [7, 9]
+    assert list(bucket_aggregate(x, y, 2, "min")[1]) == [1, 9]
+
+
+def test_history_window_and_limit(client, db):
+    seed(db, 100)
+    response = client.get("/api/vitals/patient/1", params={
+        "since": (START + timedelta(minutes=50)).isoformat(),
+        "until": (START + timedelta(minutes=100)).isoformat(),
+    })
+    times = [v["recorded_at"] for v in response.json()]
+    assert len(times) == 10
+    assert times == sorted(times, reverse=True)
+    assert len(client.get("/api/vitals/patient/1", params={"limit": 7}).json()) == 7
+
+
+def test_series_is_bounded(client, db):
+    seed(db)
+    until = START + timedelta(minutes=5 * 1000)
+    body = client.get("/api/vitals/patient/1/series", params={
+        "hours": 72, "until": until.isoformat(), "points": 200,
+    }).json()
+    assert body["raw_count"] == 72 * 12
+    hr = body["series"]["heart_rate"]
+    assert len(hr["t"]) == len(hr["v"]) == 200
+    assert max(hr["v"]) == 99 and min(hr["v"]) == 60
+
+    body = client.get("/api/vitals/patient/1/series", params={"points": 50, "method": "mean"}).json()
+    assert len(body["series"]["temperature"]["v"]) == 50
+    assert set(body["series"]["temperature"]["v"]) == {37.0}
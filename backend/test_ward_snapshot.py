@@ -0,0 +1,80 @@
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from app.models import LatestVitals, Patient, VitalSigns
+from app.services.ward_snapshot import install_latest_vitals
+
+
+def add_patients(db, n):
+    for i in range(1, n + 1):
+        db.add(Patient(id=i, hospital_number=f"P{i:03}", full_name=f"Ward Patient {i}",
+                       date_of_birth=date(1970, 1, 1), age=56, gender="F", medications=""))
+    db.commit()
+
+
+def reading(patient_id, heart_rate=80, oxygen_saturation=97):
+    return {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 120, "blood_pressure_diastolic": 80,
+        "heart_rate": heart_rate, "temperature": 37.0, "respiratory_rate": 16,
+        "oxygen_saturation": oxygen_saturation, "weight": 70.0, "notes": "",
+    }
+
+
+def test_snapshot_tracks_latest_reading(client, db):
+    add_patients(db, 3)
+    client.post("/api/vitals/", json=reading(1, heart_rate=135, oxygen_saturation=90))
+    client.post("/api/vitals/", json=reading(1))  # newer reading replaces the high one
+    client.post("/api/vitals/", json=reading(2, heart_rate=135, oxygen_saturation=90))
+
+    rows = client.get("/api/ward/snapshot").json()
+    assert [r["patient_id"] for r in rows] == [2, 1, 3]
+    assert rows[0]["news2_score"] == 6 and rows[0]["alert_level"] == "medium"
+    assert rows[1]["news2_score"] == 0 and rows[1]["heart_rate"] == 80
+    assert rows[2]["vitals_id"] is None  # no readings yet
+
+    ascending = client.get("/api/ward/snapshot", params={"sort": "score_asc"}).json()
+    assert [r["patient_id"] for r in ascending] == [1, 2, 3]
+
+    monitoring = client.get("/api/ward/snapshot", params={"status": "monitoring"}).json()
+    assert [r["patient_id"] for r in monitoring] == [2]
+    both = client.get("/api/ward/snapshot", params=[("status", "monitoring"), ("status", "stable")]).json()
+    assert {r["patient_id"] for r in both} == {1, 2, 3}
+
+
+def test_backfilled_and_bulk_readings(client, db):
+    add_patients(db, 2)
+    client.post("/api/vitals/bulk", json=[reading(1), reading(2, heart_rate=120)])
+    latest = db.get(LatestVitals, 2)
+    assert latest.heart_rate == 120
+
+    # An older reading (e.g. imported late) does not replace the projection
+    db.add(VitalSigns(patient_id=2, recorded_at=datetime(2000, 1, 1), heart_rate=50,
+                      blood_pressure_systolic=120, blood_pressure_diastolic=80, temperature=37.0,
+                      respiratory_rate=16, oxygen_saturation=97, news2_score=1, alert_level="low"))
+    db.commit()
+    db.expire_all()
+    assert db.get(LatestVitals, 2).heart_rate == 120
+
+    # Rescoring the latest reading flows through
+    db.execute(text("UPDATE vital_signs SET news2_score = 7, alert_level = 'high' WHERE id = :id"),
+               {"id": latest.vitals_id})
+    db.commit()
+    db.expire_all()
+    assert db.get(LatestVitals, 2).news2_score == 7
+
+
+def test_install_backfills_existing_readings(engine, db):
+    add_patients(db, 2)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER latest_vitals_ai"))
+    for hour, hr in ((1, 70), (3, 90), (2, 110)):
+        db.add(VitalSigns(patient_id=1, recorded_at=datetime(2026, 1, 1, hour), heart_rate=hr,
+                          news2_score=0, alert_level="low"))
+    db.commit()
+    assert db.query(LatestVitals).count() == 0
+
+    install_latest_vitals(engine)
+    rows = db.query(LatestVitals).all()
+    assert [(r.patient_id, r.heart_rate) for r in rows] == [(1, 90)]
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from app.models import Patient, VitalSigns
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def reading(patient_id):
+    return {
+        "patient_id": patient_id, "recorded_by_email": "nurse@example.com",
+        "blood_pressure_systolic": 95, "blood_pressure_diastolic": 60,
+        "heart_rate": 112, "temperature": 38.9, "respiratory_rate": 23,
+        "oxygen_saturation": 93, "weight": 64.5, "notes": "post-op",
+    }
+
+
+def test_record_vitals_statement_count(client, db, engine):
+    db.add(Patient(id=1, hospital_number="P001", full_name="Write Path",
+                   date_of_birth=date(1975, 1, 1), age=51, gender="F",
+                   medications="beta blocker"))
+    db.commit()
+
+    with count_statements(engine) as statements:
+        response = client.post("/api/vitals/", json=reading(1))
+    assert response.status_code == 200
+    assert len(statements) == 3, statements
+    assert statements[0].lstrip().upper().startswith("SELECT")
+    assert "FROM patients" in statements[0]
+    assert statements[1].lstrip().upper().startswith("INSERT INTO VITAL_SIGNS")
+    assert statements[2].lstrip().upper().startswith("UPDATE PATIENTS")
+
+    body = response.json()
+    stored = db.get(VitalSigns, body["id"])
+    assert stored.news2_score == body["news2_score"] == 9
+    assert body["recorded_at"] and body["ai_interpretation"] == stored.ai_interpretation
+    db.expire_all()
+    assert db.get(Patient, 1).status == "alert"
+
+
+def test_record_vitals_unknown_patient(client, engine):
+    with count_statements(engine) as statements:
+        response = client.post("/api/vitals/", json=reading(42))
+    assert response.status_code == 404
+    assert len(statements) == 1
@@ -0,0 +1,182 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Both services are packages named `app`, so a benchmark process can only
+import one of them. Each benchmark therefore runs every measurement in a
+fresh worker process (see `run_worker`) that loads one service against a
+throwaway SQLite database in a temporary directory.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Service name -> directory that contains its `app` package
+SERVICES = {
+    "backend": REPO_ROOT / "backend",
+    "inference": REPO_ROOT,
+}
+
+# API paths per service
+API_PREFIX = {
+    "backend": "/api",
+    "inference": "/api/v1",
+}
+
+
+def load_service(service, workdir, env=None):
+    """
+    Import `service`'s FastAPI app with its database inside `workdir` and
+    run its startup (schema, rules, group commit), which the ASGI transport
+    does not trigger. Must be called once per process, before anything
+    imports `app`.
+    BENCH_DATABASE_URL points the inference service at another (empty)
+    database, e.g. a local PostgreSQL.
+    """
+    os.environ.update(env or {})
+    if service == "inference":
+        os.environ["DATABASE_URL"] = os.environ.get(
+            "BENCH_DATABASE_URL", f"sqlite:///{Path(workdir) / 'inference.db'}"
+        )
+    # The backend opens ./healthcare_erp.db relative to the working directory
+    os.chdir(workdir)
+    sys.path.insert(0, str(SERVICES[service]))
+    import app.main
+
+    app.main.startup()
+    return app.main.app
+
+
+class StatementCounter:
+    """Counts SQL statements executed on the given engines"""
+
+    def __init__(self, *engines):
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def service_engines():
+    """Sync engines of the loaded service (including the writer's and the async engine's)"""
+    import app.database
+
+    engines = [app.database.engine]
+    write_engine = getattr(app.database, "write_engine", None)
+    if write_engine is not None and write_engine is not app.database.engine:
+        engines.append(write_engine)
+    if getattr(app.database, "async_engine", None) is not None:
+        engines.append(app.database.async_engine.sync_engine)
+    return engines
+
+
+def make_client(app, **kwargs):
+    import httpx
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://bench",
+        **kwargs,
+    )
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def summarize(latencies_s, elapsed_s):
+    """Latency percentiles (ms) and throughput for one operation"""
+    values = sorted(latencies_s)
+    return {
+        "requests": len(values),
+        "throughput_rps": len(values) / elapsed_s if elapsed_s else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+async def drive(make_request, total, concurrency):
+    """
+    Run `make_request(i)` (a coroutine factory) `total` times with at most
+    `concurrency` in flight. Returns (latencies_s, elapsed_s, failures).
+    """
+    latencies = []
+    failures = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal failures
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, failures
+
+
+def run_worker(script, args, env=None):
+    """
+    Re-run `script` with `args` in a fresh interpreter inside a temporary
+    directory and return the JSON object it prints on its last line.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        result = subprocess.run(
+            [sys.executable, str(script), *args, "--workdir", workdir],
+            capture_output=True,
+            text=True,
+            env={**os.environ, **(env or {})},
+            cwd=workdir,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark worker failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_worker_group(script, args, processes, setup_args=None, env=None):
+    """
+    Run `script` once with `setup_args` and then `processes` copies with
+    `args` concurrently, all in one temporary directory (so they share its
+    database), like several uvicorn workers. Returns the workers' JSON results.
+    """
+    env = {**os.environ, **(env or {})}
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        if setup_args is not None:
+            setup = subprocess.run(
+                [sys.executable, str(script), *setup_args, "--workdir", workdir],
+                capture_output=True, text=True, env=env, cwd=workdir,
+            )
+            if setup.returncode != 0:
+                raise RuntimeError(f"Benchmark setup failed:\n{setup.stderr}")
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, str(script), *args, "--workdir", workdir],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env, cwd=workdir,
+            )
+            for _ in range(processes)
+        ]
+        results = []
+        for worker in workers:
+            stdout, stderr = worker.communicate()
+            if worker.returncode != 0:
+                raise RuntimeError(f"Benchmark worker failed:\n{stderr}")
+            results.append(json.loads(stdout.strip().splitlines()[-1]))
+    return results
@@ -0,0 +1,80 @@
+"""
+Requests/s of the sync and async (DB_MODE=async) database paths under high
+concurrency.
+
+    python benchmarks/bench_db_modes.py --service backend --concurrency 200
+    python benchmarks/bench_db_modes.py --service inference --requests 5000
+
+Each mode runs in its own process against a fresh SQLite database, with a
+50/50 mix of vitals writes and reads.
+"""
+import argparse
+import asyncio
+import json
+import random
+from pathlib import Path
+
+import _harness
+from datagen import patient_payload, vitals_payload
+
+PATIENTS = 50
+
+
+async def measure(service, workdir, total, concurrency):
+    app = _harness.load_service(service, workdir)
+    prefix = _harness.API_PREFIX[service]
+    rng = random.Random(42)
+
+    async with _harness.make_client(app, timeout=None) as client:
+        for i in range(1, PATIENTS + 1):
+            await client.post(f"{prefix}/patients/", json=patient_payload(service, i))
+        # Seed one reading per patient so reads never 404
+        for i in range(1, PATIENTS + 1):
+            await client.post(f"{prefix}/vitals/", json=vitals_payload(service, i, rng))
+
+        def request(i):
+            patient_id = rng.randint(1, PATIENTS)
+            if i % 2 == 0:
+                return client.post(f"{prefix}/vitals/", json=vitals_payload(service, patient_id, rng))
+            if service == "backend":
+                return client.get(f"{prefix}/vitals/patient/{patient_id}", params={"limit": 20})
+            return client.get(f"{prefix}/vitals/{rng.randint(1, PATIENTS)}")
+
+        latencies, elapsed, failures = await _harness.drive(request, total, concurrency)
+
+    return {**_harness.summarize(latencies, elapsed), "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--service", choices=sorted(_harness.SERVICES), default="backend")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Worker process: one service, one mode
+        result = asyncio.run(measure(args.service, args.workdir, args.requests, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    results = {}
+    for mode in ("sync", "async"):
+        results[mode] = _harness.run_worker(
+            Path(__file__).resolve(),
+            ["--service", args.service, "--requests", str(args.requests),
+             "--concurrency", str(args.concurrency), "--mode", mode],
+            env={"DB_MODE": mode},
+        )
+
+    print(f"{args.service}: {args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'failed':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['throughput_rps']:>9.1f} {r['p50_ms']:>9.2f} "
+              f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['failures']:>7}")
+
+
+if __name__ == "__main__":
+    main()
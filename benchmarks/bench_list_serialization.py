@@ -0,0 +1,100 @@
+"""
+Large list responses: a 10k-row vitals history, ORM objects validated by
+pydantic (the old path) against column rows serialized with orjson.
+
+    python benchmarks/bench_list_serialization.py --rows 10000 --repeat 20
+
+Runs in a worker process against a fresh backend database holding one
+patient with `--rows` readings. Reports the serialization step alone and
+the whole GET /api/vitals/patient/{id}?limit=N request.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import List
+
+import _harness
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def measure(workdir, rows, repeat):
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    app = _harness.load_service("backend", workdir)
+    from bench_suite import seed_backend
+
+    from app.database import SessionLocal
+    from app.models.vitals import VitalSigns
+    from app.responses import rows_response
+    from app.routes.vitals import HISTORY_COLUMNS, VitalsResponse, history_rows
+
+    seed_backend(1, rows, 42)
+    adapter = TypeAdapter(List[VitalsResponse])
+    with SessionLocal() as db:
+        query = select(VitalSigns).where(VitalSigns.patient_id == 1).order_by(VitalSigns.recorded_at.desc())
+        columns_query = select(*HISTORY_COLUMNS).where(VitalSigns.patient_id == 1).order_by(
+            VitalSigns.recorded_at.desc())
+
+        def orm_pydantic():
+            objects = db.scalars(query).all()
+            db.expunge_all()
+            return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+        def rows_orjson():
+            return rows_response(history_rows(db.execute(columns_query).all())).body
+
+        assert json.loads(orm_pydantic()) == json.loads(rows_orjson())
+        result = {
+            "query_and_serialize_ms": {
+                "orm_pydantic": timed(orm_pydantic, repeat),
+                "rows_orjson": timed(rows_orjson, repeat),
+            }
+        }
+
+    async with _harness.make_client(app, timeout=None) as client:
+        async def request():
+            response = await client.get("/api/vitals/patient/1", params={"limit": rows})
+            assert response.status_code == 200 and len(response.json()) == rows
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await request()
+            samples.append((time.perf_counter() - start) * 1000)
+        result["endpoint_ms"] = statistics.median(samples)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.workdir:
+        print(json.dumps(asyncio.run(measure(args.workdir, args.rows, args.repeat))))
+        return
+
+    result = _harness.run_worker(Path(__file__).resolve(), ["--rows", str(args.rows), "--repeat", str(args.repeat)])
+    steps = result["query_and_serialize_ms"]
+    print(f"{args.rows} rows, median of {args.repeat}")
+    print(f"  ORM + pydantic   {steps['orm_pydantic']:>8.1f} ms")
+    print(f"  rows + orjson    {steps['rows_orjson']:>8.1f} ms  ({steps['orm_pydantic'] / steps['rows_orjson']:.1f}x)")
+    print(f"  GET history      {result['endpoint_ms']:>8.1f} ms  (fast path, end to end)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Similar-case query latency as the index grows.
+
+    python benchmarks/bench_similar_cases.py --sizes 10000 100000 400000
+
+Fills a fresh index (in a temporary directory) with generated readings in
+steps and measures top-k query latency at each size.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import _harness
+import datagen
+
+NOTES = ["", "", "", "rigors", "confused overnight", "chest pain on exertion", "post-op day 1", "SOB on exertion"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(_harness.SERVICES["backend"]))
+    from app.services.news2_calculator import score_batch
+    from app.services.similar_cases import CaseIndex
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        index = CaseIndex(workdir)
+        rows = datagen.generate_vitals("backend", max(args.sizes), 1000, args.seed)
+        next_id = 1
+        print(f"{'cases':>10} {'insert/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+        for size in sorted(args.sizes):
+            start = time.perf_counter()
+            added = 0
+            while len(index) < size:
+                chunk = next(rows)[: size - len(index)]
+                scores, _ = score_batch(chunk)
+                for row, score in zip(chunk, scores.tolist()):
+                    row.update(id=next_id, news2_score=score, notes=rng.choice(NOTES))
+                    next_id += 1
+                added += index.add_readings(chunk)
+            insert_rate = added / (time.perf_counter() - start)
+
+            latencies = []
+            for i in range(args.queries):
+                row = {"notes": rng.choice(NOTES), "heart_rate": rng.randint(50, 140),
+                       "temperature": rng.uniform(35.5, 40), "oxygen_saturation": rng.randint(86, 100)}
+                start = time.perf_counter()
+                index.search(row, k=args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            print(f"{size:>10} {insert_rate:>10.0f} {statistics.median(latencies):>8.2f} "
+                  f"{latencies[int(0.95 * (len(latencies) - 1))]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Backend vitals write throughput per SQLite storage profile (SQLITE_PROFILE).
+
+    python benchmarks/bench_sqlite_profiles.py --processes 4 --concurrency 16
+    python benchmarks/bench_sqlite_profiles.py --profiles legacy wal wal+group --requests 2000
+
+For each profile, several worker processes (standing in for uvicorn
+workers) post vitals concurrently to one shared database file. "before" is
+the legacy profile (rollback journal, synchronous=FULL, every connection
+writes); "after" is WAL with the single-writer engine. A "+group" suffix
+also turns on group commit (VITALS_GROUP_COMMIT=1).
+"""
+import argparse
+import asyncio
+import json
+import random
+from pathlib import Path
+
+import _harness
+import datagen
+
+PATIENTS = 50
+
+
+def setup(workdir, seed):
+    _harness.load_service("backend", workdir)
+    from sqlalchemy import insert
+
+    from app.database import engine
+    from app.models.patient import Patient
+
+    with engine.begin() as conn:
+        for chunk in datagen.generate_patients("backend", PATIENTS, seed):
+            conn.execute(insert(Patient), chunk)
+
+
+async def measure(workdir, total, concurrency, seed):
+    app = _harness.load_service("backend", workdir)
+    rng = random.Random(seed)
+
+    async with _harness.make_client(app, timeout=None) as client:
+        def request(i):
+            payload = datagen.vitals_payload("backend", rng.randint(1, PATIENTS), rng)
+            return client.post("/api/vitals/", json=payload)
+
+        latencies, elapsed, failures = await _harness.drive(request, total, concurrency)
+
+    return {**_harness.summarize(latencies, elapsed), "elapsed_s": elapsed, "failures": failures}
+
+
+def profile_env(profile):
+    name, _, option = profile.partition("+")
+    return {"SQLITE_PROFILE": name, "VITALS_GROUP_COMMIT": "1" if option == "group" else "0"}
+
+
+def combine(results):
+    """Aggregate per-process results: total writes/s over the slowest process"""
+    elapsed = max(r["elapsed_s"] for r in results)
+    ok = sum(r["requests"] - r["failures"] for r in results)
+    return {
+        "writes_per_s": ok / elapsed if elapsed else 0.0,
+        "failures": sum(r["failures"] for r in results),
+        "p50_ms": max(r["p50_ms"] for r in results),
+        "p99_ms": max(r["p99_ms"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["legacy", "wal", "wal+group"])
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=1000, help="writes per process")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight writes per process")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--setup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.workdir:
+        if args.setup:
+            setup(args.workdir, args.seed)
+            print(json.dumps({}))
+        else:
+            result = asyncio.run(measure(args.workdir, args.requests, args.concurrency, args.seed))
+            print(json.dumps(result))
+        return
+
+    script = Path(__file__).resolve()
+    common = ["--seed", str(args.seed)]
+    results = {}
+    for profile in args.profiles:
+        results[profile] = combine(_harness.run_worker_group(
+            script,
+            ["--requests", str(args.requests), "--concurrency", str(args.concurrency), *common],
+            args.processes,
+            setup_args=["--setup", *common],
+            env=profile_env(profile),
+        ))
+
+    print(f"{args.processes} processes x {args.requests} writes, concurrency {args.concurrency} each")
+    print(f"{'profile':<10} {'writes/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'failed':>7}")
+    for profile, r in results.items():
+        print(f"{profile:<10} {r['writes_per_s']:>9.1f} {r['p50_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['failures']:>7}")
+
+
+if __name__ == "__main__":
+    main()
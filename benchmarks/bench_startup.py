@@ -0,0 +1,87 @@
+"""
+Cold start of both services: `import app.main` and the startup step, each
+in a fresh interpreter.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --budget 1.5   # exit 1 if over budget (CI)
+
+Reports the median import and startup times per service and the slowest
+top-level imports (from `python -X importtime`).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import _harness
+
+PROBE = """
+import json, os, sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app.main.startup()
+print(json.dumps({{"import_s": imported - start, "startup_s": time.perf_counter() - imported}}))
+"""
+
+
+def run_probe(service, extra_args=()):
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{workdir}/inference.db"}
+        result = subprocess.run(
+            [sys.executable, *extra_args, "-c", PROBE.format(path=str(_harness.SERVICES[service]))],
+            capture_output=True, text=True, cwd=workdir, env=env,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_log, top):
+    """Packages (other than the service itself) by cumulative import time (microseconds)"""
+    totals = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        if package != "app":
+            totals[package] = max(totals.get(package, 0), int(cumulative))
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--service", choices=["all", *sorted(_harness.SERVICES)], default="all")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    parser.add_argument("--budget", type=float, help="fail if a median cold import takes longer (s)")
+    args = parser.parse_args()
+
+    services = sorted(_harness.SERVICES) if args.service == "all" else [args.service]
+    over_budget = []
+    for service in services:
+        runs = [run_probe(service)[0] for _ in range(args.runs)]
+        import_s = statistics.median(r["import_s"] for r in runs)
+        startup_s = statistics.median(r["startup_s"] for r in runs)
+        print(f"\n{service}: import {import_s * 1000:.0f} ms, startup {startup_s * 1000:.0f} ms "
+              f"(median of {args.runs})")
+
+        _, log = run_probe(service, ["-X", "importtime"])
+        for package, us in slowest_imports(log, args.top):
+            print(f"  {package:<24} {us / 1000:>8.1f} ms")
+
+        if args.budget is not None and import_s > args.budget:
+            over_budget.append(service)
+
+    if over_budget:
+        print(f"\nover the {args.budget}s import budget: {', '.join(over_budget)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
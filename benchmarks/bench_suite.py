@@ -0,0 +1,245 @@
+"""
+Latency, throughput and SQL statements per request for both services.
+
+    python benchmarks/bench_suite.py --patients 1000 --vitals 10000 --output bench.json
+    python benchmarks/bench_suite.py --vitals 1000000 --service backend
+    python benchmarks/bench_suite.py --compare baseline.json --output bench.json
+
+Each service runs in its own process against a fresh SQLite database seeded
+with `datagen` (same seed, same data). Set BENCH_DATABASE_URL to run the
+inference service against an empty local PostgreSQL instead. Results are
+written as JSON so two runs can be diffed (or compared with --compare).
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import _harness
+import datagen
+
+# Operations measured per service (name -> what it exercises)
+OPERATIONS = {
+    "backend": {
+        "create": "POST /api/patients/",
+        "create_vitals": "POST /api/vitals/ (NEWS2 + interpretation)",
+        "search": "GET /api/patients/search",
+        "get": "GET /api/patients/{id} (patient cache)",
+        "list": "GET /api/patients/",
+        "history": "GET /api/vitals/patient/{id}",
+        "snapshot": "GET /api/ward/snapshot",
+    },
+    "inference": {
+        "create": "POST /api/v1/patients/",
+        "create_vitals": "POST /api/v1/vitals/",
+        "search": "GET /api/v1/patients/search",
+        "list": "GET /api/v1/patients/{id}",
+        "history": "GET /api/v1/vitals/{id}",
+        "inference": "POST /api/v1/inference/",
+        "inference_batch": "POST /api/v1/inference/batch (100 ids, NDJSON)",
+    },
+}
+
+
+def seed_backend(patients, vitals, seed):
+    import numpy as np
+    from sqlalchemy import insert
+
+    from app.database import engine
+    from app.models.patient import Patient
+    from app.models.vitals import VitalSigns
+    from app.services.news2_calculator import score_batch
+
+    with engine.begin() as conn:
+        for chunk in datagen.generate_patients("backend", patients, seed):
+            conn.execute(insert(Patient), chunk)
+        for chunk in datagen.generate_vitals("backend", vitals, patients, seed):
+            scores, levels = score_batch(chunk)
+            for row, score, level in zip(chunk, scores.tolist(), np.asarray(levels).tolist()):
+                row["news2_score"] = score
+                row["alert_level"] = level
+                row["ai_interpretation"] = ""
+            conn.execute(insert(VitalSigns), chunk)
+
+
+def seed_inference(patients, vitals, seed):
+    from sqlalchemy import insert
+
+    from app.database import engine
+    from app.models import Patient, Vital
+
+    with engine.begin() as conn:
+        for chunk in datagen.generate_patients("inference", patients, seed):
+            conn.execute(insert(Patient), chunk)
+        for chunk in datagen.generate_vitals("inference", vitals, patients, seed):
+            conn.execute(insert(Vital), chunk)
+
+
+SEEDERS = {"backend": seed_backend, "inference": seed_inference}
+
+
+def search_term(rng):
+    """A name fragment that matches some of the generated patients"""
+    name = rng.choice(datagen.FIRST_NAMES + datagen.LAST_NAMES)
+    return name[: rng.randint(3, len(name))]
+
+
+def operation_requests(service, client, patients, vitals, rng):
+    """Operation name -> request factory `(i) -> awaitable response`"""
+    prefix = _harness.API_PREFIX[service]
+
+    def create(i):
+        return client.post(f"{prefix}/patients/", json=datagen.patient_payload(service, i))
+
+    def create_vitals(i):
+        patient_id = rng.randint(1, patients)
+        return client.post(f"{prefix}/vitals/", json=datagen.vitals_payload(service, patient_id, rng))
+
+    def search(i):
+        return client.get(f"{prefix}/patients/search", params={"q": search_term(rng)})
+
+    if service == "backend":
+        def get(i):
+            return client.get(f"{prefix}/patients/{rng.randint(1, patients)}")
+
+        def list_(i):
+            return client.get(f"{prefix}/patients/", params={"limit": 50, "order_by": "last_visit"})
+
+        def history(i):
+            return client.get(f"{prefix}/vitals/patient/{rng.randint(1, patients)}", params={"limit": 100})
+
+        def snapshot(i):
+            return client.get(f"{prefix}/ward/snapshot", params={"limit": 100})
+
+        return {"create": create, "create_vitals": create_vitals, "search": search, "get": get,
+                "list": list_, "history": history, "snapshot": snapshot}
+
+    # The inference service has no list/history endpoints; its closest
+    # equivalents are the single-row reads
+    def list_(i):
+        return client.get(f"{prefix}/patients/{rng.randint(1, patients)}")
+
+    def history(i):
+        return client.get(f"{prefix}/vitals/{rng.randint(1, vitals)}")
+
+    def inference(i):
+        return client.post(f"{prefix}/inference/", json={"vital_id": rng.randint(1, vitals)})
+
+    def inference_batch(i):
+        ids = [rng.randint(1, vitals) for _ in range(100)]
+        return client.post(f"{prefix}/inference/batch", json={"vital_ids": ids})
+
+    return {"create": create, "create_vitals": create_vitals, "search": search,
+            "list": list_, "history": history, "inference": inference,
+            "inference_batch": inference_batch}
+
+
+async def measure(service, workdir, patients, vitals, total, concurrency, seed):
+    app = _harness.load_service(service, workdir)
+
+    start = time.perf_counter()
+    SEEDERS[service](patients, vitals, seed)
+    seed_s = time.perf_counter() - start
+
+    counter = _harness.StatementCounter(*_harness.service_engines())
+    rng = random.Random(seed)
+    results = {}
+    async with _harness.make_client(app, timeout=None) as client:
+        requests = operation_requests(service, client, patients, vitals, rng)
+        for name, make_request in requests.items():
+            before = counter.count
+            latencies, elapsed, failures = await _harness.drive(make_request, total, concurrency)
+            results[name] = {
+                **_harness.summarize(latencies, elapsed),
+                "failures": failures,
+                "statements_per_request": (counter.count - before) / total,
+            }
+    return {"seed_s": seed_s, "operations": results}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_harness.REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    for service, result in results["services"].items():
+        print(f"\n{service} (seeded in {result['seed_s']:.1f}s)")
+        print(f"{'operation':<14} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'stmts':>6} {'failed':>6}  {'p95 vs base':>11}")
+        base_ops = ((baseline or {}).get("services", {}).get(service) or {}).get("operations", {})
+        for name, r in result["operations"].items():
+            delta = ""
+            base = base_ops.get(name)
+            if base and base["p95_ms"]:
+                delta = f"{(r['p95_ms'] / base['p95_ms'] - 1) * 100:+.1f}%"
+            print(f"{name:<14} {r['throughput_rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                  f"{r['p99_ms']:>8.2f} {r['statements_per_request']:>6.1f} {r['failures']:>6}  {delta:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--service", choices=["all", *sorted(_harness.SERVICES)], default="all")
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--vitals", type=int, default=10000, help="seeded vitals rows (1k to 1M)")
+    parser.add_argument("--requests", type=int, default=500, help="requests per operation")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare p95 latencies against")
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.workdir:
+        # Worker process: one service
+        result = asyncio.run(measure(args.service, args.workdir, args.patients, args.vitals,
+                                     args.requests, args.concurrency, args.seed))
+        print(json.dumps(result))
+        return
+
+    services = sorted(_harness.SERVICES) if args.service == "all" else [args.service]
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "patients": args.patients,
+            "vitals": args.vitals,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "operations": {s: OPERATIONS[s] for s in services},
+        },
+        "services": {},
+    }
+    for service in services:
+        results["services"][service] = _harness.run_worker(
+            Path(__file__).resolve(),
+            ["--service", service, "--patients", str(args.patients), "--vitals", str(args.vitals),
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+             "--seed", str(args.seed)],
+        )
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+    print_results(results, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"\nwrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
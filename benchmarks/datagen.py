@@ -0,0 +1,134 @@
+"""
+Seeded synthetic patients and vitals time series for the benchmarks.
+
+The same seed always produces the same rows, so results are comparable
+between runs and versions. Rows come out in chunks to keep memory flat at
+large scales (1M vitals rows and up).
+"""
+import random
+from datetime import date, datetime, timedelta
+
+FIRST_NAMES = ["Amina", "Chinedu", "Grace", "Ibrahim", "Ngozi", "Tunde", "Fatima",
+               "Emeka", "Aisha", "Yusuf", "Blessing", "Kelechi", "Zainab", "Samuel"]
+LAST_NAMES = ["Bello", "Okafor", "Obi", "Adamu", "Eze", "Adeyemi", "Musa", "Nwosu",
+              "Ibrahim", "Okoro", "Lawal", "Balogun", "Danjuma", "Afolabi"]
+MEDICATIONS = ["", "", "", "Metformin", "Beta blocker (bisoprolol)", "Amlodipine", "Aspirin"]
+
+# Readings per patient are spread backwards from this instant
+SERIES_END = datetime(2026, 1, 1)
+
+
+def patient_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def generate_patients(service, n, seed=0, chunk_size=5000):
+    """Yield lists of patient rows (column dicts) for `service`'s schema"""
+    rng = random.Random(seed)
+    chunk = []
+    for i in range(1, n + 1):
+        age = rng.randint(18, 95)
+        if service == "backend":
+            row = {
+                "id": i,
+                "hospital_number": f"P{i:07}",
+                "full_name": patient_name(rng),
+                "date_of_birth": date(2026 - age, rng.randint(1, 12), rng.randint(1, 28)),
+                "age": age,
+                "gender": rng.choice(["M", "F"]),
+                "allergies": "",
+                "medications": rng.choice(MEDICATIONS),
+                "last_visit": date(2025, 1, 1) + timedelta(days=rng.randint(0, 364)),
+                "status": "stable",
+            }
+        else:
+            row = {"id": i, "name": patient_name(rng), "age": age,
+                   "gender": rng.choice(["M", "F"]), "notes": ""}
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _walk(rng, value, step, low, high):
+    value += rng.uniform(-step, step)
+    return min(high, max(low, value))
+
+
+def generate_vitals(service, n_rows, n_patients, seed=0, interval_minutes=15, chunk_size=5000):
+    """
+    Yield lists of vitals rows: `n_rows` readings spread round-robin over
+    `n_patients`, each patient's series a bounded random walk sampled every
+    `interval_minutes`.
+    """
+    rng = random.Random(seed + 1)
+    state = {}
+    per_patient = -(-n_rows // n_patients)
+    chunk = []
+    for i in range(n_rows):
+        patient_id = i % n_patients + 1
+        step = i // n_patients
+        s = state.get(patient_id)
+        if s is None:
+            s = state[patient_id] = {
+                "sbp": rng.uniform(100, 150), "dbp": rng.uniform(60, 90),
+                "hr": rng.uniform(60, 100), "temp": rng.uniform(36.2, 37.5),
+                "rr": rng.uniform(12, 20), "spo2": rng.uniform(94, 99),
+            }
+        s["sbp"] = _walk(rng, s["sbp"], 4, 70, 220)
+        s["dbp"] = _walk(rng, s["dbp"], 3, 40, 130)
+        s["hr"] = _walk(rng, s["hr"], 4, 35, 170)
+        s["temp"] = _walk(rng, s["temp"], 0.2, 34.5, 41.0)
+        s["rr"] = _walk(rng, s["rr"], 1.5, 6, 40)
+        s["spo2"] = _walk(rng, s["spo2"], 1, 80, 100)
+        recorded_at = SERIES_END - timedelta(minutes=interval_minutes * (per_patient - step))
+
+        if service == "backend":
+            row = {
+                "patient_id": patient_id, "recorded_by_email": "datagen@example.com",
+                "blood_pressure_systolic": round(s["sbp"]), "blood_pressure_diastolic": round(s["dbp"]),
+                "heart_rate": round(s["hr"]), "temperature": round(s["temp"], 1),
+                "respiratory_rate": round(s["rr"]), "oxygen_saturation": round(s["spo2"]),
+                "weight": 70.0, "notes": "", "recorded_at": recorded_at,
+            }
+        else:
+            row = {
+                "patient_id": patient_id, "heart_rate": round(s["hr"]),
+                "systolic_bp": round(s["sbp"]), "diastolic_bp": round(s["dbp"]),
+                "temperature": round(s["temp"], 1), "respiratory_rate": round(s["rr"]),
+                "oxygen_saturation": round(s["spo2"]), "timestamp": recorded_at,
+            }
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def patient_payload(service, i):
+    """Request body creating patient number `i` through the API"""
+    if service == "backend":
+        return {"hospital_number": f"B{i:06}", "full_name": f"Bench Patient {i}",
+                "date_of_birth": "1970-01-01", "age": 55, "gender": "F"}
+    return {"name": f"Bench Patient {i}", "age": 55, "gender": "F"}
+
+
+def vitals_payload(service, patient_id, rng):
+    """Request body recording one random reading through the API"""
+    if service == "backend":
+        return {
+            "patient_id": patient_id, "recorded_by_email": "bench@example.com",
+            "blood_pressure_systolic": rng.randint(90, 160), "blood_pressure_diastolic": rng.randint(50, 100),
+            "heart_rate": rng.randint(50, 130), "temperature": round(rng.uniform(35.5, 39.5), 1),
+            "respiratory_rate": rng.randint(10, 28), "oxygen_saturation": rng.randint(88, 100),
+            "weight": 70.0, "notes": "",
+        }
+    return {
+        "patient_id": patient_id, "heart_rate": rng.randint(50, 130),
+        "systolic_bp": rng.randint(90, 160), "diastolic_bp": rng.randint(50, 100),
+        "temperature": round(rng.uniform(35.5, 39.5), 1), "respiratory_rate": rng.randint(10, 28),
+        "oxygen_saturation": rng.randint(88, 100),
+    }
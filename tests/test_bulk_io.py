@@ -0,0 +1,85 @@
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from app import bulk_io
+from app.models import Patient, Vital
+
+PATIENTS_CSV = """id,name,age,gender,notes
+1,Ada Obi,54,F,"diabetic, on insulin"
+2,Musa Bello,61.0,M,
+"""
+
+VITALS_NDJSON = """{"patient_id": 1, "heart_rate": 88, "systolic_bp": 120, "timestamp": "2026-01-01T08:00:00"}
+
+{"patient_id": 2, "heart_rate": 131.5, "oxygen_saturation": 91, "timestamp": "2026-01-01T08:15:00"}
+"""
+
+
+def load(engine, table, text, fmt, chunk_size=1):
+    rows = bulk_io.typed_rows(bulk_io.TABLES[table], bulk_io.read_rows(io.StringIO(text), fmt))
+    return bulk_io.import_rows(engine, bulk_io.TABLES[table], rows, chunk_size)
+
+
+def test_import_and_export_round_trip(engine, db):
+    assert load(engine, "patients", PATIENTS_CSV, "csv") == 2
+    assert load(engine, "vitals", VITALS_NDJSON, "ndjson") == 2
+
+    assert db.get(Patient, 1).notes == "diabetic, on insulin"
+    assert db.get(Patient, 2).age == 61
+    vital = db.query(Vital).filter(Vital.patient_id == 2).one()
+    assert vital.heart_rate == 131.5 and vital.systolic_bp is None
+    assert vital.timestamp == datetime(2026, 1, 1, 8, 15)
+
+    out = io.StringIO()
+    assert bulk_io.export_rows(engine, bulk_io.TABLES["patients"], out, "csv", chunk_size=1) == 2
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert rows[0] == {"id": "1", "name": "Ada Obi", "age": "54", "gender": "F", "notes": "diabetic, on insulin"}
+
+    out = io.StringIO()
+    bulk_io.export_rows(engine, bulk_io.TABLES["vitals"], out, "ndjson")
+    assert '"timestamp": "2026-01-01T08:00:00"' in out.getvalue().splitlines()[0]
+
+
+def test_bad_rows_name_the_line(engine):
+    with pytest.raises(bulk_io.BadRow, match="line 3, age: .* is not a whole number"):
+        load(engine, "patients", "name,age\nA,1\nB,1.5\n", "csv")
+    with pytest.raises(bulk_io.BadRow, match="line 2: unknown column.*blood_type"):
+        load(engine, "patients", "name,blood_type\nA,O+\n", "csv")
+    with pytest.raises(bulk_io.BadRow, match="line 1"):
+        load(engine, "vitals", "{not json\n", "ndjson")
+
+
+def test_copy_encoding_keeps_nulls_and_empty_strings():
+    text = bulk_io.copy_csv(
+        ["id", "name", "notes", "timestamp"],
+        [{"id": 1, "name": 'Say "hi", ok', "notes": None, "timestamp": datetime(2026, 1, 1, 8)},
+         {"id": 2, "name": "\\N", "notes": ""}],
+    )
+    assert text == '1,"Say ""hi"", ok",\\N,2026-01-01T08:00:00\n2,"\\N",,\\N\n'
+
+
+def test_cli_uses_file_extension(monkeypatch, tmp_path, engine):
+    monkeypatch.setattr(bulk_io, "engine", engine)
+    source = tmp_path / "patients.csv"
+    source.write_text(PATIENTS_CSV)
+    bulk_io.main(["import", "patients", str(source), "--quiet"])
+
+    target = tmp_path / "patients.ndjson"
+    bulk_io.main(["export", "patients", str(target), "--quiet"])
+    assert len(target.read_text().splitlines()) == 2
+
+
+def test_empty_and_missing_fields_get_column_defaults(engine, db):
+    load(engine, "patients", "id,name,notes\n1,A,\n", "csv")
+    assert db.get(Patient, 1).notes == ""
+    load(engine, "vitals", '{"patient_id": 1, "heart_rate": 80}\n', "ndjson")
+    assert db.query(Vital).one().timestamp is not None
+
+
+def test_constraint_violations_name_the_chunk(engine, db):
+    with pytest.raises(bulk_io.BadRow, match="lines 4-5: UNIQUE constraint failed: patients.id"):
+        load(engine, "patients", "id,name\n1,A\n2,B\n3,C\n1,D\n", "csv", chunk_size=2)
+    assert db.query(Patient).count() == 2
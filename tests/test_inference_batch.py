@@ -0,0 +1,88 @@
+import json
+from datetime import datetime
+
+from app.models import Patient, Vital
+from app.routers import inference
+from tests.test_vitals_write_path import count_statements
+
+
+def add_vitals(db):
+    db.add(Patient(id=1, name="Batch One"))
+    db.add(Patient(id=2, name="Batch Two"))
+    db.add_all([
+        Vital(id=1, patient_id=1, heart_rate=130, systolic_bp=85, temperature=38.9,
+              respiratory_rate=26, oxygen_saturation=89, timestamp=datetime(2026, 1, 1, 8)),
+        Vital(id=2, patient_id=1, heart_rate=72, systolic_bp=120, diastolic_bp=80, temperature=36.8,
+              respiratory_rate=14, oxygen_saturation=98, timestamp=datetime(2026, 1, 1, 9)),
+        Vital(id=3, patient_id=1, heart_rate=95, timestamp=datetime(2026, 1, 2, 8)),
+        Vital(id=4, patient_id=2, heart_rate=120, temperature=39.5, timestamp=datetime(2026, 1, 1, 8)),
+    ])
+    db.commit()
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_matches_single_inference(client, db, engine):
+    add_vitals(db)
+
+    with count_statements(engine) as statements:
+        response = client.post("/api/v1/inference/batch", json={"vital_ids": [4, 1, 2, 3, 99]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert len(statements) == 1
+
+    lines = ndjson(response)
+    assert [line["vital_id"] for line in lines] == [1, 2, 3, 4, 99]
+    assert lines[-1] == {"vital_id": 99, "detail": "Vital record not found"}
+    for line in lines[:-1]:
+        single = client.post("/api/v1/inference/", json={"vital_id": line.pop("vital_id")}).json()
+        assert line == single
+
+
+def test_batch_by_patient_and_time_range(client, db):
+    add_vitals(db)
+
+    lines = ndjson(client.post("/api/v1/inference/batch", json={"patient_id": 1}))
+    assert [line["vital_id"] for line in lines] == [1, 2, 3]
+
+    lines = ndjson(client.post("/api/v1/inference/batch", json={
+        "patient_id": 1, "since": "2026-01-01T08:30:00", "until": "2026-01-02T00:00:00",
+    }))
+    assert [line["vital_id"] for line in lines] == [2]
+
+
+def test_batch_needs_one_selector(client):
+    assert client.post("/api/v1/inference/batch", json={}).status_code == 422
+    assert client.post("/api/v1/inference/batch", json={"vital_ids": [1], "patient_id": 1}).status_code == 422
+
+
+def test_batch_ids_beyond_the_sqlite_variable_limit(client, db, engine):
+    add_vitals(db)
+    vital_ids = list(range(40000, 0, -1))
+
+    with count_statements(engine) as statements:
+        response = client.post("/api/v1/inference/batch", json={"vital_ids": vital_ids})
+    assert response.status_code == 200
+    assert len(statements) == 4
+
+    lines = ndjson(response)
+    assert [line["vital_id"] for line in lines[:4]] == [1, 2, 3, 4]
+    # Missing ids follow, in request order
+    assert len(lines) == 40000 and lines[4] == {"vital_id": 40000, "detail": "Vital record not found"}
+
+
+def test_batch_by_patient_reports_truncation(client, db, monkeypatch):
+    add_vitals(db)
+    monkeypatch.setattr(inference, "MAX_BATCH_VITALS", 2)
+
+    response = client.post("/api/v1/inference/batch", json={"patient_id": 1})
+    assert response.headers["x-batch-truncated"] == "true"
+    lines = ndjson(response)
+    assert [line.get("vital_id") for line in lines] == [1, 2, None]
+    assert lines[-1]["truncated"] is True and "after vital_id 2" in lines[-1]["detail"]
+
+    response = client.post("/api/v1/inference/batch", json={"patient_id": 2})
+    assert "x-batch-truncated" not in response.headers
+    assert [line["vital_id"] for line in ndjson(response)] == [4]
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from app.model_registry import ModelRegistry, ModelUnavailable
+from app.models import Patient, Vital
+
+
+class FeverModel:
+    """Stands in for a fitted sklearn classifier (predict_proba + classes_)"""
+    classes_ = np.array(["Healthy", "Fever"])
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_proba(self, X):
+        self.batch_sizes.append(len(X))
+        p = (X[:, 0] > 38.0).astype(float)
+        return np.column_stack([1 - p, p])
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    with open(tmp_path / "fever.pkl", "wb") as f:
+        pickle.dump(FeverModel(), f)
+    (tmp_path / "fever.json").write_text(json.dumps({"features": ["temp"]}))
+    (tmp_path / "broken.pkl").write_bytes(b"not a pickle")
+
+    registry = ModelRegistry(tmp_path, workers=1)
+    monkeypatch.setattr("app.routers.inference.model_registry", registry)
+    yield registry
+    registry.close()
+
+
+def test_lazy_load_and_micro_batching(registry):
+    assert [m["loaded"] for m in registry.describe()] == [False, False]
+
+    async def burst():
+        return await asyncio.gather(*(registry.predict("fever", {"temp": 37 + i % 3}) for i in range(20)))
+
+    predictions = asyncio.run(burst())
+    assert [p.label for p in predictions[:3]] == ["Healthy", "Healthy", "Fever"]
+
+    model = registry.get("fever").model
+    assert model.batch_sizes[0] == 1  # warm-up pass
+    assert sum(model.batch_sizes[1:]) == 20 and len(model.batch_sizes) < 21
+
+    stats = {m["name"]: m for m in registry.describe()}["fever"]["stats"]
+    assert stats["requests"] == 20 and stats["batches"] == len(model.batch_sizes) - 1
+    assert stats["request_latency"]["p95_ms"] is not None
+
+    with pytest.raises(ModelUnavailable):
+        registry.get("broken")
+    with pytest.raises(ModelUnavailable):
+        registry.get("missing")
+
+
+def test_inference_uses_model_with_rule_fallback(client, db, registry):
+    db.add(Patient(id=1, name="Model Patient"))
+    db.add(Vital(id=1, patient_id=1, heart_rate=80, temperature=39.2))
+    db.commit()
+
+    rules_only = client.post("/api/v1/inference/", json={"vital_id": 1}).json()
+    assert rules_only["model"] is None
+
+    body = client.post("/api/v1/inference/", json={"vital_id": 1, "model": "fever"}).json()
+    assert body["model"] == "fever" and body["possible_illnesses"] == ["Fever"]
+    assert body["probability"] == 1.0
+    assert body["symptoms"] == rules_only["symptoms"]
+
+    fallback = client.post("/api/v1/inference/", json={"vital_id": 1, "model": "broken"}).json()
+    assert fallback["model"] is None
+    assert fallback["possible_illnesses"] == rules_only["possible_illnesses"]
+    assert "rule engine fallback" in fallback["evidence"]
+
+    models = {m["name"]: m for m in client.get("/api/v1/inference/models").json()}
+    assert models["fever"]["loaded"] and models["fever"]["stats"]["requests"] == 1
+    assert models["broken"]["error"]
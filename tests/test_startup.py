@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Cold `import app.main` must stay under this many seconds (CI fails above it)
+IMPORT_BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "2.0"))
+
+# Optional heavy dependencies that must only load on first use
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "langchain", "faiss", "sklearn", "pandas"]
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = f"""
+import json, sys, threading, time
+sys.path.insert(0, {str(REPO_ROOT)!r})
+start = time.perf_counter()
+import app.main
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+    "threads": threading.active_count(),
+}}))
+"""
+
+
+def test_cold_import_is_fast_and_side_effect_free(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=tmp_path, capture_output=True, text=True,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'inference.db'}"},
+    )
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["seconds"] < IMPORT_BUDGET_S, probe
+    assert probe["heavy"] == []
+    assert probe["threads"] == 1
+    assert list(tmp_path.iterdir()) == []  # no tables created at import
+
+
+def test_migrations_add_indexes_to_existing_tables(tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+
+    from app.migrations import init_db
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'inference.db'}")
+    init_db(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_patients_name_trgm"))
+
+    init_db(engine)
+    assert "ix_patients_name_trgm" in {index["name"] for index in inspect(engine).get_indexes("patients")}
+    engine.dispose()
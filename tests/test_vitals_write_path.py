@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.models import Patient, Vital
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_record_vital_is_one_statement(client, db, engine):
+    db.add(Patient(id=1, name="Write Path"))
+    db.commit()
+
+    with count_statements(engine) as statements:
+        response = client.post("/api/v1/vitals/", json={"patient_id": 1, "heart_rate": 88, "temperature": 37.2})
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+    assert statements[0].lstrip().upper().startswith("INSERT INTO VITALS")
+
+    body = response.json()
+    assert body["timestamp"] is not None and body["heart_rate"] == 88
+    assert db.get(Vital, body["id"]).temperature == 37.2
+
+
+def test_record_vital_unknown_patient(client, db, engine):
+    with count_statements(engine) as statements:
+        response = client.post("/api/v1/vitals/", json={"patient_id": 7, "heart_rate": 88})
+    assert response.status_code == 404
+    assert len(statements) == 1
+    assert db.query(Vital).count() == 0